@@ -0,0 +1,82 @@
+"""Benchmark version snapshot compression codecs on a realistic workbook.
+
+Run from the repository root:
+
+    python benchmarks/bench_version_compression.py [rows] [cols]
+
+For every codec/level combination the script saves one full snapshot of a
+generated workbook, then a second snapshot with a handful of edits, and
+reports save time, load time and the bytes written to the chunk store.
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.engine.version_control import VersionControl
+
+CONFIGURATIONS = [
+    ('none', 0),
+    ('zlib', 1), ('zlib', 6), ('zlib', 9),
+    ('bz2', 1), ('bz2', 9),
+    ('lzma', 0), ('lzma', 6),
+]
+
+def make_workbook(rows, cols, seed=0):
+    """Generate a workbook mixing text, numbers, dates, formulas and blanks"""
+    rng = random.Random(seed)
+    regions = ["North", "South", "East", "West"]
+    sheet = [["Date", "Region", "Product", "Units", "Price", "Total"] +
+             [f"Metric {c}" for c in range(6, cols)]]
+    for r in range(1, rows):
+        row = [f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+               rng.choice(regions),
+               f"SKU-{rng.randint(1000, 1200)}",
+               str(rng.randint(1, 500)),
+               f"{rng.uniform(1, 100):.2f}",
+               f"=D{r + 1}*E{r + 1}"]
+        row += [f"{rng.gauss(0, 1000):.4f}" if rng.random() > 0.2 else ""
+                for _ in range(6, cols)]
+        sheet.append(row[:cols])
+    summary = [["Region", "Total"]] + [[region, f"=SUMIF(B:B,\"{region}\",F:F)"] for region in regions]
+    return {"Data": sheet, "Summary": summary}
+
+def store_size(vc, document_id):
+    chunks_dir = vc._get_chunks_dir(document_id)
+    return sum(os.path.getsize(os.path.join(chunks_dir, name)) for name in os.listdir(chunks_dir))
+
+def run(rows, cols):
+    workbook = make_workbook(rows, cols)
+    print(f"Workbook: {rows} x {cols} cells")
+    print(f"{'codec':<6} {'level':>5} {'save (s)':>9} {'resave (s)':>10} {'load (s)':>9} {'bytes':>12}")
+    for codec, level in CONFIGURATIONS:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            vc = VersionControl(temp_dir, codec=codec, level=level)
+            filepath = os.path.join(temp_dir, "book.xlsx")
+            document_id = vc.get_document_id_from_path(filepath)
+
+            start = time.perf_counter()
+            vc.save_version(filepath, workbook)
+            save_time = time.perf_counter() - start
+
+            for r in range(1, rows, max(1, rows // 10)):
+                workbook["Data"][r][3] = str(int(workbook["Data"][r][3]) + 1)
+            start = time.perf_counter()
+            info = vc.save_version(filepath, workbook)
+            resave_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            vc.load_version(document_id, info['version_id'])
+            load_time = time.perf_counter() - start
+
+            print(f"{codec:<6} {level:>5} {save_time:>9.3f} {resave_time:>10.3f} "
+                  f"{load_time:>9.3f} {store_size(vc, document_id):>12,}")
+            vc.close()
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    cols = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    run(rows, cols)
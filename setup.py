@@ -9,8 +9,14 @@ setup(
     long_description=open('README.md').read(),
     long_description_content_type='text/markdown',
     url='https://github.com/yourusername/pyspreadsheet',
-    packages=find_packages(where='src'),
-    package_dir={'': 'src'},
+    # src/ is installed as the pyspreadsheet package; its subpackages import each other relatively
+    packages=['pyspreadsheet'] + ['pyspreadsheet.' + name for name in find_packages(where='src')],
+    package_dir={'pyspreadsheet': 'src'},
+    entry_points={
+        'console_scripts': [
+            'pyspreadsheet-calc=pyspreadsheet.cli.batch_calc:main',
+        ],
+    },
     install_requires=[
         # List your project dependencies here
     ],
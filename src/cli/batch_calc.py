@@ -0,0 +1,234 @@
+"""Batch recalculation and conversion of workbooks without the GUI.
+
+Usage:
+    pyspreadsheet-calc models/*.xlsx --output-dir out --format parquet --workers 8
+    python -m src.cli.batch_calc models/ --output-dir out --summary summary.json
+
+Every input workbook is loaded, recalculated and written to the output
+directory. Files are processed in parallel across a process pool, and a JSON
+summary with per-file status, timing and memory is written at the end.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from ..core.workbook import Workbook
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+INPUT_EXTENSIONS = ('.csv', '.xlsx', '.xls')
+OUTPUT_FORMATS = ('csv', 'xlsx', 'parquet')
+
+def find_inputs(paths):
+    """Expand files and directories into a sorted list of workbook paths"""
+    inputs = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                inputs.extend(os.path.join(root, name) for name in files
+                              if name.lower().endswith(INPUT_EXTENSIONS))
+        else:
+            inputs.append(path)
+    return sorted(set(inputs))
+
+def _peak_rss_mb():
+    """Peak resident memory of the current process in MB (None if unavailable)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def sheet_frame(rows):
+    """A sheet's values as a DataFrame with one typed column per sheet column
+
+    A column whose values all read as numbers is stored as float, any other
+    as text; empty cells are null. A first row of distinct text headings
+    over at least one numeric column names the columns.
+
+    Args:
+        rows: List of row lists, as in Workbook.to_dict
+
+    Returns:
+        pandas DataFrame
+    """
+    import pandas as pd
+    width = max((len(row) for row in rows), default=0)
+    cells = [[None if value is None or value == '' else value for value in row] + [None] * (width - len(row))
+             for row in rows]
+
+    def typed_columns(lines):
+        columns = []
+        for values in zip(*lines):
+            column = pd.Series(values, dtype=object)
+            numbers = pd.to_numeric(column, errors='coerce')
+            if numbers.notna().sum() == column.notna().sum():
+                columns.append(numbers.astype(float))
+            else:
+                columns.append(column.map(lambda value: value if value is None else str(value)))
+        return columns
+
+    def frame(names, columns):
+        return pd.DataFrame({name: column.reset_index(drop=True) for name, column in zip(names, columns)},
+                            columns=names)
+
+    if len(cells) > 1:
+        header = [str(value) for value in cells[0] if value is not None]
+        header_is_text = len(header) == width and pd.to_numeric(pd.Series(header), errors='coerce').isna().all()
+        if header_is_text and len(set(header)) == width:
+            columns = typed_columns(cells[1:])
+            if any(column.dtype == float for column in columns):
+                return frame(header, columns)
+    return frame([str(i) for i in range(width)], typed_columns(cells))
+
+def write_outputs(workbook, input_path, output_dir, output_format):
+    """Write a recalculated workbook's values in the requested format
+
+    Returns:
+        List of paths written
+    """
+    stem = os.path.splitext(os.path.basename(input_path))[0]
+    data = workbook.to_dict()
+
+    if output_format == 'xlsx':
+        path = os.path.join(output_dir, f"{stem}.xlsx")
+        workbook.save(path)
+        return [path]
+
+    # CSV and Parquet hold one sheet per file
+    paths = []
+    for sheet_name, rows in data.items():
+        suffix = '' if len(data) == 1 else f"__{sheet_name}"
+        path = os.path.join(output_dir, f"{stem}{suffix}.{output_format}")
+        if output_format == 'csv':
+            from ..data_io.csv_handler import write_csv
+            write_csv(path, rows)
+        else:
+            sheet_frame(rows).to_parquet(path, index=False)
+        paths.append(path)
+    return paths
+
+def process_file(input_path, output_dir, output_format, trace_memory=False):
+    """Load, recalculate and export one workbook
+
+    Returns:
+        Summary dictionary for the file; failures are reported, not raised
+    """
+    summary = {'input': input_path, 'status': 'ok', 'outputs': []}
+    started = time.perf_counter()
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        workbook = Workbook().load(input_path)
+        loaded = time.perf_counter()
+
+        workbook.recalculate()
+        recalculated = time.perf_counter()
+
+        summary['outputs'] = write_outputs(workbook, input_path, output_dir, output_format)
+        written = time.perf_counter()
+
+        summary.update({
+            'sheets': workbook.sheet_count(),
+            'cells': sum(len(sheet.cells) for sheet in workbook.sheets.values()),
+            'formulas': sum(1 for sheet in workbook.sheets.values() for _ in sheet.iter_formula_cells()),
+            'load_s': round(loaded - started, 4),
+            'recalc_s': round(recalculated - loaded, 4),
+            'write_s': round(written - recalculated, 4),
+        })
+    except Exception as e:
+        summary['status'] = 'error'
+        summary['error'] = f"{type(e).__name__}: {e}"
+    finally:
+        summary['total_s'] = round(time.perf_counter() - started, 4)
+        if trace_memory:
+            summary['peak_alloc_mb'] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+            tracemalloc.stop()
+        summary['worker_peak_rss_mb'] = _peak_rss_mb()
+        summary['worker_pid'] = os.getpid()
+    return summary
+
+def run_batch(inputs, output_dir, output_format='csv', workers=None, trace_memory=False, progress=None):
+    """Process many workbooks, in parallel when workers > 1
+
+    Args:
+        inputs: Workbook paths
+        output_dir: Directory for the exported files
+        output_format: One of OUTPUT_FORMATS
+        workers: Number of worker processes (defaults to the CPU count)
+        trace_memory: Record each file's peak Python allocation (slower)
+        progress: Optional callback receiving each file summary as it completes
+
+    Returns:
+        Batch summary dictionary
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format: {output_format}")
+    os.makedirs(output_dir, exist_ok=True)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(inputs) or 1))
+
+    started = time.perf_counter()
+    results = []
+    if workers == 1:
+        for path in inputs:
+            results.append(process_file(path, output_dir, output_format, trace_memory))
+            if progress:
+                progress(results[-1])
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(process_file, path, output_dir, output_format, trace_memory)
+                       for path in inputs]
+            for future in as_completed(futures):
+                results.append(future.result())
+                if progress:
+                    progress(results[-1])
+
+    order = {path: i for i, path in enumerate(inputs)}
+    results.sort(key=lambda result: order[result['input']])
+    return {
+        'files': results,
+        'total_files': len(results),
+        'failed': sum(1 for result in results if result['status'] != 'ok'),
+        'workers': workers,
+        'output_format': output_format,
+        'wall_time_s': round(time.perf_counter() - started, 4),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='pyspreadsheet-calc',
+                                     description="Recalculate workbooks and export their values")
+    parser.add_argument('inputs', nargs='+', help="workbook files or directories (.csv, .xlsx, .xls)")
+    parser.add_argument('-o', '--output-dir', default='output', help="directory for exported files")
+    parser.add_argument('-f', '--format', default='csv', choices=OUTPUT_FORMATS, help="output format")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('-s', '--summary', default=None, help="write the JSON summary here instead of stdout")
+    parser.add_argument('--trace-memory', action='store_true', help="record per-file peak Python allocation")
+    args = parser.parse_args(argv)
+
+    inputs = find_inputs(args.inputs)
+    if not inputs:
+        parser.error("no workbooks found")
+
+    def progress(result):
+        print(f"[{result['status']}] {result['input']} ({result['total_s']:.2f}s)", file=sys.stderr)
+
+    summary = run_batch(inputs, args.output_dir, args.format, args.workers, args.trace_memory, progress)
+
+    if args.summary:
+        with open(args.summary, 'w') as f:
+            json.dump(summary, f, indent=2)
+    else:
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+
+    return 1 if summary['failed'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
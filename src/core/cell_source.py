@@ -0,0 +1,125 @@
+from ..utils.helpers import shift_formula_references
+
+class CellSource:
+    """Interface the calculation engine uses to read and write a sheet.
+
+    Implemented by core.sheet.Sheet (headless, no Qt required) and by
+    gui.sheet_view.SheetView, so the same Calculator can drive either.
+    Rows and columns are 0-based.
+    """
+
+    # engine.search.SearchIndex following this source's edits, if any
+    search_index = None
+
+    def row_count(self):
+        """Return the number of rows in the sheet"""
+        raise NotImplementedError
+
+    def column_count(self):
+        """Return the number of columns in the sheet"""
+        raise NotImplementedError
+
+    def get_raw_value(self, row, col):
+        """Return what was entered in a cell: the formula text for formula
+        cells, otherwise the cell's content ('' for an empty cell)"""
+        raise NotImplementedError
+
+    def get_cell_value(self, row, col):
+        """Return a cell's value: the last computed result for formula cells,
+        otherwise the cell's content (None for a cell that does not exist)"""
+        raise NotImplementedError
+
+    def get_column_values(self, col, top, bottom):
+        """Return the values (as get_cell_value) of rows top..bottom of a column
+
+        The default reads cell by cell; sources with a faster bulk read
+        should override it.
+        """
+        return [self.get_cell_value(row, col) for row in range(top, bottom + 1)]
+
+    def set_cell_display_value(self, row, col, value):
+        """Store the computed result of a formula cell"""
+        raise NotImplementedError
+
+    def set_cell_value(self, row, col, value):
+        """Set what is entered in a cell; text starting with '=' is a formula"""
+        raise NotImplementedError
+
+    def set_cell_values(self, row, col, rows, record=True):
+        """Write a block of values with its top-left corner at (row, col)
+
+        The default writes cell by cell; views override it to apply the block
+        as a single update. record=False keeps the write out of the undo
+        history, for output the engine recomputes (see set_cells).
+        """
+        for r, values in enumerate(rows):
+            for c, value in enumerate(values):
+                self.set_cell_value(row + r, col + c, value)
+
+    def set_cells(self, cells, record=True):
+        """Write scattered cells, given as (row, col, value), as one update
+
+        The default writes cell by cell; views override it to apply the
+        edits as a single update and undo step. With record=False, views
+        leave the undo history and redo stack alone: engine output such as
+        data tables and pivot tables is rewritten after every edit and must
+        not become an undo step of its own.
+        """
+        for row, col, value in cells:
+            self.set_cell_value(row, col, value)
+
+    def move_rows(self, top, left, bottom, right, order):
+        """Rearrange the rows of a block, as sorting does
+
+        Row top + i of the block receives what was in row top + order[i].
+        Relative references in moved formulas are adjusted by the distance
+        moved. The default rewrites the block with set_cell_values.
+        """
+        rows = [[self.get_raw_value(top + source, col) for col in range(left, right + 1)] for source in order]
+        for i, source in enumerate(order):
+            offset = i - int(source)
+            rows[i] = [shift_formula_references(value, offset)
+                       if isinstance(value, str) and value.startswith('=') else value
+                       for value in rows[i]]
+        self.set_cell_values(top, left, rows)
+
+    def compact_rows(self, top, left, bottom, right, kept):
+        """Keep only some rows of a block, as removing duplicates does
+
+        Row top + i of the block receives what was in row top + kept[i]
+        (kept is ascending) and the rows below the last kept one are
+        cleared. The default moves the rows with move_rows and clears the
+        rest with set_cells.
+        """
+        kept = [int(source) for source in kept]
+        dropped = sorted(set(range(bottom - top + 1)) - set(kept))
+        self.move_rows(top, left, bottom, right, kept + dropped)
+        self.set_cells([(row, col, '') for row in range(top + len(kept), bottom + 1)
+                        for col in range(left, right + 1) if self.get_raw_value(row, col) not in (None, '')])
+
+    def iter_cells(self):
+        """Yield (row, col, raw value) for every non-empty cell
+
+        The default scans the whole grid; sparse sources should override it.
+        """
+        for row in range(self.row_count()):
+            for col in range(self.column_count()):
+                raw = self.get_raw_value(row, col)
+                if raw is not None and raw != '':
+                    yield row, col, raw
+
+    def reindex_cells(self, cells):
+        """Tell the search index, if any, that some (row, col) cells changed"""
+        if self.search_index is not None:
+            self.search_index.update_cells(self, cells)
+
+    def iter_formula_cells(self):
+        """Yield (row, col, formula) for every formula cell
+
+        The default scans the whole grid; sparse sources should override it.
+        """
+        for row in range(self.row_count()):
+            for col in range(self.column_count()):
+                raw = self.get_raw_value(row, col)
+                if isinstance(raw, str) and raw.startswith('='):
+                    yield row, col, raw
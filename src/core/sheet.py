@@ -1,17 +1,155 @@
-class Sheet:
+from .cell import Cell
+from .cell_source import CellSource
+from ..utils.helpers import shift_formula_references
+
+class Sheet(CellSource):
+    """A sparse, Qt-free sheet of cells keyed by (row, col)"""
+
     def __init__(self, name):
         self.name = name
         self.cells = {}
+        self._rows = 0
+        self._cols = 0
+
+    def add_cell(self, cell, row, col):
+        self.cells[(row, col)] = cell
+        self._rows = max(self._rows, row + 1)
+        self._cols = max(self._cols, col + 1)
 
-    def add_cell(self, cell_id, cell):
-        self.cells[cell_id] = cell
+    def remove_cell(self, row, col):
+        if (row, col) in self.cells:
+            del self.cells[(row, col)]
 
-    def remove_cell(self, cell_id):
-        if cell_id in self.cells:
-            del self.cells[cell_id]
+    def get_cell(self, row, col):
+        return self.cells.get((row, col), None)
 
-    def get_cell(self, cell_id):
-        return self.cells.get(cell_id, None)
+    def get_cell_data(self, row, col):
+        cell = self.get_cell(row, col)
+        return cell.value if cell else None
 
     def get_all_cells(self):
-        return self.cells.items()
\ No newline at end of file
+        return self.cells.items()
+
+    def set_cell_value(self, row, col, value):
+        """Set a cell's content; text starting with '=' is stored as a formula"""
+        if isinstance(value, str) and value.startswith('='):
+            self.add_cell(Cell(formula=value), row, col)
+        elif value is None or value == '':
+            self.remove_cell(row, col)
+        else:
+            self.add_cell(Cell(value=value), row, col)
+        self.reindex_cells([(row, col)])
+
+    def move_rows(self, top, left, bottom, right, order):
+        """Rearrange the rows of a block by moving its Cell objects"""
+        cells = self.cells
+        order = [int(source) for source in order]
+        for col in range(left, right + 1):
+            column = [cells.get((top + source, col)) for source in order]
+            for i, (source, cell) in enumerate(zip(order, column)):
+                if i == source:
+                    continue
+                if cell is None:
+                    cells.pop((top + i, col), None)
+                    continue
+                if cell.formula:
+                    # Relative references follow the row, as if copied
+                    cell.formula = shift_formula_references(cell.formula, i - source)
+                cells[(top + i, col)] = cell
+        if self.search_index is not None:
+            self.reindex_cells([(top + i, col) for i, source in enumerate(order) if i != source
+                                for col in range(left, right + 1)])
+
+    def compact_rows(self, top, left, bottom, right, kept):
+        """Move the kept rows of a block up and drop the Cell objects left below"""
+        cells = self.cells
+        kept = [int(source) for source in kept]
+        first = next((i for i, source in enumerate(kept) if i != source), len(kept))
+        for col in range(left, right + 1):
+            # Take the column out from the first changed row down, then put back the kept cells
+            column = [cells.pop((row, col), None) for row in range(top + first, bottom + 1)]
+            for i, source in enumerate(kept[first:], first):
+                cell = column[source - first]
+                if cell is None:
+                    continue
+                if cell.formula:
+                    # Relative references follow the row, as if copied
+                    cell.formula = shift_formula_references(cell.formula, i - source)
+                cells[(top + i, col)] = cell
+        if self.search_index is not None:
+            self.reindex_cells([(row, col) for row in range(top + first, bottom + 1)
+                                for col in range(left, right + 1)])
+
+    def load_data(self, data):
+        """Replace the sheet's contents with a list of rows"""
+        # Index the new contents once at the end rather than cell by cell
+        index, self.search_index = self.search_index, None
+        self.cells = {}
+        self._rows = len(data)
+        self._cols = max((len(row) for row in data), default=0)
+        for row, row_data in enumerate(data):
+            for col, value in enumerate(row_data):
+                self.set_cell_value(row, col, value)
+        if index is not None:
+            index.refresh_sheet(self)
+
+    def get_all_data(self, formulas=False):
+        """Return the sheet as a list of rows
+
+        Args:
+            formulas: Return formula text instead of computed values
+        """
+        data = [[''] * self._cols for _ in range(self._rows)]
+        for (row, col), cell in self.cells.items():
+            if formulas and cell.formula:
+                data[row][col] = cell.formula
+            else:
+                data[row][col] = '' if cell.value is None else cell.value
+        return data
+
+    # CellSource interface
+    def row_count(self):
+        return self._rows
+
+    def column_count(self):
+        return self._cols
+
+    def get_raw_value(self, row, col):
+        cell = self.cells.get((row, col))
+        if cell is None:
+            return ''
+        if cell.formula:
+            return cell.formula
+        return '' if cell.value is None else cell.value
+
+    def get_cell_value(self, row, col):
+        cell = self.cells.get((row, col))
+        if cell is None:
+            return None
+        if cell.formula and cell.value is None:
+            return cell.formula
+        return cell.value
+
+    def get_column_values(self, col, top, bottom):
+        cells = [self.cells.get((row, col)) for row in range(top, bottom + 1)]
+        return [None if cell is None else cell.formula if cell.formula and cell.value is None else cell.value
+                for cell in cells]
+
+    def set_cell_display_value(self, row, col, value):
+        cell = self.cells.get((row, col))
+        if cell is None:
+            cell = Cell()
+            self.add_cell(cell, row, col)
+        cell.value = value
+        self.reindex_cells([(row, col)])
+
+    def iter_cells(self):
+        for (row, col), cell in list(self.cells.items()):
+            raw = cell.formula or cell.value
+            if raw is not None and raw != '':
+                yield row, col, raw
+
+    def iter_formula_cells(self):
+        for (row, col), cell in list(self.cells.items()):
+            if cell.formula:
+                yield row, col, cell.formula
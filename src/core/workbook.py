@@ -1,26 +1,107 @@
+import os
+from .sheet import Sheet
+
 class Workbook:
     def __init__(self):
         self.sheets = {}
+        self.search_index = None  # Built on first use by get_search_index
 
     def add_sheet(self, sheet_name):
         if sheet_name not in self.sheets:
-            self.sheets[sheet_name] = []
+            self.sheets[sheet_name] = Sheet(sheet_name)
+            if self.search_index is not None:
+                self.search_index.add_sheet(sheet_name, self.sheets[sheet_name])
+            return self.sheets[sheet_name]
         else:
             raise ValueError(f"Sheet '{sheet_name}' already exists.")
 
     def remove_sheet(self, sheet_name):
         if sheet_name in self.sheets:
+            if self.search_index is not None:
+                self.search_index.remove_sheet(self.sheets[sheet_name])
             del self.sheets[sheet_name]
         else:
             raise ValueError(f"Sheet '{sheet_name}' does not exist.")
 
+    def rename_sheet(self, old_name, new_name):
+        if old_name not in self.sheets:
+            raise ValueError(f"Sheet '{old_name}' does not exist.")
+        if new_name in self.sheets:
+            raise ValueError(f"Sheet '{new_name}' already exists.")
+        # Rebuild the dict so the sheet keeps its position
+        self.sheets = {new_name if name == old_name else name: sheet
+                       for name, sheet in self.sheets.items()}
+        self.sheets[new_name].name = new_name
+        if self.search_index is not None:
+            self.search_index.rename_sheet(self.sheets[new_name], new_name)
+
+    def get_search_index(self):
+        """The workbook's Find/Replace index, built on first use and kept up to date with edits"""
+        if self.search_index is None:
+            from ..engine.search import SearchIndex
+            
+            self.search_index = SearchIndex()
+            for name, sheet in self.sheets.items():
+                self.search_index.add_sheet(name, sheet)
+        return self.search_index
+
     def get_sheet(self, sheet_name):
         return self.sheets.get(sheet_name, None)
 
-    def save(self, file_path):
-        # Logic to save the workbook to a file
-        pass
+    def sheet_exists(self, sheet_name):
+        return sheet_name in self.sheets
+
+    def sheet_count(self):
+        return len(self.sheets)
+
+    def sheet_names(self):
+        return list(self.sheets.keys())
+
+    def recalculate(self):
+        """Recalculate every formula in every sheet, without any GUI"""
+        from ..engine.calculator import Calculator
+        
+        calculator = Calculator()
+        for sheet in self.sheets.values():
+            calculator.set_cell_source(sheet)
+            calculator.recalculate_all()
+
+    def to_dict(self, formulas=False):
+        """Return {sheet_name: rows}, with computed values unless formulas is True"""
+        return {name: sheet.get_all_data(formulas) for name, sheet in self.sheets.items()}
+
+    def save(self, file_path, formulas=False):
+        """Save the workbook to a CSV (first sheet) or Excel file
+
+        Args:
+            file_path: Output path; the format is taken from the extension
+            formulas: Write formula text instead of computed values
+        """
+        ext = os.path.splitext(file_path)[1].lower().lstrip('.')
+        data = self.to_dict(formulas)
+        if ext == 'csv':
+            from ..data_io.csv_handler import write_csv
+            write_csv(file_path, next(iter(data.values()), []))
+        elif ext in ('xlsx', 'xls'):
+            from ..data_io.excel_handler import write_excel
+            write_excel(file_path, data)
+        else:
+            raise ValueError(f"Unsupported file format: {ext}")
 
     def load(self, file_path):
-        # Logic to load the workbook from a file
-        pass
\ No newline at end of file
+        """Load a workbook from a CSV or Excel file, replacing all sheets"""
+        ext = os.path.splitext(file_path)[1].lower().lstrip('.')
+        if ext == 'csv':
+            from ..data_io.csv_handler import read_csv
+            data = {os.path.splitext(os.path.basename(file_path))[0]: read_csv(file_path)}
+        elif ext in ('xlsx', 'xls'):
+            from ..data_io.excel_handler import read_excel
+            data = read_excel(file_path)
+        else:
+            raise ValueError(f"Unsupported file format: {ext}")
+            
+        self.sheets = {}
+        self.search_index = None
+        for sheet_name, sheet_data in data.items():
+            self.add_sheet(sheet_name).load_data(sheet_data)
+        return self
@@ -1,7 +1,10 @@
-from openpyxl import Workbook, load_workbook
+# openpyxl is imported on first use; it is slow to import and not needed until
+# a workbook is actually read or written
 
 def read_excel(file_path):
     """Read an Excel file and return a dictionary of {sheet_name: data}"""
+    from openpyxl import load_workbook
+    
     workbook = load_workbook(filename=file_path)
     
     # Create a dictionary to store data from each sheet
@@ -28,6 +31,8 @@ def write_excel(file_path, data):
         file_path: Path to save the file
         data: Either a list of lists (single sheet) or a dict of {sheet_name: sheet_data}
     """
+    from openpyxl import Workbook
+    
     workbook = Workbook()
     
     # Remove the default sheet
@@ -0,0 +1,228 @@
+import re
+import numpy as np
+from ..utils.helpers import cell_number, cell_text
+
+# Condition name -> label shown in the filter dialog
+FILTER_CONDITIONS = {
+    'equal_to': "Equal to",
+    'not_equal_to': "Not equal to",
+    'contains': "Contains",
+    'does_not_contain': "Does not contain",
+    'begins_with': "Begins with",
+    'ends_with': "Ends with",
+    'matches_regex': "Matches regex",
+    'greater_than': "Greater than",
+    'greater_or_equal': "Greater than or equal to",
+    'less_than': "Less than",
+    'less_or_equal': "Less than or equal to",
+    'between': "Between",
+    'top': "Top N",
+    'bottom': "Bottom N",
+    'in_list': "Is one of",
+    'blank': "Is blank",
+    'not_blank': "Is not blank",
+}
+FILTER_MATCH_MODES = ('all', 'any')
+
+# Conditions tested against each distinct text of a column rather than each row
+_TEXT_TESTS = {
+    'contains': lambda text, value: value in text,
+    'does_not_contain': lambda text, value: value not in text,
+    'begins_with': lambda text, value: text.startswith(value),
+    'ends_with': lambda text, value: text.endswith(value),
+}
+
+class FilterColumn:
+    """Index of one column for filtering
+
+    Numbers are kept as a float array (NaN where the cell is not numeric).
+    Text is dictionary-encoded: each row holds a code into the column's
+    distinct case-folded texts, so text conditions are evaluated once per
+    distinct value and then broadcast to the rows.
+    """
+
+    def __init__(self, values):
+        import pandas as pd
+
+        # Convert each distinct cell value once, then map the results to the rows
+        codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+        uniques = uniques.to_numpy(dtype=object)
+        if (codes < 0).any():
+            # Missing values (None, NaN) come back as -1; give them a code of their own
+            uniques = np.append(uniques, None)
+            codes[codes < 0] = len(uniques) - 1
+        numbers = np.fromiter(map(cell_number, uniques), dtype=float, count=len(uniques))
+        text_codes, self.texts = pd.factorize(pd.Series([cell_text(value).lower() for value in uniques], dtype=object))
+        self.texts = self.texts.to_numpy(dtype=object)
+        self.numbers = numbers[codes]
+        self.codes = text_codes[codes]
+        self.blank = self.codes == self._code('')
+
+    def _code(self, text):
+        """Code of a case-folded text, or -1 if no row holds it"""
+        found = np.flatnonzero(self.texts == text)
+        return int(found[0]) if len(found) else -1
+
+    def text_mask(self, test):
+        """Rows whose text passes test(text)"""
+        hits = np.fromiter((bool(test(text)) for text in self.texts), dtype=bool, count=len(self.texts))
+        return hits[self.codes]
+
+    def equal_mask(self, value):
+        """Rows equal to a value: numerically when both sides are numbers, else as case-folded text"""
+        number = cell_number(value)
+        mask = self.codes == self._code(cell_text(value).lower())
+        if not np.isnan(number):
+            mask |= self.numbers == number
+        return mask
+
+class AutoFilter:
+    """Shows only the rows of a block that meet criteria on its columns.
+
+    Each criterion is (column, condition, value) with condition one of
+    FILTER_CONDITIONS; the rows shown meet all criteria (match='all') or any
+    of them (match='any'). Criteria are evaluated as NumPy boolean masks over
+    indexed columns (see FilterColumn), built on first use and kept until
+    invalidated, so changing the criteria re-filters without re-reading the
+    sheet.
+    """
+
+    def __init__(self, bounds, has_header=True, match='all'):
+        """Define a filter over a block
+
+        Args:
+            bounds: (top, left, bottom, right) of the block, 0-based inclusive
+            has_header: The block's first row holds headers and is always shown
+            match: 'all' to show rows meeting every criterion, 'any' for at least one
+        """
+        if match not in FILTER_MATCH_MODES:
+            raise ValueError(f"Unsupported match mode: {match}")
+        self.bounds = tuple(bounds)
+        self.has_header = has_header
+        self.match = match
+        self.criteria = []
+        self._columns = {}  # sheet column -> FilterColumn
+
+    @property
+    def first_row(self):
+        """First sheet row the filter can hide"""
+        return self.bounds[0] + (1 if self.has_header else 0)
+
+    def add_criterion(self, column, condition, value=None):
+        """Add a condition on a sheet column of the block
+
+        Args:
+            column: 0-based sheet column
+            condition: One of FILTER_CONDITIONS
+            value: The condition's operand: a number or text; (low, high) for
+                'between'; N for 'top' and 'bottom'; a list of values for
+                'in_list'; a pattern for 'matches_regex'; unused for 'blank'
+                and 'not_blank'
+        """
+        top, left, bottom, right = self.bounds
+        if not left <= column <= right:
+            raise ValueError("Filter columns must be inside the filtered range")
+        if condition not in FILTER_CONDITIONS:
+            raise ValueError(f"Unsupported filter condition: {condition}")
+        if condition in ('greater_than', 'greater_or_equal', 'less_than', 'less_or_equal') and np.isnan(cell_number(value)):
+            raise ValueError(f"'{FILTER_CONDITIONS[condition]}' needs a number")
+        if condition == 'between' and (len(value) != 2 or np.isnan([cell_number(v) for v in value]).any()):
+            raise ValueError("'Between' needs a low and a high number")
+        if condition in ('top', 'bottom') and (np.isnan(cell_number(value)) or cell_number(value) < 0):
+            raise ValueError(f"'{FILTER_CONDITIONS[condition]}' needs a count of rows")
+        if condition == 'matches_regex':
+            try:
+                re.compile(value)
+            except re.error as e:
+                raise ValueError(f"Invalid regular expression: {e}")
+        self.criteria.append((column, condition, value))
+
+    def clear_criteria(self):
+        self.criteria = []
+
+    def invalidate(self, columns=None):
+        """Forget the index of some columns (all by default) after their cells changed"""
+        if columns is None:
+            self._columns = {}
+        else:
+            for column in columns:
+                self._columns.pop(column, None)
+
+    def column(self, source, column):
+        """The index of a sheet column, built from the source if needed"""
+        if column not in self._columns:
+            self._columns[column] = FilterColumn(source.get_column_values(column, self.first_row, self.bounds[2]))
+        return self._columns[column]
+
+    def evaluate(self, source):
+        """Work out which rows to show
+
+        Args:
+            source: CellSource holding the block
+
+        Returns:
+            Boolean array with one entry per row from first_row to the
+            block's bottom; True means the row is shown
+        """
+        count = self.bounds[2] - self.first_row + 1
+        if not self.criteria:
+            return np.ones(max(count, 0), dtype=bool)
+
+        combine = np.logical_and if self.match == 'all' else np.logical_or
+        mask = None
+        for column, condition, value in self.criteria:
+            criterion = self._criterion_mask(self.column(source, column), condition, value)
+            mask = criterion if mask is None else combine(mask, criterion)
+        return mask
+
+    def _criterion_mask(self, column, condition, value):
+        numbers = column.numbers
+        if condition == 'equal_to':
+            return column.equal_mask(value)
+        if condition == 'not_equal_to':
+            return ~column.equal_mask(value)
+        if condition in _TEXT_TESTS:
+            test, operand = _TEXT_TESTS[condition], cell_text(value).lower()
+            return column.text_mask(lambda text: test(text, operand))
+        if condition == 'matches_regex':
+            pattern = re.compile(value, re.IGNORECASE)
+            return column.text_mask(pattern.search)
+        if condition == 'in_list':
+            mask = np.zeros(len(numbers), dtype=bool)
+            for item in value:
+                mask |= column.equal_mask(item)
+            return mask
+        if condition == 'blank':
+            return column.blank.copy()
+        if condition == 'not_blank':
+            return ~column.blank
+
+        with np.errstate(invalid='ignore'):
+            if condition == 'greater_than':
+                return numbers > cell_number(value)
+            if condition == 'greater_or_equal':
+                return numbers >= cell_number(value)
+            if condition == 'less_than':
+                return numbers < cell_number(value)
+            if condition == 'less_or_equal':
+                return numbers <= cell_number(value)
+            if condition == 'between':
+                low, high = sorted(cell_number(v) for v in value)
+                return (numbers >= low) & (numbers <= high)
+
+            # Top or bottom N numbers; ties with the Nth value are kept
+            n = int(cell_number(value))
+            finite = numbers[~np.isnan(numbers)]
+            if n <= 0 or not len(finite):
+                return np.zeros(len(numbers), dtype=bool)
+            if n >= len(finite):
+                return ~np.isnan(numbers)
+            if condition == 'top':
+                return numbers >= np.partition(finite, len(finite) - n)[len(finite) - n]
+            return numbers <= np.partition(finite, n - 1)[n - 1]
+
+def row_spans(mask, offset=0):
+    """Runs of True in a boolean array as (first, last) pairs, shifted by offset"""
+    padded = np.concatenate(([False], np.asarray(mask, dtype=bool), [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return [(int(start) + offset, int(end) - 1 + offset) for start, end in zip(edges[::2], edges[1::2])]
@@ -2,16 +2,23 @@ import re
 import datetime
 import statistics
 import numpy as np
-import pandas as pd
 from dateutil.relativedelta import relativedelta  
 from math import ceil, floor, sqrt, sin, cos, tan, log, log10, exp, pi
 from ..utils.helpers import parse_cell_reference
 
 class Calculator:
+    # Distinct expressions kept compiled before the cache is reset
+    EXPRESSION_CACHE_SIZE = 10000
+    
     def __init__(self, sheet_view=None):
-        self.sheet_view = sheet_view
+        # Any CellSource: a core.sheet.Sheet for headless use or the GUI's SheetView
+        self.cell_source = sheet_view
         self.formula_pattern = re.compile(r'=([A-Z]+\([^)]*\)|[^=]*)')
         self.cell_ref_pattern = re.compile(r'([A-Z]+)(\d+)')
+        # Reference patterns for dependency tracking; "$" marks absolute references
+        # and a name followed by "(" (such as LOG10) is a function, not a cell
+        self.range_ref_pattern = re.compile(r'\$?([A-Z]+)\$?(\d+):\$?([A-Z]+)\$?(\d+)')
+        self.dependency_ref_pattern = re.compile(r'(?<![A-Za-z0-9_.])\$?([A-Z]+)\$?(\d+)(?![\d(])')
         self.operators = {
             '+': lambda x, y: x + y,
             '-': lambda x, y: x - y,
@@ -21,7 +28,14 @@ class Calculator:
             '%': lambda x, y: x % y,
         }
         self.formula_cache = {}  # Cache for formula results
+        self.expression_cache = {}  # Expression -> (compiled code, referenced cells)
         self.dependent_cells = {}  # Track cell dependencies
+        self.range_dependents = {}  # Column -> (start_row, end_row, dependent) for range references
+        self.formula_cells = {}  # (row, col) -> formula, as of the last dependency graph build
+        self.graph_source = None  # Cell source the dependency graph was built for
+        self.data_tables = []  # DataTable objects kept up to date by recalculation
+        self.pivot_tables = []  # LivePivot objects kept up to date by recalculation
+        self.rng = np.random.default_rng()  # Random stream for RAND and RANDBETWEEN
         # Expanded functions dictionary with Google Sheets-like functionality
         self.functions = self._initialize_functions()
         
@@ -47,8 +61,8 @@ class Calculator:
             'GCD': lambda values: np.gcd.reduce(np.array(values, dtype=int)) if values else '#ERROR',
             'LCM': lambda values: np.lcm.reduce(np.array(values, dtype=int)) if values else '#ERROR',
             'FACT': lambda values: np.math.factorial(int(values[0])) if values else '#ERROR',
-            'RAND': lambda values: np.random.random(),
-            'RANDBETWEEN': lambda values: np.random.randint(values[0], values[1]+1) if len(values) >= 2 else '#ERROR',
+            'RAND': lambda values: self.rng.random(),
+            'RANDBETWEEN': lambda values: int(self.rng.integers(ceil(values[0]), floor(values[1]), endpoint=True)) if len(values) >= 2 else '#ERROR',
             'PI': lambda values: pi,
             'SIN': lambda values: sin(values[0]) if values else '#ERROR',
             'COS': lambda values: cos(values[0]) if values else '#ERROR',
@@ -173,7 +187,20 @@ class Calculator:
     
     def set_sheet_view(self, sheet_view):
         """Set the sheet view to work with"""
-        self.sheet_view = sheet_view
+        self.cell_source = sheet_view
+        
+    def set_cell_source(self, cell_source):
+        """Set the sheet (any CellSource) to read from and write results to"""
+        self.cell_source = cell_source
+        
+    @property
+    def sheet_view(self):
+        """The current cell source (kept under its original name for the GUI)"""
+        return self.cell_source
+        
+    @sheet_view.setter
+    def sheet_view(self, sheet_view):
+        self.cell_source = sheet_view
 
     def evaluate(self, formula, row, col):
         """Evaluate a formula in the context of the sheet"""
@@ -209,23 +236,8 @@ class Calculator:
         """Parse function arguments into values"""
         values = []
         
-        # Split by commas, but respect ranges like A1:B5
-        args = []
-        current_arg = ""
-        in_range = False
-        
-        for char in args_str:
-            if char == ',' and not in_range:
-                args.append(current_arg.strip())
-                current_arg = ""
-            elif char == ':':
-                in_range = True
-                current_arg += char
-            else:
-                current_arg += char
-        
-        if current_arg:
-            args.append(current_arg.strip())
+        # Split by commas; ranges like A1:B5 never contain one
+        args = [arg.strip() for arg in args_str.split(',') if arg.strip()]
         
         # Process each argument
         for arg in args:
@@ -250,7 +262,7 @@ class Calculator:
 
     def get_range_values(self, range_str, current_row, current_col):
         """Get all values in a range like A1:B5"""
-        if not self.sheet_view:
+        if not self.cell_source:
             return []
             
         range_parts = range_str.split(':')
@@ -290,31 +302,23 @@ class Calculator:
         
         values = []
         try:
-            for row in range(start_row, end_row + 1):
-                for col in range(start_col, end_col + 1):
-                    if (row < 0 or col < 0 or 
-                        row >= self.sheet_view.rowCount() or 
-                        col >= self.sheet_view.columnCount()):
-                        continue
+            n_rows = self.cell_source.row_count()
+            n_cols = self.cell_source.column_count()
+            for row in range(max(start_row, 0), min(end_row, n_rows - 1) + 1):
+                for col in range(max(start_col, 0), min(end_col, n_cols - 1) + 1):
+                    cell_value = self.cell_source.get_cell_value(row, col)
                     
-                    item = self.sheet_view.item(row, col)
-                    if not item:
+                    if cell_value is None or cell_value == '':
                         # Empty cell counts as 0 for math functions
                         values.append(0)
                         continue
                         
-                    cell_value = item.text()
-                    
-                    if not cell_value:  # Empty string
-                        values.append(0)
-                        continue
-                        
                     # Try to convert to number for calculation
                     try:
                         values.append(float(cell_value))
-                    except ValueError:
+                    except (ValueError, TypeError):
                         # For non-numeric values in numeric functions, use 0
-                        if not cell_value.startswith('='):
+                        if not str(cell_value).startswith('='):
                             values.append(0) 
         except Exception as e:
             print(f"Error processing range {range_str}: {e}")
@@ -323,8 +327,8 @@ class Calculator:
 
     def get_cell_value(self, cell_ref, current_row, current_col):
         """Get a cell's value from its reference"""
-        # Check if sheet_view is set
-        if not self.sheet_view:
+        # Check if a sheet is set
+        if not self.cell_source:
             return "#ERROR: No sheet available"
             
         match = self.cell_ref_pattern.match(cell_ref)
@@ -346,13 +350,13 @@ class Calculator:
         try:
             # Check if the row and column are within sheet bounds
             if (row < 0 or col < 0 or 
-                row >= self.sheet_view.table.rowCount() or 
-                col >= self.sheet_view.table.columnCount()):
+                row >= self.cell_source.row_count() or 
+                col >= self.cell_source.column_count()):
                 return "#ERROR: Cell reference out of bounds"
                 
-            return self.sheet_view.get_cell_value(row, col)
+            return self.cell_source.get_cell_value(row, col)
         except AttributeError:
-            # This will catch if sheet_view.table or sheet_view.get_cell_value doesn't exist
+            # This will catch if the cell source does not implement CellSource
             return "#ERROR: Unable to access sheet data"
         except Exception as e:
             return f"#ERROR: {str(e)}"
@@ -365,25 +369,53 @@ class Calculator:
                 # Replace named ranges with their actual cell references
                 expression = expression.replace(name, range_data['range'])
         
-        # Then replace cell references with their values
-        def replace_cell_ref(match):
-            cell_ref = match.group(0)
-            cell_value = self.get_cell_value(cell_ref, current_row, current_col)
-            if cell_value is None or cell_value == "":
-                return '0'
-            try:
-                return str(float(cell_value))
-            except ValueError:
-                return '0'  # Non-numeric cell values treated as 0
-        
-        # Replace all cell references with their values
-        numeric_expr = self.cell_ref_pattern.sub(replace_cell_ref, expression)
+        # Compile once per distinct expression; cell references become variables
+        code, refs = self._compile_expression(expression)
+        namespace = {f"_c{i}": self._numeric_cell_value(row, col) for i, (row, col) in enumerate(refs)}
         
         # Safely evaluate the expression
         try:
-            return eval(numeric_expr)
+            return eval(code, globals(), namespace)
         except Exception as e:
             raise ValueError(f"Invalid expression: {expression}")
+    
+    def _compile_expression(self, expression):
+        """Compile an expression into code plus the (row, col) cells it reads
+        
+        References are replaced by variables _c0, _c1, ... so the compiled code
+        can be reused with different cell values, and '^' becomes '**'.
+        """
+        cached = self.expression_cache.get(expression)
+        if cached is not None:
+            return cached
+            
+        refs = []
+        def to_variable(match):
+            refs.append((int(match.group(2)) - 1, self.column_name_to_index(match.group(1))))
+            return f"_c{len(refs) - 1}"
+            
+        template = self.dependency_ref_pattern.sub(to_variable, expression).replace('^', '**')
+        try:
+            code = compile(template, '<formula>', 'eval')
+        except SyntaxError:
+            raise ValueError(f"Invalid expression: {expression}")
+            
+        if len(self.expression_cache) >= self.EXPRESSION_CACHE_SIZE:
+            self.expression_cache.clear()
+        self.expression_cache[expression] = (code, refs)
+        return code, refs
+    
+    def _numeric_cell_value(self, row, col):
+        """A cell's value as a number; empty, text and out-of-range cells count as 0"""
+        if row < 0 or col < 0 or row >= self.cell_source.row_count() or col >= self.cell_source.column_count():
+            return 0
+        value = self.cell_source.get_cell_value(row, col)
+        if value is None or value == "":
+            return 0
+        try:
+            return float(value)
+        except (ValueError, TypeError):
+            return 0
 
     def validate_formula(self, formula):
         """Validate a formula's syntax"""
@@ -692,84 +724,269 @@ class Calculator:
 
     def recalculate_all(self):
         """Recalculate all formulas in the sheet"""
-        if not self.sheet_view:
+        if not self.cell_source:
             return
             
         # Clear cache
         self.formula_cache = {}
         
         # Get all cells with formulas
-        formula_cells = []
-        for row in range(self.sheet_view.table.rowCount()):
-            for col in range(self.sheet_view.table.columnCount()):
-                value = self.sheet_view.get_cell_value(row, col)
-                if value and value.startswith('='):
-                    formula_cells.append((row, col, value))
+        formula_cells = list(self.cell_source.iter_formula_cells())
         
         # Build dependency graph
         self.build_dependency_graph(formula_cells)
         
-        # Calculate in dependency order
-        evaluated_cells = set()
-        
-        # Helper function for topological sort
-        def evaluate_with_dependencies(row, col, formula):
-            cell_key = f"{row},{col}"
+        # Calculate in dependency order: every formula cell, each after the
+        # formula cells it references
+        for row, col in self.get_dependents(list(self.formula_cells)):
+            result = self.evaluate(self.formula_cells[(row, col)], row, col)
+            self.cell_source.set_cell_display_value(row, col, result)
             
-            # Skip if already evaluated
-            if cell_key in evaluated_cells:
-                return
-                
-            # Evaluate dependencies first
-            if cell_key in self.dependent_cells:
-                for dep_row, dep_col in self.dependent_cells[cell_key]:
-                    dep_formula = self.sheet_view.get_cell_value(dep_row, dep_col)
-                    if dep_formula and dep_formula.startswith('='):
-                        evaluate_with_dependencies(dep_row, dep_col, dep_formula)
-            
-            # Now evaluate this cell
-            result = self.evaluate(formula, row, col)
-            self.sheet_view.set_cell_display_value(row, col, result)
-            evaluated_cells.add(cell_key)
-        
-        # Evaluate all formulas in dependency order
-        for row, col, formula in formula_cells:
-            evaluate_with_dependencies(row, col, formula)
+        self._refresh_data_tables(None)
+        self._refresh_pivot_tables(None)
     
     def build_dependency_graph(self, formula_cells):
-        """Build a graph of cell dependencies"""
+        """Build a graph of cell dependencies
+        
+        Single-cell references are indexed in dependent_cells ("row,col" ->
+        dependent cells). Range references are kept as rectangles indexed by
+        column, so SUM(A1:A10000) costs one entry per column rather than one
+        per cell.
+        """
         self.dependent_cells = {}
+        self.range_dependents = {}
+        self.formula_cells = {}
+        self.graph_source = self.cell_source
         
         for row, col, formula in formula_cells:
-            cell_key = f"{row},{col}"
-            
-            # Extract cell references from the formula
-            refs = self.extract_cell_references(formula)
+            self.formula_cells[(row, col)] = formula
+            cells, ranges = self.extract_references(formula)
             
             # Add dependencies
-            for ref_row, ref_col in refs:
+            for ref_row, ref_col in cells:
                 dep_key = f"{ref_row},{ref_col}"
                 if dep_key not in self.dependent_cells:
                     self.dependent_cells[dep_key] = []
                 self.dependent_cells[dep_key].append((row, col))
+                
+            for start_row, start_col, end_row, end_col in ranges:
+                for ref_col in range(start_col, end_col + 1):
+                    self.range_dependents.setdefault(ref_col, []).append((start_row, end_row, (row, col)))
+    
+    def extract_references(self, formula):
+        """Extract the references in a formula
+        
+        Returns:
+            Tuple (cells, ranges): cells is a list of (row, col) for single
+            references, ranges a list of (start_row, start_col, end_row, end_col)
+        """
+        ranges = []
+        for match in self.range_ref_pattern.finditer(formula):
+            start_col_name, start_row, end_col_name, end_row = match.groups()
+            start_col = self.column_name_to_index(start_col_name)
+            end_col = self.column_name_to_index(end_col_name)
+            start_row, end_row = int(start_row) - 1, int(end_row) - 1
+            ranges.append((min(start_row, end_row), min(start_col, end_col),
+                           max(start_row, end_row), max(start_col, end_col)))
+            
+        # Single references, once the ranges are taken out
+        cells = []
+        for match in self.dependency_ref_pattern.finditer(self.range_ref_pattern.sub(' ', formula)):
+            col_name, row_num = match.groups()
+            cells.append((int(row_num) - 1, self.column_name_to_index(col_name)))
+            
+        return cells, ranges
     
     def extract_cell_references(self, formula):
-        """Extract cell references from a formula"""
-        refs = []
+        """Extract cell references from a formula, expanding ranges into their cells"""
+        cells, ranges = self.extract_references(formula)
+        refs = list(cells)
+        for start_row, start_col, end_row, end_col in ranges:
+            refs.extend((row, col) for row in range(start_row, end_row + 1)
+                        for col in range(start_col, end_col + 1))
+        return refs
+    
+    def _direct_dependents(self, row, col):
+        """Formula cells that reference a cell directly or through a range"""
+        dependents = list(self.dependent_cells.get(f"{row},{col}", ()))
+        for start_row, end_row, dependent in self.range_dependents.get(col, ()):
+            if start_row <= row <= end_row:
+                dependents.append(dependent)
+        return dependents
+    
+    def get_dependents(self, cells):
+        """Get every formula cell affected by changes to the given cells
         
-        # This is a simplified extractor - a real one would parse the formula properly
-        for match in re.finditer(r'[A-Z]+\d+', formula):
-            cell_ref = match.group(0)
-            col_name = ''.join(filter(str.isalpha, cell_ref))
-            row_num = int(''.join(filter(str.isdigit, cell_ref)))
+        Args:
+            cells: Iterable of (row, col) cells that changed
             
-            # Convert to 0-based indices
-            col_idx = self.column_name_to_index(col_name)
-            row_idx = row_num - 1
+        Returns:
+            List of (row, col) formula cells in evaluation order; changed cells
+            that hold formulas themselves come before their dependents
+        """
+        affected = {cell for cell in cells if cell in self.formula_cells}
+        stack = list(cells)
+        while stack:
+            for dependent in self._direct_dependents(*stack.pop()):
+                if dependent not in affected:
+                    affected.add(dependent)
+                    stack.append(dependent)
+                    
+        # Topological order within the affected cells (Kahn's algorithm)
+        indegree = {cell: 0 for cell in affected}
+        edges = {}
+        for cell in affected:
+            for dependent in self._direct_dependents(*cell):
+                if dependent in affected and dependent != cell:
+                    edges.setdefault(cell, []).append(dependent)
+                    indegree[dependent] += 1
+                    
+        ordered = [cell for cell, degree in indegree.items() if degree == 0]
+        for cell in ordered:
+            for dependent in edges.get(cell, ()):
+                indegree[dependent] -= 1
+                if indegree[dependent] == 0:
+                    ordered.append(dependent)
+                    
+        # Cells on a circular reference are evaluated last, in any order
+        if len(ordered) < len(affected):
+            placed = set(ordered)
+            ordered.extend(cell for cell in affected if cell not in placed)
+        return ordered
+    
+    def recalculate_cells(self, changed_cells):
+        """Recalculate only the formulas affected by changes to some cells
+        
+        The dependency graph built by recalculate_all is reused; it is rebuilt
+        when the sheet changed or when one of the changed cells gained, lost
+        or edited a formula.
+        
+        Args:
+            changed_cells: Iterable of (row, col) cells whose contents changed
             
-            refs.append((row_idx, col_idx))
+        Returns:
+            List of (row, col) formula cells that were recalculated
+        """
+        if not self.cell_source:
+            return []
             
-        return refs
+        changed_cells = list(changed_cells)
+        stale = getattr(self, 'graph_source', None) is not self.cell_source
+        for row, col in changed_cells:
+            raw = self.cell_source.get_raw_value(row, col)
+            formula = raw if isinstance(raw, str) and raw.startswith('=') else None
+            if formula != self.formula_cells.get((row, col)):
+                stale = True
+        if stale:
+            self.build_dependency_graph(list(self.cell_source.iter_formula_cells()))
+            
+        ordered = self.get_dependents(changed_cells)
+        for row, col in ordered:
+            result = self.evaluate(self.formula_cells[(row, col)], row, col)
+            self.cell_source.set_cell_display_value(row, col, result)
+            
+        changed = set(changed_cells) | set(ordered)
+        refreshed = self._refresh_data_tables(changed)
+        return ordered + refreshed + self._refresh_pivot_tables(changed | set(refreshed))
+    
+    def add_data_table(self, table, workers=1):
+        """Fill a DataTable on the current sheet and keep it up to date
+        
+        Returns:
+            The table's results, as returned by DataTable.compute
+        """
+        table.source = self.cell_source
+        table.workers = workers
+        self.data_tables.append(table)
+        self._refresh_data_tables(None, [table])
+        return table.results
+    
+    def remove_data_table(self, table):
+        """Stop updating a data table; its last results stay in the sheet"""
+        if table in self.data_tables:
+            self.data_tables.remove(table)
+    
+    def _refresh_data_tables(self, changed_cells, tables=None):
+        """Refill the data tables on the current sheet that changed cells affect
+        
+        Args:
+            changed_cells: Set of (row, col) cells that changed, or None to
+                refresh every table
+            tables: Tables to consider (defaults to all registered tables)
+            
+        Returns:
+            List of formula cells recalculated because they read table results
+        """
+        written = []
+        for table in tables if tables is not None else self.data_tables:
+            if table.source is not self.cell_source:
+                continue
+            if changed_cells is None or table.is_affected(changed_cells):
+                written.extend(table.refresh(self, table.workers))
+        return self._recalculate_dependents(written)
+    
+    def add_pivot_table(self, pivot):
+        """Write a LivePivot on the current sheet and keep it up to date
+        
+        Returns:
+            The rows written, as text
+        """
+        pivot.source = self.cell_source
+        self.pivot_tables.append(pivot)
+        self._refresh_pivot_tables(None, [pivot])
+        return pivot.table
+    
+    def remove_pivot_table(self, pivot):
+        """Stop updating a pivot table; its last output stays in the sheet"""
+        if pivot in self.pivot_tables:
+            self.pivot_tables.remove(pivot)
+    
+    def _refresh_pivot_tables(self, changed_cells, pivots=None):
+        """Apply changed cells to the pivot tables on the current sheet
+        
+        Args:
+            changed_cells: Set of (row, col) cells that changed, or None to
+                rebuild every pivot from its source
+            pivots: Pivots to consider (defaults to all registered pivots)
+            
+        Returns:
+            List of formula cells recalculated because they read pivot output
+        """
+        written = []
+        for pivot in pivots if pivots is not None else self.pivot_tables:
+            if pivot.source is self.cell_source:
+                written.extend(pivot.refresh(changed_cells))
+        return self._recalculate_dependents(written)
+    
+    def _recalculate_dependents(self, written):
+        """Recalculate the formulas that read cells written by a data or pivot table"""
+        if not written:
+            return []
+            
+        ordered = self.get_dependents(written)
+        for row, col in ordered:
+            result = self.evaluate(self.formula_cells[(row, col)], row, col)
+            self.cell_source.set_cell_display_value(row, col, result)
+        return ordered
+    
+    def evaluate_batch(self, input_cells, input_values, output_cells, workers=1):
+        """Evaluate output cells for many combinations of input values
+        
+        Only the formulas between the inputs and the outputs are evaluated,
+        vectorized across scenarios; the sheet itself is left untouched.
+        
+        Args:
+            input_cells: Cells to vary, as 'A1' references or (row, col)
+            input_values: Array-like of shape (scenarios, len(input_cells))
+            output_cells: Cells to read for each scenario
+            workers: Number of processes to split the scenarios across
+            
+        Returns:
+            NumPy array of shape (scenarios, len(output_cells)); errors and
+            text results are NaN
+        """
+        from .scenarios import ScenarioModel
+        return ScenarioModel(self, input_cells, output_cells).evaluate(input_values, workers)
     
     def column_name_to_index(self, name):
         """Convert column name (A, B, AA, etc.) to index"""
@@ -1,9 +1,8 @@
-import matplotlib.pyplot as plt
 import numpy as np
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
-import mplfinance as mpf
 from datetime import datetime
-import pandas as pd
+
+# matplotlib, mplfinance and pandas are imported on first use so that creating
+# the engine at startup does not pay for them
 
 class ChartEngine:
     def __init__(self):
@@ -36,6 +35,8 @@ class ChartEngine:
         else:
             data_array = data
             
+        import matplotlib.pyplot as plt
+        
         # Create figure
         fig, ax = plt.subplots(figsize=(10, 6))
         
@@ -162,7 +163,7 @@ class ChartEngine:
             ax.set_ylabel(headers[1] if len(headers) > 1 else "Y")
             
             # Add a colorbar legend for bubble sizes
-            plt.colorbar(scatter, ax=ax, label=headers[2] if len(headers) > 2 else "Size")
+            ax.figure.colorbar(scatter, ax=ax, label=headers[2] if len(headers) > 2 else "Size")
             
         else:
             raise ValueError("Bubble chart requires at least 3 columns of data (X, Y, Size)")
@@ -171,6 +172,9 @@ class ChartEngine:
         
     def _create_stock_chart(self, data_array, headers, chart_title):
         """Create a stock (OHLC) chart"""
+        import mplfinance as mpf
+        import pandas as pd
+        
         if data_array.shape[1] < 4:
             raise ValueError("Stock chart requires at least 4 columns (Date, Open, High, Low, Close)")
         
@@ -234,4 +238,5 @@ class ChartEngine:
         Returns:
             FigureCanvasQTAgg widget
         """
+        from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
         return FigureCanvasQTAgg(fig)
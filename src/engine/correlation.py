@@ -0,0 +1,101 @@
+import numpy as np
+
+from ..utils.config import CORRELATION_BLOCK_SIZE
+
+CORRELATION_METHODS = ('pearson', 'spearman')
+
+def _ranks(x):
+    """Average ranks within each column; missing values stay NaN"""
+    import pandas as pd
+    return pd.DataFrame(x).rank(method='average').to_numpy()
+
+def _column_means(x, present):
+    counts = present.sum(axis=0)
+    sums = np.where(present, x, 0.0).sum(axis=0)
+    return np.divide(sums, counts, out=np.zeros(x.shape[1]), where=counts > 0)
+
+def correlation_matrix(data, method='pearson', p_values=False, min_periods=2, block_size=None, progress=None):
+    """Correlation coefficients of every pair of columns
+
+    Missing values (NaN) are excluded pair by pair: each coefficient uses
+    the rows where both columns have a value. The sums it needs come from
+    matrix products of the value and missing-value masks, computed for
+    blocks of columns at a time so the working set stays bounded for wide
+    selections. For Pearson this matches DataFrame.corr. For Spearman,
+    each column is ranked once over all its values rather than re-ranked
+    for every pair, so the coefficient is exact when nothing is missing
+    and an approximation of DataFrame.corr('spearman') otherwise.
+
+    Args:
+        data: Array of rows x columns, NaN for missing values
+        method: 'pearson' or 'spearman'
+        p_values: Also compute two-sided p-values (t test on n - 2 degrees
+            of freedom)
+        min_periods: Fewest shared rows a pair needs to get a coefficient
+        block_size: Columns per block (defaults to CORRELATION_BLOCK_SIZE)
+        progress: Optional callback receiving the fraction of blocks done
+
+    Returns:
+        Dictionary with 'r' (columns x columns, NaN where undefined),
+        'observations' (shared rows per pair) and 'p_values' (or None)
+    """
+    if method not in CORRELATION_METHODS:
+        raise ValueError(f"Unsupported correlation method: {method}")
+    x = np.asarray(data, dtype=float)
+    if x.ndim == 1:
+        x = x.reshape(-1, 1)
+    rows, columns = x.shape
+    block_size = block_size or CORRELATION_BLOCK_SIZE
+    if method == 'spearman':
+        x = _ranks(x)
+
+    present = ~np.isnan(x)
+    complete = present.all()
+    # Centering on each column's mean keeps the sums below from cancelling
+    values = np.where(present, x - _column_means(x, present), 0.0)
+    if complete:
+        # Nothing missing: unit-length columns need a single product per block
+        with np.errstate(invalid='ignore', divide='ignore'):
+            values /= np.sqrt(np.einsum('ij,ij->j', values, values))
+    else:
+        mask = present.astype(float)
+        squares = values * values
+
+    r = np.empty((columns, columns))
+    observations = np.empty((columns, columns))
+    starts = range(0, columns, block_size)
+    blocks = [(a, b) for a in starts for b in starts if b >= a]
+    for done, (a, b) in enumerate(blocks, 1):
+        first, second = slice(a, a + block_size), slice(b, b + block_size)
+        if complete:
+            block = values[:, first].T @ values[:, second]
+            shared = np.full(block.shape, float(rows))
+        else:
+            shared = mask[:, first].T @ mask[:, second]
+            sum_a = values[:, first].T @ mask[:, second]
+            sum_b = mask[:, first].T @ values[:, second]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                covariance = values[:, first].T @ values[:, second] - sum_a * sum_b / shared
+                variance_a = squares[:, first].T @ mask[:, second] - sum_a * sum_a / shared
+                variance_b = mask[:, first].T @ squares[:, second] - sum_b * sum_b / shared
+                block = covariance / np.sqrt(variance_a * variance_b)
+        r[first, second] = block
+        r[second, first] = block.T
+        observations[first, second] = shared
+        observations[second, first] = shared.T
+        if progress:
+            progress(done / len(blocks))
+
+    np.clip(r, -1.0, 1.0, out=r)
+    r[observations < max(min_periods, 2)] = np.nan
+    diagonal = np.diagonal(r).copy()
+    np.fill_diagonal(r, np.where(np.isnan(diagonal), np.nan, 1.0))
+    result = {'method': method, 'r': r, 'observations': observations.astype(int), 'p_values': None}
+
+    if p_values:
+        from scipy import stats
+        df = observations - 2
+        with np.errstate(invalid='ignore', divide='ignore'):
+            t = r * np.sqrt(df / ((1 - r) * (1 + r)))
+            result['p_values'] = np.where(df > 0, 2 * stats.t.sf(np.abs(t), df), np.nan)
+    return result
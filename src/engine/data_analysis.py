@@ -1,10 +1,13 @@
 import numpy as np
-import pandas as pd
-import scipy.stats as stats
-from sklearn.linear_model import LinearRegression
-import matplotlib.pyplot as plt
 from datetime import datetime
 
+from .forecasting import fit_forecast, project, smooth
+from .regression import fit_many, multiple_regression
+from .statistics import StreamingStatistics, numeric_values
+
+# scipy and matplotlib take seconds to import, so they are
+# imported inside the methods that use them rather than at application startup
+
 class RegressionAnalysis:
     def __init__(self):
         """Initialize regression analysis tools"""
@@ -24,40 +27,55 @@ class RegressionAnalysis:
             return {'error': 'Insufficient or mismatched data'}
             
         try:
-            # Reshape X for sklearn
-            X = np.array(x_data).reshape(-1, 1)
-            y = np.array(y_data)
-            
-            # Perform linear regression
-            model = LinearRegression()
-            model.fit(X, y)
-            
-            # Calculate predictions
-            y_pred = model.predict(X)
-            
-            # Calculate statistics
-            slope = model.coef_[0]
-            intercept = model.intercept_
-            
-            # R-squared
-            r_squared = model.score(X, y)
-            
-            # Other statistics using scipy.stats.linregress
-            slope_alt, intercept_alt, r_value, p_value, std_err = stats.linregress(x_data, y_data)
+            # One least-squares fit gives the coefficients and their statistics
+            results = multiple_regression(x_data, y_data)
+            intercept, slope = results['coefficients']
+            r_value = float(np.sign(slope) * np.sqrt(max(results['r_squared'], 0.0)))
             
             return {
                 'slope': slope,
                 'intercept': intercept,
-                'r_squared': r_squared,
+                'r_squared': results['r_squared'],
                 'r_value': r_value,
-                'p_value': p_value,
-                'std_err': std_err,
-                'predictions': y_pred.tolist(),
+                'p_value': results['p_values'][1],
+                'std_err': results['std_errors'][1],
+                'predictions': results['predictions'],
                 'equation': f"y = {slope:.6f}x + {intercept:.6f}"
             }
         except Exception as e:
             return {'error': str(e)}
     
+    def multiple_regression(self, x_data, y_data):
+        """Perform least-squares regression on several independent variables.
+        
+        Args:
+            x_data: Array of independent variable values, one column per variable
+            y_data: List or array of dependent variable values
+            
+        Returns:
+            Dictionary with coefficients (intercept first), standard errors,
+            t and p values, R-squared and adjusted R-squared
+        """
+        try:
+            return multiple_regression(x_data, y_data)
+        except Exception as e:
+            return {'error': str(e)}
+    
+    def batch_regression(self, x_data, y_columns):
+        """Fit many dependent variables against the same independent variables.
+        
+        Args:
+            x_data: Array of independent variable values, one column per variable
+            y_columns: Array of dependent variable values, one column per series
+            
+        Returns:
+            Dictionary of arrays with one column per series (see regression.fit_many)
+        """
+        try:
+            return fit_many(x_data, y_columns)
+        except Exception as e:
+            return {'error': str(e)}
+    
     def generate_regression_chart(self, x_data, y_data, results):
         """Generate a chart showing data points and regression line.
         
@@ -70,6 +88,8 @@ class RegressionAnalysis:
             Matplotlib figure object
         """
         try:
+            import matplotlib.pyplot as plt
+            
             fig, ax = plt.subplots(figsize=(10, 6))
             
             # Plot the scatter points
@@ -111,35 +131,20 @@ class DescriptiveStatistics:
         Returns:
             Dictionary with statistics
         """
-        if not data or len(data) < 1:
+        if data is None or len(data) < 1:
             return {'error': 'No data provided'}
             
         try:
-            data_array = np.array(data, dtype=float)
-            
-            # Basic statistics
-            stats_dict = {
-                'count': len(data_array),
-                'mean': np.mean(data_array),
-                'median': np.median(data_array),
-                'mode': stats.mode(data_array, keepdims=False)[0],
-                'std_dev': np.std(data_array, ddof=1),
-                'variance': np.var(data_array, ddof=1),
-                'min': np.min(data_array),
-                'max': np.max(data_array),
-                'range': np.max(data_array) - np.min(data_array),
-                'sum': np.sum(data_array),
-                'quartile_1': np.percentile(data_array, 25),
-                'quartile_2': np.percentile(data_array, 50),  # Same as median
-                'quartile_3': np.percentile(data_array, 75),
-                'iqr': np.percentile(data_array, 75) - np.percentile(data_array, 25)
-            }
-            
-            # Add higher moments
-            if len(data_array) > 1:
-                stats_dict['skewness'] = stats.skew(data_array)
-                stats_dict['kurtosis'] = stats.kurtosis(data_array)
-            
+            # One pass over the values instead of a separate pass per statistic
+            numbers = numeric_values(data)
+            stats = StreamingStatistics()
+            stats.update(numbers)
+            stats_dict = stats.result()
+            if len(numbers):
+                # The values are all in memory, so the quartiles can be exact
+                q1, median, q3 = np.percentile(numbers, [25, 50, 75])
+                stats_dict.update({'median': median, 'quartile_1': q1, 'quartile_2': median,
+                                   'quartile_3': q3, 'iqr': q3 - q1})
             return stats_dict
             
         except Exception as e:
@@ -156,6 +161,9 @@ class DescriptiveStatistics:
             Tuple of Matplotlib figure objects (histogram, boxplot)
         """
         try:
+            import matplotlib.pyplot as plt
+            from scipy.stats import gaussian_kde, norm
+            
             data_array = np.array(data, dtype=float)
             
             # Create histogram with normal curve overlay
@@ -168,12 +176,12 @@ class DescriptiveStatistics:
             # Add a kernel density estimate
             x_min, x_max = hist_ax.get_xlim()
             x = np.linspace(x_min, x_max, 100)
-            kde = stats.gaussian_kde(data_array)
+            kde = gaussian_kde(data_array)
             hist_ax.plot(x, kde(x), 'r-', lw=2, label='KDE')
             
             # Create a normal distribution curve
             if 'mean' in stats and 'std_dev' in stats:
-                hist_ax.plot(x, stats.norm.pdf(x, stats['mean'], stats['std_dev']), 
+                hist_ax.plot(x, norm.pdf(x, stats['mean'], stats['std_dev']), 
                              'k--', lw=1.5, label='Normal Distribution')
             
             # Add annotations for key statistics
@@ -229,26 +237,18 @@ class TimeSeriesForecasting:
             
         try:
             data_array = np.array(data, dtype=float)
+            state = smooth(data_array.reshape(-1, 1), 'simple', alpha)
             
-            # Initialize forecast array with first value
-            forecast = [data_array[0]]
-            
-            # Calculate forecast for historical periods
-            for i in range(1, len(data_array)):
-                forecast.append(alpha * data_array[i] + (1 - alpha) * forecast[i-1])
-            
-            # Forecast future periods
-            future_forecast = []
-            last_value = forecast[-1]
+            # The smoothed value after each period is the next period's forecast
+            forecast = np.append(state['fitted'][1:, 0], state['level'][0])
             
-            for _ in range(forecast_periods):
-                last_value = alpha * last_value + (1 - alpha) * last_value  # In practice, this equals last_value
-                future_forecast.append(last_value)
+            # Simple smoothing has no trend or season, so the forecast is flat
+            future_forecast = project(state, forecast_periods)[:, 0]
             
             return {
                 'original_data': data_array.tolist(),
-                'historical_forecast': forecast,
-                'future_forecast': future_forecast,
+                'historical_forecast': forecast.tolist(),
+                'future_forecast': future_forecast.tolist(),
                 'alpha': alpha,
                 'periods': forecast_periods
             }
@@ -256,6 +256,25 @@ class TimeSeriesForecasting:
         except Exception as e:
             return {'error': str(e)}
     
+    def forecast_series(self, data, method='holt', forecast_periods=5, season_length=None, workers=1):
+        """Fit exponential smoothing to many series at once and forecast them.
+        
+        Args:
+            data: 2D array of values, rows = periods, columns = series
+            method: 'simple', 'holt' or 'holt_winters'
+            forecast_periods: Number of periods to forecast
+            season_length: Periods per season (Holt-Winters)
+            workers: Processes to fit the series on
+            
+        Returns:
+            Dictionary with fitted parameters and forecasts per series
+            (see forecasting.fit_forecast)
+        """
+        try:
+            return fit_forecast(data, method, forecast_periods, season_length, workers=workers)
+        except Exception as e:
+            return {'error': str(e)}
+    
     def generate_forecast_chart(self, results):
         """Generate a chart showing original data and forecast.
         
@@ -266,6 +285,8 @@ class TimeSeriesForecasting:
             Matplotlib figure object
         """
         try:
+            import matplotlib.pyplot as plt
+            
             fig, ax = plt.subplots(figsize=(12, 6))
             
             # Extract data
@@ -0,0 +1,108 @@
+import numpy as np
+from .scenarios import ScenarioModel, to_cell
+
+class DataTable:
+    """Excel-style data table (What-If Analysis > Data Table).
+
+    The table occupies a block of the sheet. Its first row and first column
+    hold the headers, and the interior receives the results:
+
+    - Column input only: input values down the first column, formulas to
+      report across the first row.
+    - Row input only: input values across the first row, formulas to report
+      down the first column.
+    - Both inputs: a single formula in the top-left corner, row input values
+      across the first row and column input values down the first column.
+
+    Every grid point is one scenario of a ScenarioModel, so the whole table is
+    evaluated in one vectorized pass over the formulas between the inputs
+    and the reported cells. The results are written back as one block.
+    """
+
+    def __init__(self, bounds, row_input=None, column_input=None):
+        """Define a data table
+
+        Args:
+            bounds: (top, left, bottom, right) of the table, 0-based inclusive
+            row_input: Cell that takes the values in the first row
+            column_input: Cell that takes the values in the first column
+        """
+        if row_input is None and column_input is None:
+            raise ValueError("A data table needs a row input cell, a column input cell, or both")
+        top, left, bottom, right = bounds
+        if bottom <= top or right <= left:
+            raise ValueError("A data table needs at least two rows and two columns")
+        self.bounds = (top, left, bottom, right)
+        self.row_input = None if row_input is None else to_cell(row_input)
+        self.column_input = None if column_input is None else to_cell(column_input)
+        self.source = None  # Cell source the table was registered on
+        self.workers = 1  # Processes used when the table is refreshed
+        self.results = None  # Last computed interior
+        self.watched = set()  # Cells whose changes make the table stale
+
+    def _header_values(self, source, cells):
+        values = []
+        for row, col in cells:
+            try:
+                values.append(float(source.get_cell_value(row, col)))
+            except (ValueError, TypeError):
+                values.append(np.nan)
+        return np.array(values)
+
+    def compute(self, calculator, workers=1):
+        """Evaluate the table without writing it
+
+        Args:
+            calculator: Calculator attached to the sheet holding the table
+            workers: Processes to split the grid points across
+
+        Returns:
+            List of rows for the table interior; NaN marks errors
+        """
+        source = calculator.cell_source
+        top, left, bottom, right = self.bounds
+        first_row = [(top, col) for col in range(left + 1, right + 1)]
+        first_column = [(row, left) for row in range(top + 1, bottom + 1)]
+
+        if self.row_input is not None and self.column_input is not None:
+            row_values = self._header_values(source, first_row)
+            column_values = self._header_values(source, first_column)
+            inputs, outputs, headers = [self.row_input, self.column_input], [(top, left)], first_row + first_column
+            scenarios = np.column_stack([np.tile(row_values, len(column_values)),
+                                         np.repeat(column_values, len(row_values))])
+        elif self.column_input is not None:
+            inputs, outputs, headers = [self.column_input], first_row, first_column
+            scenarios = self._header_values(source, first_column)
+        else:
+            inputs, outputs, headers = [self.row_input], first_column, first_row
+            scenarios = self._header_values(source, first_row)
+
+        model = ScenarioModel(calculator, inputs, outputs)
+        self.watched = set(model.base) | {cell for cell, _ in model.order} | set(headers) | set(outputs)
+        results = model.evaluate(scenarios.reshape(-1, len(inputs)), workers)
+
+        if len(outputs) == 1 and len(inputs) == 2:
+            grid = results.reshape(len(first_column), len(first_row))
+        elif self.column_input is not None:
+            grid = results
+        else:
+            grid = results.T
+        return grid.tolist()
+
+    def refresh(self, calculator, workers=1):
+        """Evaluate the table and write the results into its interior
+
+        Returns:
+            List of (row, col) cells written
+        """
+        top, left, bottom, right = self.bounds
+        self.results = self.compute(calculator, workers)
+        # Computed output, rewritten after edits: not an undo step of its own
+        calculator.cell_source.set_cell_values(top + 1, left + 1, [
+            ["#ERROR" if np.isnan(value) else str(value) for value in row] for row in self.results
+        ], record=False)
+        return [(row, col) for row in range(top + 1, bottom + 1) for col in range(left + 1, right + 1)]
+
+    def is_affected(self, cells):
+        """Check whether changes to some cells can change the table's results"""
+        return not self.watched.isdisjoint(cells)
@@ -0,0 +1,101 @@
+import numpy as np
+from ..utils.helpers import cell_text
+
+DEDUP_KEEP = ('first', 'last')
+
+def key_codes(values, match_case=True):
+    """Dictionary-encode one key column by the text its cells show
+
+    Args:
+        values: The column's cell values
+        match_case: Treat "Paris" and "paris" as different values
+
+    Returns:
+        Tuple (codes, count): an integer code per row, equal for rows showing
+        the same text, and the number of distinct codes
+    """
+    import pandas as pd
+
+    # Convert each distinct cell value once, then map the results to the rows
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+    uniques = uniques.to_numpy(dtype=object)
+    if (codes < 0).any():
+        # Missing values (None, NaN) come back as -1; give them a code of their own
+        uniques = np.append(uniques, None)
+        codes[codes < 0] = len(uniques) - 1
+    if match_case and all(type(value) is str for value in uniques):
+        # Distinct strings already show distinct text
+        return codes, len(uniques)
+    texts = [cell_text(value) if match_case else cell_text(value).lower() for value in uniques]
+    text_codes, distinct = pd.factorize(pd.Series(texts, dtype=object))
+    return text_codes[codes], len(distinct)
+
+def duplicate_mask(columns, keep='first', match_case=True):
+    """Flag the rows that repeat another row on every key column
+
+    Args:
+        columns: Key columns, each a sequence of cell values
+        keep: 'first' keeps the first row of each group of duplicates,
+            'last' keeps the last one
+        match_case: Compare text case-sensitively
+
+    Returns:
+        Boolean array, True for the rows to remove
+    """
+    import pandas as pd
+
+    if keep not in DEDUP_KEEP:
+        raise ValueError(f"Unsupported keep option: {keep}")
+    if not columns:
+        raise ValueError("At least one key column is required")
+
+    # Fold the key columns into one integer per row, re-encoding after each
+    # column so the combined codes stay below the number of rows
+    row_keys = np.zeros(len(columns[0]), dtype=np.int64)
+    for values in columns:
+        codes, count = key_codes(values, match_case)
+        row_keys, _ = pd.factorize(row_keys * count + codes)
+    return pd.Series(row_keys).duplicated(keep=keep).to_numpy()
+
+def remove_duplicates(source, bounds, key_columns=None, keep='first', has_header=False, match_case=True):
+    """Remove the rows of a block that repeat another row on the key columns
+
+    The rows that remain move up, in their original order, and the rows
+    freed at the bottom of the block are cleared.
+
+    Args:
+        source: CellSource holding the block
+        bounds: (top, left, bottom, right) of the block, 0-based inclusive
+        key_columns: Sheet columns inside the block that identify a row
+            (defaults to every column of the block)
+        keep: 'first' or 'last' row of each group of duplicates
+        has_header: Leave the block's first row where it is
+        match_case: Compare text case-sensitively
+
+    Returns:
+        Dictionary with 'rows' (rows examined), 'duplicates' (rows removed),
+        'unique' (rows left) and 'changed_rows' (sheet rows whose contents
+        changed)
+    """
+    top, left, bottom, right = bounds
+    if has_header:
+        top += 1
+    if key_columns is None:
+        key_columns = list(range(left, right + 1))
+    for col in key_columns:
+        if not left <= col <= right:
+            raise ValueError("Key columns must be columns of the selected range")
+    rows = max(bottom - top + 1, 0)
+    if rows < 2:
+        return {'rows': rows, 'duplicates': 0, 'unique': rows, 'changed_rows': []}
+
+    mask = duplicate_mask([source.get_column_values(col, top, bottom) for col in key_columns], keep, match_case)
+    duplicates = int(mask.sum())
+    changed_rows = []
+    if duplicates:
+        kept = np.flatnonzero(~mask)
+        source.compact_rows(top, left, bottom, right, kept)
+        # Every row from the first one removed down to the bottom changes
+        changed_rows = list(range(top + int(np.argmax(mask)), bottom + 1))
+
+    return {'rows': rows, 'duplicates': duplicates, 'unique': rows - duplicates, 'changed_rows': changed_rows}
@@ -0,0 +1,216 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from ..utils.config import FORECAST_SERIES_CHUNK
+
+FORECAST_METHODS = ('simple', 'holt', 'holt_winters')
+
+# Coarse grid searched for every free smoothing parameter, then refined
+# around each series' best point with a halving step
+_ALPHA_GRID = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9)
+_TREND_GRID = (0.05, 0.15, 0.3, 0.5)
+_REFINE_STEPS = (0.05, 0.025, 0.0125)
+_PARAMETER_RANGE = (0.001, 0.999)
+
+def _first_values(y):
+    """The first observed value of each series (NaN for empty series)"""
+    first = np.argmax(~np.isnan(y), axis=0)
+    return y[first, np.arange(y.shape[1])]
+
+def _initial_state(y, method, season_length):
+    """Starting level, trend and seasonal offsets (season_length x series)"""
+    with np.errstate(invalid='ignore'):
+        if method == 'holt_winters':
+            import warnings
+            with warnings.catch_warnings():
+                # Series with an empty first season stay NaN
+                warnings.simplefilter('ignore', RuntimeWarning)
+                first = np.nanmean(y[:season_length], axis=0)
+                second = np.nanmean(y[season_length:2 * season_length], axis=0)
+            trend = np.nan_to_num((second - first) / season_length)
+            # A season's mean is the level at its middle; the offsets are measured
+            # from the trend line through it, and the state starts one step
+            # before the first value so that value is forecast, not given
+            middle = (season_length - 1) / 2
+            seasonal = np.nan_to_num(y[:season_length] - first - (np.arange(season_length)[:, None] - middle) * trend)
+            return first - (middle + 1) * trend, trend, seasonal
+        level = _first_values(y)
+        if method == 'holt' and len(y) > 1:
+            # Start one step before the first value, so its forecast is that value
+            trend = np.nan_to_num(y[1] - y[0])
+            return level - trend, trend, None
+        return level, np.zeros(y.shape[1]), None
+
+def smooth(y, method, alpha, beta=0.0, gamma=0.0, season_length=1, keep_fitted=True):
+    """Run exponential smoothing over every series of a block at once
+
+    Each time step updates all series together (the error-correction form
+    of the additive model: level, trend and season each move by a share of
+    the one-step forecast error). Missing values leave the state unchanged.
+
+    Args:
+        y: Block of values, rows = time, columns = series (NaN for missing)
+        method: One of FORECAST_METHODS
+        alpha: Level smoothing, one value or one per series
+        beta: Trend smoothing (holt and holt_winters)
+        gamma: Seasonal smoothing (holt_winters)
+        season_length: Periods per season (holt_winters)
+        keep_fitted: Return the one-step forecasts as well as the errors
+
+    Returns:
+        Dictionary with 'sse' and 'observations' per series, the final
+        'level', 'trend' and 'seasonal' state, and 'fitted' (the one-step
+        forecast of every value) when keep_fitted is set
+    """
+    if method not in FORECAST_METHODS:
+        raise ValueError(f"Unsupported forecast method: {method}")
+    periods, series = y.shape
+    if method != 'holt_winters':
+        season_length = 1
+    alpha = np.broadcast_to(np.asarray(alpha, dtype=float), (series,))
+    trend_gain = alpha * (np.asarray(beta, dtype=float) if method != 'simple' else 0.0)
+    season_gain = (1 - alpha) * (np.asarray(gamma, dtype=float) if method == 'holt_winters' else 0.0)
+
+    level, trend, seasonal = _initial_state(y, method, season_length)
+    if seasonal is None:
+        seasonal = np.zeros((1, series))
+    fitted = np.empty((periods, series)) if keep_fitted else None
+    sse = np.zeros(series)
+    for t in range(periods):
+        position = t % season_length
+        season = seasonal[position]
+        forecast = level + trend + season
+        if keep_fitted:
+            fitted[t] = forecast
+        error = y[t] - forecast
+        error[np.isnan(error)] = 0.0
+        sse += error * error
+        level = forecast - season + alpha * error
+        trend = trend + trend_gain * error
+        seasonal[position] = season + season_gain * error
+    return {'sse': sse, 'observations': np.count_nonzero(~np.isnan(y), axis=0),
+            'level': level, 'trend': trend, 'seasonal': seasonal, 'fitted': fitted,
+            'season_start': periods % season_length}
+
+def project(state, periods):
+    """Forecast the periods after the end of the data from a smoothing state
+
+    Returns:
+        Array of periods x series
+    """
+    steps = np.arange(1, periods + 1)[:, None]
+    seasonal = state['seasonal']
+    positions = (state['season_start'] + steps[:, 0] - 1) % len(seasonal)
+    return state['level'] + steps * state['trend'] + seasonal[positions]
+
+def _free_parameters(method, fixed):
+    names = {'simple': ('alpha',), 'holt': ('alpha', 'beta'), 'holt_winters': ('alpha', 'beta', 'gamma')}[method]
+    return [name for name in names if fixed.get(name) is None]
+
+def _search(y, method, season_length, candidates):
+    """The candidate parameters with the smallest squared error per series
+
+    Args:
+        candidates: Array of series x choices x 3 (alpha, beta, gamma)
+    """
+    series, choices = candidates.shape[:2]
+    # Every choice for every series runs as its own column in one pass
+    params = candidates.reshape(series * choices, 3)
+    sse = smooth(np.repeat(y, choices, axis=1), method, params[:, 0], params[:, 1], params[:, 2],
+                 season_length, keep_fitted=False)['sse'].reshape(series, choices)
+    sse[np.isnan(sse)] = np.inf
+    return candidates[np.arange(series), np.argmin(sse, axis=1)]
+
+def _fit_block(y, method, season_length, fixed):
+    """Choose the smoothing parameters of a block of series"""
+    series = y.shape[1]
+    free = _free_parameters(method, fixed)
+    best = np.array([[0.0 if fixed.get(name) is None else fixed[name] for name in ('alpha', 'beta', 'gamma')]])
+    best = np.repeat(best, series, axis=0)
+    if not free:
+        return best
+    grids = [_ALPHA_GRID if name == 'alpha' else _TREND_GRID for name in free]
+    indexes = [('alpha', 'beta', 'gamma').index(name) for name in free]
+    points = np.array(np.meshgrid(*grids, indexing='ij')).reshape(len(free), -1).T
+    candidates = np.repeat(best[:, None, :], len(points), axis=1)
+    candidates[:, :, indexes] = points
+    best = _search(y, method, season_length, candidates)
+    offsets = np.array(np.meshgrid(*[(-1, 0, 1)] * len(free), indexing='ij')).reshape(len(free), -1).T
+    for step in _REFINE_STEPS:
+        candidates = np.repeat(best[:, None, :], len(offsets), axis=1)
+        candidates[:, :, indexes] = np.clip(best[:, None, indexes] + offsets * step, *_PARAMETER_RANGE)
+        best = _search(y, method, season_length, candidates)
+    return best
+
+def fit_forecast(y, method='holt', periods=5, season_length=None, alpha=None, beta=None, gamma=None,
+                 workers=1, progress=None):
+    """Fit exponential smoothing to many series and forecast each of them
+
+    Smoothing parameters left as None are chosen per series by minimizing
+    the one-step squared error: a grid search, then refinement around each
+    series' best point. Series are fitted in blocks of
+    FORECAST_SERIES_CHUNK, which run in parallel processes when workers > 1.
+
+    Args:
+        y: Block of values, rows = time, columns = series (NaN for missing)
+        method: 'simple', 'holt' (trend) or 'holt_winters' (trend and
+            additive season)
+        periods: Periods to forecast past the end of the data
+        season_length: Periods per season, required for holt_winters
+        alpha, beta, gamma: Fixed smoothing parameters (0-1), or None to fit
+        workers: Processes to fit blocks of series on
+        progress: Optional callback receiving the fraction of series fitted
+
+    Returns:
+        Dictionary with 'alpha', 'beta', 'gamma', 'sse' and 'rmse' (one per
+        series), 'fitted' (the one-step forecast of every value, same shape
+        as y) and 'forecast' (periods x series)
+    """
+    if method not in FORECAST_METHODS:
+        raise ValueError(f"Unsupported forecast method: {method}")
+    y = np.asarray(y, dtype=float)
+    if y.ndim == 1:
+        y = y.reshape(-1, 1)
+    if method == 'holt_winters':
+        if not season_length or season_length < 2:
+            raise ValueError("Holt-Winters needs a season length of at least 2")
+        if len(y) < 2 * season_length:
+            raise ValueError("Holt-Winters needs at least two full seasons of data")
+    elif len(y) < 3:
+        raise ValueError("Insufficient data for forecasting")
+    for name, value in (('alpha', alpha), ('beta', beta), ('gamma', gamma)):
+        if value is not None and not 0 <= value <= 1:
+            raise ValueError(f"{name} must be between 0 and 1")
+    fixed = {'alpha': alpha, 'beta': beta, 'gamma': gamma}
+
+    series = y.shape[1]
+    starts = list(range(0, series, FORECAST_SERIES_CHUNK))
+    blocks = [y[:, start:start + FORECAST_SERIES_CHUNK] for start in starts]
+    params = [None] * len(blocks)
+    if workers > 1 and len(blocks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(blocks))) as pool:
+            futures = [pool.submit(_fit_block, block, method, season_length, fixed) for block in blocks]
+            for i, future in enumerate(futures):
+                params[i] = future.result()
+                if progress:
+                    progress((i + 1) / len(blocks))
+    else:
+        for i, block in enumerate(blocks):
+            params[i] = _fit_block(block, method, season_length, fixed)
+            if progress:
+                progress((i + 1) / len(blocks))
+    params = np.vstack(params)
+
+    state = smooth(y, method, params[:, 0], params[:, 1], params[:, 2], season_length)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rmse = np.sqrt(state['sse'] / state['observations'])
+    return {
+        'method': method,
+        'alpha': params[:, 0],
+        'beta': params[:, 1],
+        'gamma': params[:, 2],
+        'sse': state['sse'],
+        'rmse': rmse,
+        'fitted': state['fitted'],
+        'forecast': project(state, periods),
+    }
@@ -0,0 +1,195 @@
+import math
+import threading
+import numpy as np
+from .scenarios import ScenarioModel, to_cell
+from ..utils.config import GOAL_SEEK_MAX_ITERATIONS, GOAL_SEEK_TOLERANCE
+
+class _Stop(Exception):
+    """Raised from the objective to end the search early"""
+
+class GoalSeek:
+    """Find the value of one cell that makes a formula cell reach a target.
+
+    The model between the changing cell and the target cell is extracted once
+    (see ScenarioModel), so each trial value only re-evaluates that cone and
+    never touches the sheet. The search runs secant steps from the current
+    value, which converge in a handful of evaluations on smooth models such
+    as loan payments. If they stall or diverge, the root is bracketed by one
+    vectorized scan around the start and refined with Brent's method.
+
+    Build the GoalSeek on the thread that owns the sheet; solve() only uses
+    the extracted model and can run on a worker thread.
+    """
+
+    SECANT_STEPS = 20
+    # Bracket scan: start +/- scale * 10**k for k evenly spaced in this range
+    SCAN_DECADES = (-6, 6)
+    SCAN_POINTS = 49
+
+    def __init__(self, calculator, target_cell, target_value, changing_cell,
+                 max_iterations=None, tolerance=None):
+        """Prepare a goal seek
+
+        Args:
+            calculator: Calculator attached to the sheet
+            target_cell: Formula cell to drive ('B4' or (row, col))
+            target_value: Value the target cell should reach
+            changing_cell: Input cell to adjust
+            max_iterations: Maximum model evaluations
+            tolerance: Accepted error, relative to the target value (absolute
+                for targets smaller than 1)
+        """
+        self.target_value = float(target_value)
+        self.max_iterations = max_iterations or GOAL_SEEK_MAX_ITERATIONS
+        self.tolerance = (tolerance or GOAL_SEEK_TOLERANCE) * max(1.0, abs(self.target_value))
+        self.target_cell = to_cell(target_cell)
+        self.changing_cell = to_cell(changing_cell)
+
+        self.model = ScenarioModel(calculator, [self.changing_cell], [self.target_cell])
+        if self.target_cell not in dict(self.model.order):
+            raise ValueError("The target cell must contain a formula that depends on the changing cell")
+
+        try:
+            self.start = float(calculator.cell_source.get_cell_value(*self.changing_cell))
+        except (ValueError, TypeError):
+            self.start = 0.0
+
+        self.iterations = 0
+        self._points = []  # (value, residual) of every finite evaluation
+        self._best = (self.start, math.inf)
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """Ask a running solve() to stop; it returns the best value found so far"""
+        self._cancelled.set()
+
+    def _residuals(self, values):
+        """Evaluate target - goal for several trial values in one pass"""
+        if self._cancelled.is_set():
+            raise _Stop("Goal seek was cancelled")
+        if self.iterations >= self.max_iterations:
+            raise _Stop(f"No solution within {self.max_iterations} iterations")
+        self.iterations += 1
+
+        residuals = self.model.evaluate(np.asarray(values, dtype=float).reshape(-1, 1))[:, 0] - self.target_value
+        for value, residual in zip(values, residuals):
+            if math.isfinite(residual):
+                self._points.append((float(value), float(residual)))
+                if abs(residual) < abs(self._best[1]):
+                    self._best = (float(value), float(residual))
+        return residuals
+
+    def _objective(self, value):
+        return float(self._residuals([value])[0])
+
+    def _converged(self):
+        return abs(self._best[1]) <= self.tolerance
+
+    def _secant(self):
+        """Secant iterations from the start value
+
+        Returns:
+            True once converged, False when the secant steps stall
+        """
+        x0 = self.start
+        f0 = self._objective(x0)
+        if self._converged():
+            return True
+        x1 = x0 + (abs(x0) * 1e-4 or 1e-4)
+        f1 = self._objective(x1)
+
+        for _ in range(self.SECANT_STEPS):
+            if self._converged():
+                return True
+            if not (math.isfinite(f0) and math.isfinite(f1)) or f0 == f1 or (f0 < 0) != (f1 < 0):
+                # Diverged, flat, or already straddling the root: leave it to Brent
+                return False
+            x0, f0, x1 = x1, f1, x1 - f1 * (x1 - x0) / (f1 - f0)
+            f1 = self._objective(x1)
+        return self._converged()
+
+    def _bracket(self):
+        """Find two values on either side of the target, closest to the start"""
+        if not self._find_bracket():
+            scale = max(abs(self.start), 1.0)
+            offsets = scale * np.logspace(*self.SCAN_DECADES, self.SCAN_POINTS)
+            self._residuals(np.concatenate([self.start - offsets[::-1], self.start + offsets]))
+        return self._find_bracket()
+
+    def _find_bracket(self):
+        points = sorted(set(self._points))
+        best = None
+        for (a, fa), (b, fb) in zip(points, points[1:]):
+            if (fa < 0) != (fb < 0):
+                distance = min(abs(a - self.start), abs(b - self.start))
+                if best is None or distance < best[0]:
+                    best = (distance, a, b)
+        return best[1:] if best else None
+
+    def _brent(self, a, b):
+        """Brent's method on a bracket (inverse quadratic interpolation,
+        secant and bisection steps), stopping at the tolerance"""
+        fa, fb = self._objective(a), self._objective(b)
+        c, fc = a, fa
+        d = e = b - a
+        while not self._converged():
+            if (fb < 0) == (fc < 0):
+                c, fc = a, fa
+                d = e = b - a
+            if abs(fc) < abs(fb):
+                a, b, c = b, c, b
+                fa, fb, fc = fb, fc, fb
+            step_tolerance = 2 * np.finfo(float).eps * abs(b)
+            m = (c - b) / 2
+            if abs(m) <= step_tolerance or fb == 0:
+                return
+            if abs(e) >= step_tolerance and abs(fa) > abs(fb):
+                s = fb / fa
+                if a == c:
+                    p, q = 2 * m * s, 1 - s
+                else:
+                    q, r = fa / fc, fb / fc
+                    p = s * (2 * m * q * (q - r) - (b - a) * (r - 1))
+                    q = (q - 1) * (r - 1) * (s - 1)
+                if p > 0:
+                    q = -q
+                p = abs(p)
+                if 2 * p < min(3 * m * q - abs(step_tolerance * q), abs(e * q)):
+                    e, d = d, p / q
+                else:
+                    e = d = m
+            else:
+                e = d = m
+            a, fa = b, fb
+            b += d if abs(d) > step_tolerance else math.copysign(step_tolerance, m)
+            fb = self._objective(b)
+
+    def solve(self):
+        """Run the search
+
+        Returns:
+            Dictionary with 'converged', 'value' (best changing-cell value),
+            'result' (target cell value there), 'iterations' and 'message'
+        """
+        message = None
+        try:
+            if not self._secant():
+                bracket = self._bracket()
+                if bracket is None:
+                    message = "Could not find values on both sides of the target"
+                else:
+                    self._brent(*bracket)
+        except _Stop as e:
+            message = str(e)
+
+        converged = self._converged()
+        if converged:
+            message = "Solution found"
+        value, residual = self._best
+        return {
+            'converged': converged,
+            'value': value,
+            'result': residual + self.target_value if math.isfinite(residual) else None,
+            'iterations': self.iterations,
+            'message': message or "The target value could not be reached",
+        }
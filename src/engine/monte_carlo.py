@@ -0,0 +1,202 @@
+import re
+import math
+import time
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .scenarios import ScenarioModel, to_cell
+from ..utils.config import (
+    SIMULATION_TRIALS, SIMULATION_CHUNK_SIZE, SIMULATION_PERCENTILES, SIMULATION_HISTOGRAM_BINS
+)
+
+# Distribution name -> number of parameters
+SIMULATION_DISTRIBUTIONS = {
+    'uniform': 2,  # low, high
+    'normal': 2,  # mean, standard deviation
+    'lognormal': 2,  # mean and sigma of the underlying normal
+    'triangular': 3,  # low, mode, high
+    'integers': 2,  # low, high (both included)
+}
+
+# A cell that is nothing but one random draw becomes a random input; any
+# other formula calling RAND or RANDBETWEEN is recalculated in every trial
+_RANDOM_FORMULA = re.compile(r'=\s*(RAND|RANDBETWEEN)\(([^()]*)\)\s*$')
+_RANDOM_CALL = re.compile(r'(?<![A-Za-z0-9_.])(RAND|RANDBETWEEN)\(')
+
+def draw(rng, distribution, params, size):
+    """Draw samples from one of SIMULATION_DISTRIBUTIONS as floats"""
+    if distribution == 'integers':
+        return rng.integers(math.ceil(params[0]), math.floor(params[1]), size, endpoint=True).astype(float)
+    return getattr(rng, distribution)(*params, size)
+
+def _simulate_chunk(model, distributions, size, seed_sequence):
+    """Run one block of trials on its own random stream"""
+    rng = np.random.default_rng(seed_sequence)
+    values = np.empty((size, len(distributions)))
+    for i, (name, params) in enumerate(distributions):
+        values[:, i] = draw(rng, name, params, size)
+    return model.evaluate(values, rng=rng)
+
+def summarize(samples, percentiles=None, bins=None):
+    """Summarize one output's trial values
+
+    Args:
+        samples: 1-D array of trial results; NaN marks trials that errored
+        percentiles: Percentiles to report (defaults to SIMULATION_PERCENTILES)
+        bins: Histogram bins (defaults to SIMULATION_HISTOGRAM_BINS)
+
+    Returns:
+        Dictionary with mean, std, min, max, percentiles, histogram and errors
+    """
+    percentiles = SIMULATION_PERCENTILES if percentiles is None else percentiles
+    finite = samples[np.isfinite(samples)]
+    summary = {'trials': int(len(samples)), 'errors': int(len(samples) - len(finite))}
+    if not len(finite):
+        summary.update({'mean': None, 'std': None, 'min': None, 'max': None,
+                        'percentiles': {}, 'histogram': {'counts': [], 'edges': []}})
+        return summary
+
+    counts, edges = np.histogram(finite, bins or SIMULATION_HISTOGRAM_BINS)
+    summary.update({
+        'mean': float(finite.mean()),
+        'std': float(finite.std(ddof=1)) if len(finite) > 1 else 0.0,
+        'min': float(finite.min()),
+        'max': float(finite.max()),
+        'percentiles': dict(zip(percentiles, np.percentile(finite, percentiles).tolist())),
+        'histogram': {'counts': counts.tolist(), 'edges': edges.tolist()},
+    })
+    return summary
+
+class MonteCarloSimulation:
+    """Run a sheet model many times with random inputs.
+
+    Random inputs are the sheet's RAND() and RANDBETWEEN(low, high) cells
+    plus any cells given an explicit distribution. Formulas that use RAND or
+    RANDBETWEEN as part of a larger expression (=A1+RAND()) draw new values
+    in every trial as well. All trials of a block are evaluated together,
+    vectorized over the trial axis of a ScenarioModel.
+
+    Trials are split into fixed-size blocks, each with its own
+    numpy.random.Generator spawned from one SeedSequence. The results for a
+    seed are therefore the same whether the blocks run in one process or
+    across a pool.
+    """
+
+    def __init__(self, calculator, output_cells, distributions=None, trials=None, seed=None,
+                 chunk_size=None, workers=1):
+        """Prepare a simulation
+
+        Args:
+            calculator: Calculator attached to the sheet
+            output_cells: Cells whose distributions to collect
+            distributions: Optional {cell: (distribution, params)} for extra
+                random inputs, with distribution one of SIMULATION_DISTRIBUTIONS
+            trials: Number of trials
+            seed: Integer seed; a random one is chosen (and reported) if None
+            chunk_size: Trials per block / random stream
+            workers: Processes to run blocks on
+        """
+        source = calculator.cell_source
+        if source is None:
+            raise ValueError("The calculator has no sheet to simulate")
+        self.trials = int(trials or SIMULATION_TRIALS)
+        if self.trials < 1:
+            raise ValueError("The number of trials must be positive")
+        self.chunk_size = int(chunk_size or SIMULATION_CHUNK_SIZE)
+        self.workers = max(1, workers or 1)
+        self.seed = int(np.random.SeedSequence().entropy if seed is None else seed)
+
+        # cell -> (distribution, params)
+        self.random_inputs = {}
+        random_cells = []
+        for row, col, formula in source.iter_formula_cells():
+            if not _RANDOM_CALL.search(formula):
+                continue
+            match = _RANDOM_FORMULA.match(formula)
+            if not match:
+                random_cells.append((row, col))
+                continue
+            if match.group(1) == 'RAND':
+                self.random_inputs[(row, col)] = ('uniform', (0.0, 1.0))
+            else:
+                bounds = calculator.parse_function_arguments(match.group(2), row, col)
+                if len(bounds) < 2:
+                    raise ValueError(f"RANDBETWEEN needs two numeric bounds: {formula}")
+                self.random_inputs[(row, col)] = ('integers', tuple(bounds[:2]))
+
+        for ref, (distribution, params) in (distributions or {}).items():
+            if distribution not in SIMULATION_DISTRIBUTIONS:
+                raise ValueError(f"Unsupported distribution: {distribution}")
+            if len(params) != SIMULATION_DISTRIBUTIONS[distribution]:
+                raise ValueError(f"The {distribution} distribution takes "
+                                 f"{SIMULATION_DISTRIBUTIONS[distribution]} parameters")
+            self.random_inputs[to_cell(ref)] = (distribution, tuple(float(p) for p in params))
+
+        # Cells given a distribution are inputs, whatever their formula
+        self.random_cells = [cell for cell in random_cells if cell not in self.random_inputs]
+        if not self.random_inputs and not self.random_cells:
+            raise ValueError("The sheet has no RAND() or RANDBETWEEN() cells and no input distributions were given")
+
+        self.input_cells = list(self.random_inputs)
+        self.output_cells = [to_cell(ref) for ref in output_cells]
+        self.model = ScenarioModel(calculator, self.input_cells, self.output_cells, self.random_cells)
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """Ask a running simulation to stop after the current blocks"""
+        self._cancelled.set()
+
+    def run(self, progress=None, keep_samples=False):
+        """Run the simulation
+
+        Args:
+            progress: Optional callback receiving the fraction of trials done
+            keep_samples: Include the raw (trials x outputs) array in the result
+
+        Returns:
+            Dictionary with 'trials', 'seed', 'elapsed_s', 'outputs' (a
+            summary per output cell, see summarize) and 'cancelled'
+        """
+        started = time.perf_counter()
+        sizes = [self.chunk_size] * (self.trials // self.chunk_size)
+        if self.trials % self.chunk_size:
+            sizes.append(self.trials % self.chunk_size)
+        streams = np.random.SeedSequence(self.seed).spawn(len(sizes))
+        distributions = [self.random_inputs[cell] for cell in self.input_cells]
+
+        blocks = [None] * len(sizes)
+        done = 0
+        if self.workers > 1 and len(sizes) > 1:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(sizes))) as pool:
+                futures = [pool.submit(_simulate_chunk, self.model, distributions, size, stream)
+                           for size, stream in zip(sizes, streams)]
+                for i, future in enumerate(futures):
+                    if self._cancelled.is_set():
+                        for pending in futures[i:]:
+                            pending.cancel()
+                        break
+                    blocks[i] = future.result()
+                    done += sizes[i]
+                    if progress:
+                        progress(done / self.trials)
+        else:
+            for i, (size, stream) in enumerate(zip(sizes, streams)):
+                if self._cancelled.is_set():
+                    break
+                blocks[i] = _simulate_chunk(self.model, distributions, size, stream)
+                done += size
+                if progress:
+                    progress(done / self.trials)
+
+        completed = [block for block in blocks if block is not None]
+        samples = np.vstack(completed) if completed else np.empty((0, len(self.output_cells)))
+        result = {
+            'trials': int(len(samples)),
+            'seed': self.seed,
+            'cancelled': self._cancelled.is_set(),
+            'elapsed_s': round(time.perf_counter() - started, 4),
+            'outputs': {cell: summarize(samples[:, j]) for j, cell in enumerate(self.output_cells)},
+        }
+        if keep_samples:
+            result['samples'] = samples
+        return result
@@ -0,0 +1,619 @@
+from collections import Counter
+import numpy as np
+from .sort import sort_order
+from ..utils.helpers import cell_number, cell_text
+
+# Aggregation name -> label used in the pivot table's headers
+PIVOT_AGGREGATIONS = {
+    'sum': "Sum",
+    'count': "Count",
+    'average': "Average",
+    'min': "Min",
+    'max': "Max",
+    'distinct': "Distinct Count",
+}
+BLANK_LABEL = "(blank)"
+
+def _cell(value):
+    """A result as written to the sheet: '' for no value, whole numbers as int"""
+    if np.isnan(value):
+        return ''
+    return int(value) if float(value).is_integer() else float(value)
+
+class PivotField:
+    """One column of the pivot's source data, encoded once
+
+    Every row gets a code into the column's distinct texts (labels), which
+    are numbered in sort order (numbers, then text, then the blank label), so
+    grouping by codes also orders the groups. Numbers are kept as a float
+    array, NaN where the cell is not numeric.
+    """
+
+    def __init__(self, values):
+        import pandas as pd
+
+        # Convert each distinct cell value once, then map the results to the rows
+        codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+        uniques = uniques.astype(object)
+        if (codes < 0).any():
+            # Missing values (None, NaN) come back as -1; give them a code of their own
+            uniques = np.append(uniques, None)
+            codes[codes < 0] = len(uniques) - 1
+        text_codes, texts = pd.factorize(pd.Series([cell_text(value) for value in uniques], dtype=object))
+        texts = texts.to_numpy(dtype=object)
+        rank = np.empty(len(texts), dtype=np.int64)
+        rank[sort_order([texts.tolist()])] = np.arange(len(texts))
+
+        self.codes = rank[text_codes][codes]
+        self.labels = [None] * len(texts)
+        for i, text in enumerate(texts):
+            self.labels[rank[i]] = text if text != '' else BLANK_LABEL
+        self.blank = self.codes == (rank[texts.tolist().index('')] if '' in texts else -1)
+        self._numbers = (uniques, codes)
+
+    @property
+    def numbers(self):
+        """Float value of every row, NaN where the cell is not a number"""
+        if isinstance(self._numbers, tuple):
+            uniques, codes = self._numbers
+            self._numbers = np.fromiter(map(cell_number, uniques), dtype=float, count=len(uniques))[codes]
+        return self._numbers
+
+def _group_keys(fields, mask):
+    """Combined group number of every (filtered) row over some fields
+
+    Returns:
+        Tuple (keys, first): the group of each row, numbered in sort order,
+        and for each group the index of a row in it
+    """
+    import pandas as pd
+
+    count = int(mask.sum())
+    keys = np.zeros(count, dtype=np.int64)
+    if not fields:
+        # Everything is one group, even when no row is left
+        return keys, np.zeros(1, dtype=np.int64)
+    for field in fields:
+        keys = keys * len(field.labels) + field.codes[mask]
+        # Renumber in order after each field so the combined keys stay below the row count
+        keys, uniques = pd.factorize(keys, sort=True)
+    first = np.empty(len(uniques), dtype=np.int64)
+    first[keys] = np.arange(count)
+    return keys, first
+
+def aggregate(groups, group_count, field, mask, aggregation):
+    """Aggregate a value field over groups of rows in one pass
+
+    Args:
+        groups: Group number of each row kept by mask
+        group_count: Number of groups
+        field: PivotField holding the values
+        mask: Rows of the source data taking part
+        aggregation: One of PIVOT_AGGREGATIONS
+
+    Returns:
+        Float array with one result per group, NaN where a group has no value
+    """
+    if aggregation == 'count':
+        return np.bincount(groups, weights=~field.blank[mask], minlength=group_count).astype(float)
+    if aggregation == 'distinct':
+        codes = field.codes[mask]
+        filled = ~field.blank[mask]
+        pairs = np.unique(groups[filled] * len(field.labels) + codes[filled])
+        return np.bincount(pairs // len(field.labels), minlength=group_count).astype(float)
+
+    numbers = field.numbers[mask]
+    numeric = ~np.isnan(numbers)
+    if aggregation == 'sum':
+        result = np.bincount(groups, weights=np.where(numeric, numbers, 0.0), minlength=group_count).astype(float)
+        # A group with no numbers shows nothing rather than 0
+        result[np.bincount(groups, weights=numeric, minlength=group_count) == 0] = np.nan
+        return result
+    if aggregation == 'average':
+        counts = np.bincount(groups, weights=numeric, minlength=group_count)
+        sums = np.bincount(groups, weights=np.where(numeric, numbers, 0.0), minlength=group_count)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(counts > 0, sums / counts, np.nan)
+    if aggregation in ('min', 'max'):
+        import pandas as pd
+
+        found = pd.Series(numbers[numeric]).groupby(groups[numeric]).agg(aggregation)
+        result = np.full(group_count, np.nan)
+        result[found.index.to_numpy()] = found.to_numpy()
+        return result
+    raise ValueError(f"Unsupported aggregation: {aggregation}")
+
+def pivot(headers, data, rows=(), columns=(), values=(), filters=None, totals=True):
+    """Summarize columns of data grouped by row and column fields
+
+    Args:
+        headers: Name of each field
+        data: The values of each field, one sequence per field
+        rows: Fields (indexes into headers) whose labels head the pivot's
+            rows, outermost first
+        columns: Fields whose labels head the pivot's columns, outermost first
+        values: (field, aggregation) pairs to summarize, with aggregation
+            one of PIVOT_AGGREGATIONS; counts the rows when empty
+        filters: Optional {field: labels to include}
+        totals: Add a grand total row and, with column fields, total columns
+
+    Returns:
+        The pivot table as a list of rows: one header row per column field,
+        then a row naming the row fields and values, then one row per group
+    """
+    for field in list(rows) + list(columns) + [field for field, _ in values] + list(filters or {}):
+        if not 0 <= field < len(headers):
+            raise ValueError(f"Unknown pivot field: {field}")
+    for _, aggregation in values:
+        if aggregation not in PIVOT_AGGREGATIONS:
+            raise ValueError(f"Unsupported aggregation: {aggregation}")
+
+    encoded = {}
+
+    def field(index):
+        if index not in encoded:
+            encoded[index] = PivotField(data[index])
+        return encoded[index]
+
+    row_count = max((len(column) for column in data), default=0)
+    mask = np.ones(row_count, dtype=bool)
+    for index, labels in (filters or {}).items():
+        wanted = {BLANK_LABEL if cell_text(label) == '' else cell_text(label) for label in labels}
+        allowed = np.array([label in wanted for label in field(index).labels], dtype=bool)
+        mask &= allowed[field(index).codes]
+
+    values = list(values) or [(rows[0] if rows else 0, 'count')]
+    row_fields = [field(index) for index in rows]
+    column_fields = [field(index) for index in columns]
+    row_keys, row_first = _group_keys(row_fields, mask)
+    column_keys, column_first = _group_keys(column_fields, mask)
+    row_groups, column_groups = len(row_first), len(column_first)
+    positions = np.flatnonzero(mask)
+
+    # One block of results per value: rows are row groups, columns column groups
+    groups = row_keys * column_groups + column_keys
+    # Combinations of row and column labels that no row has are left empty
+    empty = np.bincount(groups, minlength=row_groups * column_groups) == 0
+    blocks = []
+    for index, aggregation in values:
+        block = aggregate(groups, row_groups * column_groups, field(index), mask, aggregation)
+        block[empty] = np.nan
+        block = block.reshape(row_groups, column_groups)
+        if totals and columns:
+            block = np.hstack([block, aggregate(row_keys, row_groups, field(index), mask, aggregation)[:, None]])
+        if totals and rows:
+            grand = aggregate(column_keys, column_groups, field(index), mask, aggregation)
+            if columns:
+                grand = np.append(grand, aggregate(np.zeros(len(positions), dtype=np.int64), 1, field(index),
+                                                   mask, aggregation))
+            block = np.vstack([block, grand[None, :]])
+        blocks.append(block)
+    # Columns run column group by column group, each with every value
+    body = np.stack(blocks, axis=2).reshape(len(blocks[0]), -1)
+
+    column_labels = [tuple(field.labels[field.codes[positions[first]]] for field in column_fields)
+                     for first in column_first]
+    row_labels = [tuple(field.labels[field.codes[positions[first]]] for field in row_fields) for first in row_first]
+    return _layout(headers, rows, columns, values, row_labels, column_labels, body.tolist(), totals)
+
+def _layout(headers, rows, columns, values, row_labels, column_labels, body, totals):
+    """Lay out pivot results as the rows written to the sheet
+
+    Args:
+        row_labels, column_labels: Label tuple of each row and column group,
+            in order
+        body: One line per row group, then the grand total line, each with
+            one result per value for every column group, then for the total
+            column; NaN where there is no result
+    """
+    lead = max(len(rows), 1)
+    value_names = [f"{PIVOT_AGGREGATIONS[aggregation]} of {headers[index]}" for index, aggregation in values]
+    total_columns = 1 if totals and columns else 0
+    table = []
+    for level, index in enumerate(columns):
+        header = [headers[index] if i == lead - 1 else '' for i in range(lead)]
+        for labels in column_labels:
+            header.extend([labels[level]] * len(values))
+        header.extend(["Grand Total" if level == 0 else ''] * (len(values) * total_columns))
+        table.append(header)
+    table.append([headers[index] for index in rows] + [''] * (lead - len(rows))
+                 + value_names * (len(column_labels) + total_columns))
+
+    for labels, line in zip(row_labels, body):
+        table.append((list(labels) or ['']) + [_cell(value) for value in line])
+    if totals and rows:
+        table.append(["Grand Total"] + [''] * (lead - 1) + [_cell(value) for value in body[-1]])
+    return table
+
+class PivotTable:
+    """Summary of a block of cells grouped by the labels in some of its columns
+
+    The block's first row holds the field names. Fields are given as sheet
+    columns inside the block, like AutoFilter criteria and sort keys; each is
+    dictionary-encoded once and every aggregation is a single pass over the
+    group numbers (see pivot).
+    """
+
+    def __init__(self, bounds, rows=(), columns=(), values=(), filters=None, totals=True):
+        """Define a pivot table over a block
+
+        Args:
+            bounds: (top, left, bottom, right) of the source block, 0-based
+                inclusive, headers in its first row
+            rows: Sheet columns grouping the pivot's rows, outermost first
+            columns: Sheet columns grouping the pivot's columns, outermost first
+            values: (sheet column, aggregation) pairs to summarize
+            filters: Optional {sheet column: labels to include}
+            totals: Add grand totals
+        """
+        self.bounds = tuple(bounds)
+        top, left, bottom, right = self.bounds
+        for col in list(rows) + list(columns) + [col for col, _ in values] + list(filters or {}):
+            if not left <= col <= right:
+                raise ValueError("Pivot fields must be columns of the source range")
+        for _, aggregation in values:
+            if aggregation not in PIVOT_AGGREGATIONS:
+                raise ValueError(f"Unsupported aggregation: {aggregation}")
+        self.rows = list(rows)
+        self.columns = list(columns)
+        self.values = list(values)
+        self.filters = dict(filters or {})
+        self.totals = totals
+
+    def evaluate(self, source):
+        """Compute the pivot table from a CellSource
+
+        Returns:
+            The pivot table as a list of rows (see pivot)
+        """
+        top, left, bottom, right = self.bounds
+        headers = [cell_text(source.get_cell_value(top, col)) or f"Column {col - left + 1}"
+                   for col in range(left, right + 1)]
+        used = set(self.rows) | set(self.columns) | {col for col, _ in self.values} | set(self.filters)
+        # Only the fields in use are read; the others stay empty
+        data = [source.get_column_values(col, top + 1, bottom) if col in used else []
+                for col in range(left, right + 1)]
+        return pivot(headers, data, [col - left for col in self.rows], [col - left for col in self.columns],
+                     [(col - left, aggregation) for col, aggregation in self.values],
+                     {col - left: labels for col, labels in self.filters.items()}, self.totals)
+
+def _label(value):
+    text = cell_text(value)
+    return text if text != '' else BLANK_LABEL
+
+class GroupAggregate:
+    """Running aggregates of one value field over one group of rows"""
+
+    __slots__ = ('filled', 'numeric', 'total', 'low', 'high', 'labels', 'stale')
+
+    def __init__(self, distinct=False):
+        self.filled = 0  # Non-blank cells
+        self.numeric = 0  # Cells holding numbers
+        self.total = 0.0
+        self.low = np.inf
+        self.high = -np.inf
+        self.labels = Counter() if distinct else None  # Text -> cells holding it
+        self.stale = False  # low or high may be out of date after a removal
+
+    def add(self, text, number):
+        if text:
+            self.filled += 1
+            if self.labels is not None:
+                self.labels[text] += 1
+        if not np.isnan(number):
+            self.numeric += 1
+            self.total += number
+            self.low = min(self.low, number)
+            self.high = max(self.high, number)
+
+    def remove(self, text, number):
+        if text:
+            self.filled -= 1
+            if self.labels is not None:
+                self.labels[text] -= 1
+                if not self.labels[text]:
+                    del self.labels[text]
+        if not np.isnan(number):
+            self.numeric -= 1
+            self.total -= number
+            if not self.numeric:
+                # Start again from exact zero rather than a rounding residue
+                self.total, self.low, self.high, self.stale = 0.0, np.inf, -np.inf, False
+            elif number <= self.low or number >= self.high:
+                self.stale = True
+
+    @classmethod
+    def combine(cls, parts, distinct=False):
+        """The aggregates of the union of some groups, for totals"""
+        combined = cls(distinct)
+        for part in parts:
+            combined.filled += part.filled
+            combined.numeric += part.numeric
+            combined.total += part.total
+            combined.low = min(combined.low, part.low)
+            combined.high = max(combined.high, part.high)
+            if distinct:
+                combined.labels.update(part.labels)
+        return combined
+
+    def result(self, aggregation):
+        if aggregation == 'count':
+            return float(self.filled)
+        if aggregation == 'distinct':
+            return float(len(self.labels))
+        if not self.numeric:
+            return np.nan
+        return {'sum': self.total, 'average': self.total / self.numeric,
+                'min': self.low, 'max': self.high}[aggregation]
+
+class PivotCache:
+    """Grouped partial aggregates of a pivot table, kept up to date row by row
+
+    For every (row group, column group) present in the source the cache
+    holds the number of rows and a GroupAggregate per value field, and it
+    remembers the group of every source row. When a source row changes, its
+    old contribution is subtracted from its old group and the new one added
+    to the group it now belongs to, so an edit costs a few dictionary
+    updates rather than a pass over the source. Extremes that a removal may
+    have invalidated are recomputed from that group's rows only.
+    """
+
+    def __init__(self, pivot_table, source):
+        self.pivot = pivot_table
+        self.source = source
+        self.build()
+
+    def build(self):
+        """Read the source and aggregate every group from scratch"""
+        pivot_table, source = self.pivot, self.source
+        top, left, bottom, right = pivot_table.bounds
+        self.first_row = top + 1
+        self.headers = {col: cell_text(source.get_cell_value(top, col)) or f"Column {col - left + 1}"
+                        for col in range(left, right + 1)}
+        self.values = pivot_table.values or [(pivot_table.rows[0] if pivot_table.rows else left, 'count')]
+        self.filters = {col: {_label(label) for label in labels} for col, labels in pivot_table.filters.items()}
+        used = set(pivot_table.rows) | set(pivot_table.columns) | {col for col, _ in self.values} | set(self.filters)
+        self.data = {col: list(source.get_column_values(col, self.first_row, bottom)) for col in sorted(used)}
+
+        fields = {col: PivotField(values) for col, values in self.data.items()}
+        count = max(bottom - top, 0)
+        mask = np.ones(count, dtype=bool)
+        for col, wanted in self.filters.items():
+            allowed = np.array([label in wanted for label in fields[col].labels], dtype=bool)
+            mask &= allowed[fields[col].codes]
+        self.row_ids, self.row_labels, self.row_group = self._initial_groups(
+            [fields[col] for col in pivot_table.rows], mask)
+        self.column_ids, self.column_labels, self.column_group = self._initial_groups(
+            [fields[col] for col in pivot_table.columns], mask)
+        # Kept for recomputing extremes
+        self.numbers = {col: fields[col].numbers.copy() for col, aggregation in self.values
+                        if aggregation in ('min', 'max')}
+
+        # Aggregate each (row group, column group) present in one vectorized pass
+        keep = np.flatnonzero(mask)
+        pairs = self.row_group[keep] * len(self.column_labels) + self.column_group[keep]
+        combos, inverse = np.unique(pairs, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        sizes = np.bincount(inverse, minlength=len(combos))
+        aggregates = [[GroupAggregate(aggregation == 'distinct') for _, aggregation in self.values] for _ in combos]
+        for v, (col, aggregation) in enumerate(self.values):
+            field = fields[col]
+            numbers = field.numbers[keep]
+            numeric = ~np.isnan(numbers)
+            filled = np.bincount(inverse, weights=~field.blank[keep], minlength=len(combos))
+            numeric_counts = np.bincount(inverse, weights=numeric, minlength=len(combos))
+            totals = np.bincount(inverse, weights=np.where(numeric, numbers, 0.0), minlength=len(combos))
+            lows = highs = None
+            if aggregation in ('min', 'max'):
+                import pandas as pd
+
+                grouped = pd.Series(numbers[numeric]).groupby(inverse[numeric]).agg(['min', 'max'])
+                lows = np.full(len(combos), np.inf)
+                highs = np.full(len(combos), -np.inf)
+                lows[grouped.index.to_numpy()] = grouped['min'].to_numpy()
+                highs[grouped.index.to_numpy()] = grouped['max'].to_numpy()
+            for i in range(len(combos)):
+                aggregate = aggregates[i][v]
+                aggregate.filled, aggregate.numeric, aggregate.total = int(filled[i]), int(numeric_counts[i]), totals[i]
+                if lows is not None:
+                    aggregate.low, aggregate.high = lows[i], highs[i]
+            if aggregation == 'distinct':
+                filled_rows = ~field.blank[keep]
+                labels = len(field.labels)
+                found, counts = np.unique(inverse[filled_rows] * labels + field.codes[keep][filled_rows],
+                                          return_counts=True)
+                for pair, cells in zip(found.tolist(), counts.tolist()):
+                    aggregates[pair // labels][v].labels[field.labels[pair % labels]] = cells
+
+        columns = len(self.column_labels)
+        self.groups = {(combo // columns, combo % columns): [int(size), aggregate]
+                       for combo, size, aggregate in zip(combos.tolist(), sizes.tolist(), aggregates)}
+
+    @staticmethod
+    def _initial_groups(fields, mask):
+        """Group ids of the source rows (-1 where filtered out), with their label tuples"""
+        keys, first = _group_keys(fields, mask)
+        positions = np.flatnonzero(mask)
+        labels = [tuple(field.labels[field.codes[positions[row]]] for field in fields) for row in first]
+        groups = np.full(len(mask), -1, dtype=np.int64)
+        groups[mask] = keys
+        return {key: i for i, key in enumerate(labels)}, labels, groups
+
+    def update_cells(self, cells):
+        """Apply changes to some (row, col) cells of the source
+
+        Returns:
+            True when the pivot's results may have changed
+        """
+        top, left, bottom, right = self.pivot.bounds
+        rows = set()
+        changed = False
+        for row, col in cells:
+            if col not in self.data:
+                continue
+            if row == top:
+                self.headers[col] = cell_text(self.source.get_cell_value(top, col)) or f"Column {col - left + 1}"
+                changed = True
+            elif self.first_row <= row <= bottom:
+                rows.add(row - self.first_row)
+        for i in rows:
+            self._contribute(i, remove=True)
+            for col, values in self.data.items():
+                values[i] = self.source.get_cell_value(self.first_row + i, col)
+            self._assign(i)
+            self._contribute(i)
+        return changed or bool(rows)
+
+    def _group_id(self, ids, labels, key):
+        if key not in ids:
+            ids[key] = len(labels)
+            labels.append(key)
+        return ids[key]
+
+    def _assign(self, i):
+        """Work out the groups of source row i from its current values"""
+        for col in self.numbers:
+            self.numbers[col][i] = cell_number(self.data[col][i])
+        if any(_label(self.data[col][i]) not in wanted for col, wanted in self.filters.items()):
+            self.row_group[i] = self.column_group[i] = -1
+            return
+        self.row_group[i] = self._group_id(self.row_ids, self.row_labels,
+                                           tuple(_label(self.data[col][i]) for col in self.pivot.rows))
+        self.column_group[i] = self._group_id(self.column_ids, self.column_labels,
+                                              tuple(_label(self.data[col][i]) for col in self.pivot.columns))
+
+    def _contribute(self, i, remove=False):
+        """Add source row i to its group's aggregates, or take it out"""
+        group = (int(self.row_group[i]), int(self.column_group[i]))
+        if group[0] < 0:
+            return
+        if remove:
+            entry = self.groups[group]
+            entry[0] -= 1
+        else:
+            entry = self.groups.setdefault(
+                group, [0, [GroupAggregate(aggregation == 'distinct') for _, aggregation in self.values]])
+            entry[0] += 1
+        for (col, _), aggregate in zip(self.values, entry[1]):
+            value = self.data[col][i]
+            if remove:
+                aggregate.remove(cell_text(value), cell_number(value))
+            else:
+                aggregate.add(cell_text(value), cell_number(value))
+        if not entry[0]:
+            del self.groups[group]
+
+    def _refresh_extremes(self, group, entry):
+        rows = (self.row_group == group[0]) & (self.column_group == group[1])
+        for (col, _), aggregate in zip(self.values, entry[1]):
+            if aggregate.stale and col in self.numbers:
+                numbers = self.numbers[col][rows]
+                numbers = numbers[~np.isnan(numbers)]
+                aggregate.low, aggregate.high = numbers.min(), numbers.max()
+            # Only min and max read the extremes
+            aggregate.stale = False
+
+    def _ordered(self, labels, present, levels):
+        """Group ids in label order (numbers, then text, then blanks)"""
+        if not levels:
+            return [0]
+        present = sorted(present)
+        columns = [['' if labels[group][level] == BLANK_LABEL else labels[group][level] for group in present]
+                   for level in range(levels)]
+        return [present[i] for i in sort_order(columns)]
+
+    def table(self):
+        """The pivot table as a list of rows, as PivotTable.evaluate returns it"""
+        for group, entry in self.groups.items():
+            if any(aggregate.stale for aggregate in entry[1]):
+                self._refresh_extremes(group, entry)
+
+        pivot_table = self.pivot
+        row_order = self._ordered(self.row_labels, {group[0] for group in self.groups}, len(pivot_table.rows))
+        column_order = self._ordered(self.column_labels, {group[1] for group in self.groups},
+                                     len(pivot_table.columns))
+        by_row, by_column = {}, {}
+        for (row, column), entry in self.groups.items():
+            by_row.setdefault(row, []).append(entry[1])
+            by_column.setdefault(column, []).append(entry[1])
+
+        def results(parts):
+            """One result per value over the union of some groups' aggregates"""
+            return [GroupAggregate.combine([part[v] for part in parts], aggregation == 'distinct').result(aggregation)
+                    for v, (_, aggregation) in enumerate(self.values)]
+
+        with_totals = pivot_table.totals and pivot_table.columns
+        body = []
+        for row in row_order:
+            line = []
+            for column in column_order:
+                entry = self.groups.get((row, column))
+                line.extend(results([entry[1]]) if entry else [np.nan] * len(self.values))
+            if with_totals:
+                line.extend(results(by_row.get(row, [])))
+            body.append(line)
+        if pivot_table.totals and pivot_table.rows:
+            line = []
+            for column in column_order:
+                line.extend(results(by_column.get(column, [])))
+            if with_totals:
+                line.extend(results([entry[1] for entry in self.groups.values()]))
+            body.append(line)
+
+        top, left, bottom, right = pivot_table.bounds
+        return _layout([self.headers.get(col, '') for col in range(left, right + 1)],
+                       [col - left for col in pivot_table.rows], [col - left for col in pivot_table.columns],
+                       [(col - left, aggregation) for col, aggregation in self.values],
+                       [self.row_labels[row] for row in row_order],
+                       [self.column_labels[column] for column in column_order], body, pivot_table.totals)
+
+class LivePivot:
+    """A pivot table written into a sheet and kept up to date from a PivotCache
+
+    Registered with Calculator.add_pivot_table, which refreshes it after
+    every recalculation with the cells that changed. Only the output cells
+    whose contents differ from what was last written are rewritten.
+    """
+
+    def __init__(self, pivot_table, location):
+        """
+        Args:
+            pivot_table: PivotTable defining the summary
+            location: (row, col) of the output's top-left cell
+        """
+        self.pivot = pivot_table
+        self.location = tuple(location)
+        self.source = None  # Set by Calculator.add_pivot_table
+        self.cache = None
+        self.table = []  # Rows last written, as text
+
+    def refresh(self, changed_cells=None):
+        """Bring the pivot up to date and write the cells that changed
+
+        Args:
+            changed_cells: Set of (row, col) cells that changed, or None to
+                rebuild the cache from the source
+
+        Returns:
+            List of (row, col) cells written
+        """
+        if changed_cells is None or self.cache is None or self.cache.source is not self.source:
+            self.cache = PivotCache(self.pivot, self.source)
+        elif not self.cache.update_cells(changed_cells):
+            return []
+
+        table = [[str(value) for value in line] for line in self.cache.table()]
+        top, left = self.location
+        cells = []
+        for r in range(max(len(table), len(self.table))):
+            new = table[r] if r < len(table) else []
+            old = self.table[r] if r < len(self.table) else []
+            for c in range(max(len(new), len(old))):
+                value = new[c] if c < len(new) else ''
+                if value != (old[c] if c < len(old) else ''):
+                    cells.append((top + r, left + c, value))
+        self.table = table
+        if cells:
+            # Recomputed after every edit, so not an undo step of its own
+            self.source.set_cells(cells, record=False)
+        return [(row, col) for row, col, _ in cells]
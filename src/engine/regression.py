@@ -0,0 +1,149 @@
+import numpy as np
+from ..utils.helpers import cell_number
+
+def column_numbers(values):
+    """A column of cell values as floats, NaN where a cell is not a number"""
+    try:
+        # All numbers or numeric text (None becomes NaN)
+        return np.array(values, dtype=float)
+    except (ValueError, TypeError):
+        return np.fromiter(map(cell_number, values), dtype=float, count=len(values))
+
+def _design_matrix(x, intercept):
+    x = np.asarray(x, dtype=float)
+    if x.ndim == 1:
+        x = x.reshape(-1, 1)
+    if intercept:
+        x = np.column_stack([np.ones(len(x)), x])
+    return x
+
+def _factorize(design):
+    """QR-factorize a design matrix, rejecting collinear variables
+
+    Returns:
+        Tuple (q, r_inverse)
+    """
+    rows, params = design.shape
+    if rows < params:
+        raise ValueError(f"Need at least {params} complete observations")
+    q, r = np.linalg.qr(design)
+    diagonal = np.abs(np.diag(r))
+    if diagonal.min() <= diagonal.max() * max(rows, params) * np.finfo(float).eps:
+        raise ValueError("The independent variables are collinear")
+    # R is small (params x params), so inverting it once serves every Y column
+    return q, np.linalg.inv(r)
+
+def _fit(q, r_inverse, y, intercept):
+    from scipy import stats
+
+    rows, params = q.shape
+    df = rows - params
+    projected = q.T @ y
+    coefficients = r_inverse @ projected
+    fitted = q @ projected
+    residuals = y - fitted
+    ssr = np.einsum('ij,ij->j', residuals, residuals)
+    centered = y - y.mean(axis=0) if intercept else y
+    sst = np.einsum('ij,ij->j', centered, centered)
+    model_df = params - 1 if intercept else params
+    # An exact fit (no residual degrees of freedom) leaves the statistics undefined
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sigma = np.sqrt(ssr / df) if df else np.full_like(ssr, np.nan)
+        std_errors = np.sqrt(np.einsum('ij,ij->i', r_inverse, r_inverse))[:, None] * sigma
+        t_values = coefficients / std_errors
+        r_squared = 1 - ssr / sst
+        f_statistic = (sst - ssr) / model_df / sigma ** 2 if model_df else np.full_like(ssr, np.nan)
+        total_df = rows - 1 if intercept else rows
+        adjusted = 1 - (1 - r_squared) * total_df / df
+    p_values = 2 * stats.t.sf(np.abs(t_values), df)
+    return {
+        'coefficients': coefficients,
+        'std_errors': std_errors,
+        't_values': t_values,
+        'p_values': p_values,
+        'r_squared': r_squared,
+        'adjusted_r_squared': adjusted,
+        'std_error': sigma,
+        'f_statistic': f_statistic,
+        'f_p_value': stats.f.sf(f_statistic, model_df, df) if model_df else np.full_like(ssr, np.nan),
+        'fitted': fitted,
+    }
+
+def fit_many(x, y, intercept=True):
+    """Least-squares fits of several Y columns against the same X
+
+    The design matrix is factorized once (QR) for every Y column with the
+    same complete rows; rows where an X value is missing are left out of
+    every fit, rows where a Y value is missing only out of that column's.
+
+    Args:
+        x: Independent variables, an array of n values or n rows x k columns
+        y: Dependent variables, n rows x m columns
+        intercept: Fit a constant term (first in the coefficients)
+
+    Returns:
+        Dictionary of arrays with one column per Y column: 'coefficients',
+        'std_errors', 't_values' and 'p_values' (parameters x m), and
+        'r_squared', 'adjusted_r_squared', 'std_error' (of the residuals),
+        'f_statistic', 'f_p_value' and 'observations' (m)
+    """
+    design = _design_matrix(x, intercept)
+    y = np.asarray(y, dtype=float)
+    if y.ndim == 1:
+        y = y.reshape(-1, 1)
+    if len(y) != len(design):
+        raise ValueError("X and Y must have the same number of rows")
+    params, series = design.shape[1], y.shape[1]
+    results = {key: np.full((params, series), np.nan)
+               for key in ('coefficients', 'std_errors', 't_values', 'p_values')}
+    results.update({key: np.full(series, np.nan)
+                    for key in ('r_squared', 'adjusted_r_squared', 'std_error', 'f_statistic', 'f_p_value')})
+    results['observations'] = np.zeros(series, dtype=int)
+
+    complete_x = ~np.isnan(design).any(axis=1)
+    missing = np.isnan(y) | ~complete_x[:, None]
+    # Y columns missing the same rows share one factorization
+    groups = {}
+    for col in range(series):
+        groups.setdefault(missing[:, col].tobytes(), []).append(col)
+    for cols in groups.values():
+        rows = ~missing[:, cols[0]]
+        q, r_inverse = _factorize(design[rows])
+        fit = _fit(q, r_inverse, y[np.ix_(rows, cols)], intercept)
+        for key in results:
+            if key == 'observations':
+                results[key][cols] = int(rows.sum())
+            elif results[key].ndim == 2:
+                results[key][:, cols] = fit[key]
+            else:
+                results[key][cols] = fit[key]
+    return results
+
+def multiple_regression(x, y, intercept=True):
+    """Least-squares fit of one Y column against one or more X columns
+
+    Rows with a missing X or Y value are left out.
+
+    Args:
+        x: Independent variables, an array of n values or n rows x k columns
+        y: Dependent variable, n values
+        intercept: Fit a constant term (first in the coefficients)
+
+    Returns:
+        Dictionary with 'coefficients', 'std_errors', 't_values', 'p_values'
+        and 'predictions' (lists), and 'r_squared', 'adjusted_r_squared',
+        'std_error', 'f_statistic', 'f_p_value' and 'observations'
+    """
+    design = _design_matrix(x, intercept)
+    y = np.asarray(y, dtype=float)
+    if y.ndim != 1 or len(y) != len(design):
+        raise ValueError("Y must be one column as long as X")
+    rows = ~(np.isnan(design).any(axis=1) | np.isnan(y))
+    q, r_inverse = _factorize(design[rows])
+    fit = _fit(q, r_inverse, y[rows].reshape(-1, 1), intercept)
+    result = {key: fit[key][:, 0].tolist() for key in ('coefficients', 'std_errors', 't_values', 'p_values')}
+    result.update({key: float(fit[key][0])
+                   for key in ('r_squared', 'adjusted_r_squared', 'std_error', 'f_statistic', 'f_p_value')})
+    result['observations'] = int(rows.sum())
+    result['predictions'] = fit['fitted'][:, 0].tolist()
+    return result
@@ -0,0 +1,363 @@
+import re
+import functools
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from . import calculator as calculator_module
+from ..core.cell_source import CellSource
+from ..utils.helpers import parse_cell_reference, column_name_to_index, cell_number
+
+def _vector_reduce(ufunc):
+    return lambda values: functools.reduce(ufunc, values) if values else 0
+
+def _vector_pmt(rate, nper, pv, fv=0, type=0):
+    pvif = (1 + rate) ** nper
+    pmt = rate / (pvif - 1) * -(pv * pvif + fv)
+    pmt = np.where(np.equal(type, 1), pmt / (1 + rate), pmt)
+    return np.where(np.equal(rate, 0), -(pv + fv) / nper, pmt)
+
+def _vector_fv(rate, nper, pmt, pv=0, type=0):
+    pvif = (1 + rate) ** nper
+    fv = -(pv * pvif + pmt * (1 + rate * type) * (pvif - 1) / rate)
+    return np.where(np.equal(rate, 0), -(pv + pmt * nper), fv)
+
+def _vector_pv(rate, nper, pmt, fv=0, type=0):
+    pvif = (1 + rate) ** nper
+    pv = -(fv + pmt * (1 + rate * type) * (pvif - 1) / rate) / pvif
+    return np.where(np.equal(rate, 0), -(fv + pmt * nper), pv)
+
+# NumPy versions of spreadsheet functions; each takes the same flat argument
+# list as Calculator.functions, where any argument may be an array holding
+# one value per scenario. Functions not listed here fall back to the scalar
+# implementation one scenario at a time.
+VECTOR_FUNCTIONS = {
+    'SUM': lambda values: functools.reduce(np.add, values, 0.0),
+    'AVERAGE': lambda values: functools.reduce(np.add, values, 0.0) / len(values) if values else 0,
+    'COUNT': len,
+    'MIN': _vector_reduce(np.minimum),
+    'MAX': _vector_reduce(np.maximum),
+    'PRODUCT': _vector_reduce(np.multiply),
+    'ROUND': lambda values: np.round(values[0], int(values[1])) if len(values) >= 2 else np.round(values[0]),
+    'ABS': lambda values: np.abs(values[0]) if values else 0,
+    'SQRT': lambda values: np.sqrt(values[0]),
+    'POWER': lambda values: np.power(values[0], values[1]),
+    'MOD': lambda values: np.mod(values[0], values[1]),
+    'LN': lambda values: np.log(values[0]),
+    'LOG10': lambda values: np.log10(values[0]),
+    'EXP': lambda values: np.exp(values[0]),
+    'PMT': lambda values: _vector_pmt(*values[:5]),
+    'FV': lambda values: _vector_fv(*values[:5]),
+    'PV': lambda values: _vector_pv(*values[:5]),
+}
+
+def _vector_randbetween(rng, count, low, high):
+    low = np.ceil(np.asarray(low, dtype=float)).astype(np.int64)
+    high = np.floor(np.asarray(high, dtype=float)).astype(np.int64)
+    return rng.integers(low, high, count, endpoint=True).astype(float)
+
+def _function_call(expression):
+    """Split an expression that is one function call into (name, arguments)
+
+    Returns None when the expression does more than call a function, as in
+    RAND()*10 or SUM(A1:A3)+RAND().
+    """
+    match = re.match(r'([A-Z]+)\((.*)\)$', expression)
+    if not match:
+        return None
+    depth = 0
+    for char in match.group(2):
+        depth += (char == '(') - (char == ')')
+        if depth < 0:
+            return None
+    return match.group(1), match.group(2)
+
+def to_cell(ref):
+    """Turn 'B3' or (row, col) into a 0-based (row, col) tuple"""
+    if isinstance(ref, str):
+        col_name, row = parse_cell_reference(ref.replace('$', '').strip().upper())
+        if col_name is None:
+            raise ValueError(f"Invalid cell reference: {ref}")
+        return row - 1, column_name_to_index(col_name)
+    row, col = ref
+    return int(row), int(col)
+
+class ScenarioView(CellSource):
+    """A single scenario of a ScenarioModel, seen as a sheet
+
+    Used to evaluate the formulas that cannot be vectorized with the regular
+    scalar Calculator, one scenario (index) at a time.
+    """
+
+    def __init__(self, model, vectors):
+        self.model = model
+        self.vectors = vectors
+        self.index = 0
+
+    def row_count(self):
+        return self.model.row_count
+
+    def column_count(self):
+        return self.model.column_count
+
+    def get_raw_value(self, row, col):
+        value = self.get_cell_value(row, col)
+        return '' if value is None else value
+
+    def get_cell_value(self, row, col):
+        vector = self.vectors.get((row, col))
+        if vector is None:
+            return self.model.base.get((row, col))
+        value = vector[self.index]
+        return value if isinstance(value, str) else float(value)
+
+    def set_cell_display_value(self, row, col, value):
+        # Results are collected by ScenarioModel, not written back
+        pass
+
+    def iter_formula_cells(self):
+        for (row, col), formula in self.model.order:
+            yield row, col, formula
+
+class ScenarioModel:
+    """The part of a sheet that links some input cells to some output cells
+
+    Built once from a calculated sheet, then evaluated for any number of
+    input combinations without touching the sheet. Only the cone of influence
+    is kept: formula cells downstream of an input and upstream of an output,
+    plus the current values of the other cells those formulas read.
+
+    Formulas are evaluated for all scenarios at once with NumPy arrays over
+    the scenario axis. RAND() and RANDBETWEEN(low, high) draw a new value
+    for every scenario wherever they appear in a formula. A formula that cannot be vectorized, and any scenario
+    whose vectorized result is not finite (division by zero, square root of a
+    negative number, ...), is evaluated by the scalar Calculator instead, so
+    results match a one-at-a-time recalculation.
+    """
+
+    def __init__(self, calculator, input_cells, output_cells, random_cells=()):
+        """Extract the cone of influence from a calculator's sheet
+
+        Args:
+            calculator: Calculator attached to a calculated CellSource
+            input_cells: Cells that vary between scenarios ('A1' or (row, col))
+            output_cells: Cells to report for each scenario
+            random_cells: Formula cells that call RAND or RANDBETWEEN; they
+                and their dependents are recalculated for every scenario
+        """
+        source = calculator.cell_source
+        if source is None:
+            raise ValueError("The calculator has no sheet to evaluate")
+        self.input_cells = [to_cell(ref) for ref in input_cells]
+        self.output_cells = [to_cell(ref) for ref in output_cells]
+        self.row_count = source.row_count()
+        self.column_count = source.column_count()
+
+        calculator.build_dependency_graph(list(source.iter_formula_cells()))
+        inputs = set(self.input_cells)
+        seeds = self.input_cells + [to_cell(ref) for ref in random_cells]
+        downstream = [cell for cell in calculator.get_dependents(seeds) if cell not in inputs]
+        downstream_set = set(downstream)
+
+        # Keep only the downstream cells some output actually depends on
+        needed = set()
+        stack = [cell for cell in self.output_cells if cell in downstream_set]
+        while stack:
+            cell = stack.pop()
+            if cell in needed:
+                continue
+            needed.add(cell)
+            stack.extend(ref for ref in calculator.extract_cell_references(calculator.formula_cells[cell])
+                         if ref in downstream_set)
+        self.order = [(cell, calculator.formula_cells[cell]) for cell in downstream if cell in needed]
+
+        # Current values of everything else the cone and the outputs read
+        cone = inputs | needed
+        self.base = {}
+        referenced = [ref for _, formula in self.order for ref in calculator.extract_cell_references(formula)]
+        for row, col in referenced + self.output_cells:
+            if ((row, col) not in cone and (row, col) not in self.base
+                    and 0 <= row < self.row_count and 0 <= col < self.column_count):
+                self.base[(row, col)] = source.get_cell_value(row, col)
+
+        self._calculator = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_calculator'] = None
+        return state
+
+    def evaluate(self, input_values, workers=1, executor=None, rng=None):
+        """Evaluate the outputs for many input combinations
+
+        Args:
+            input_values: Array-like of shape (scenarios, inputs); a 1-D array
+                is one scenario, or one value per scenario for a single input
+            workers: Number of processes to split the scenarios across
+            executor: Optional process pool to reuse across calls instead of
+                starting one per call
+            rng: numpy.random.Generator for RAND and RANDBETWEEN (a fresh
+                one if None)
+
+        Returns:
+            Float array of shape (scenarios, outputs); errors and text are NaN
+        """
+        values = np.asarray(input_values, dtype=float)
+        if self.input_cells or values.ndim != 2:
+            values = values.reshape(-1, len(self.input_cells))
+        rng = np.random.default_rng() if rng is None else rng
+        if workers > 1 and len(values) > 1:
+            chunks = np.array_split(values, min(workers, len(values)))
+            # Each chunk draws from its own stream, seeded from this one
+            streams = [np.random.default_rng(seed) for seed in rng.integers(2 ** 63, size=len(chunks))]
+            if executor is not None:
+                return np.vstack(list(executor.map(self._evaluate_chunk, chunks, streams)))
+            with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+                return np.vstack(list(pool.map(self._evaluate_chunk, chunks, streams)))
+        return self._evaluate_chunk(values, rng)
+
+    def _evaluate_chunk(self, values, rng):
+        count = len(values)
+        vectors = {cell: values[:, i] for i, cell in enumerate(self.input_cells)}
+        view = ScenarioView(self, vectors)
+        if self._calculator is None:
+            self._calculator = calculator_module.Calculator()
+        self._calculator.set_cell_source(view)
+        # Scenarios that fall back to the scalar Calculator draw from the same stream
+        self._calculator.rng = rng
+        random_functions = {
+            'RAND': lambda: rng.random(count),
+            'RANDBETWEEN': lambda low, high: _vector_randbetween(rng, count, low, high),
+        }
+
+        with np.errstate(all='ignore'):
+            for (row, col), formula in self.order:
+                vectors[(row, col)] = self._evaluate_formula(formula, row, col, vectors, view, count,
+                                                             random_functions)
+
+        results = np.full((count, len(self.output_cells)), np.nan)
+        for j, cell in enumerate(self.output_cells):
+            vector = vectors.get(cell)
+            if vector is None:
+                vector = cell_number(self.base.get(cell))
+            elif vector.dtype == object:
+                vector = np.array([cell_number(value) for value in vector], dtype=float)
+            results[:, j] = vector
+        return results
+
+    def _evaluate_formula(self, formula, row, col, vectors, view, count, random_functions):
+        """Evaluate one formula for every scenario"""
+        try:
+            result = self._evaluate_vectorized(formula, vectors, count, random_functions)
+        except Exception:
+            result = None
+
+        if result is None:
+            result = np.full(count, np.nan)
+            indices = range(count)
+        else:
+            indices = np.flatnonzero(~np.isfinite(result))
+
+        # Scalar fallback, one scenario at a time
+        for index in indices:
+            view.index = index
+            value = self._calculator.evaluate(formula, row, col)
+            try:
+                result[index] = float(value)
+            except (ValueError, TypeError):
+                if result.dtype != object:
+                    result = result.astype(object)
+                result[index] = value
+        return result
+
+    def _evaluate_vectorized(self, formula, vectors, count, random_functions):
+        """Evaluate a formula on arrays, or return None if it cannot be vectorized"""
+        expression = formula[1:].strip()
+        call = _function_call(expression)
+        if call:
+            name, args_str = call
+            function = VECTOR_FUNCTIONS.get(name)
+            if function is None and name in random_functions:
+                function = lambda values: random_functions[name](*values)
+            arguments = self._vector_arguments(args_str, vectors)
+            if function is None or arguments is None:
+                return None
+            result = function(arguments)
+        else:
+            code, refs = self._calculator._compile_expression(expression)
+            namespace = dict(random_functions)
+            for i, cell in enumerate(refs):
+                vector = vectors.get(cell)
+                if vector is not None and vector.dtype == object:
+                    return None
+                namespace[f"_c{i}"] = self._base_number(cell) if vector is None else vector
+            result = eval(code, vars(calculator_module), namespace)
+
+        result = np.asarray(result)
+        if result.dtype.kind not in 'iuf':
+            return None
+        return np.broadcast_to(result, (count,)).astype(float)
+
+    def _vector_arguments(self, args_str, vectors):
+        """Flatten function arguments like Calculator.parse_function_arguments,
+        with arrays for cells that vary between scenarios"""
+        pattern = self._calculator.cell_ref_pattern
+        values = []
+        for arg in (arg.strip() for arg in args_str.split(',')):
+            if not arg:
+                continue
+            if ':' in arg:
+                start, end = (pattern.match(part.strip()) for part in arg.split(':', 1))
+                if not start or not end:
+                    continue
+                rows = sorted((int(start.group(2)) - 1, int(end.group(2)) - 1))
+                cols = sorted((column_name_to_index(start.group(1)), column_name_to_index(end.group(1))))
+                for row in range(max(rows[0], 0), min(rows[1], self.row_count - 1) + 1):
+                    for col in range(max(cols[0], 0), min(cols[1], self.column_count - 1) + 1):
+                        vector = vectors.get((row, col))
+                        if vector is not None:
+                            if vector.dtype == object:
+                                return None
+                            values.append(vector)
+                            continue
+                        value = self.base.get((row, col))
+                        try:
+                            values.append(0 if value is None or value == '' else float(value))
+                        except (ValueError, TypeError):
+                            # Text counts as 0 in a range; uncalculated formulas are skipped
+                            if not str(value).startswith('='):
+                                values.append(0)
+                continue
+
+            try:
+                values.append(float(arg))
+                continue
+            except ValueError:
+                pass
+            match = pattern.match(arg)
+            if not match:
+                continue
+            cell = (int(match.group(2)) - 1, column_name_to_index(match.group(1)))
+            vector = vectors.get(cell)
+            if vector is not None:
+                if vector.dtype == object:
+                    return None
+                values.append(vector)
+                continue
+            try:
+                values.append(float(self.base.get(cell)))
+            except (ValueError, TypeError):
+                # Empty and non-numeric single cells are skipped
+                pass
+        return values
+
+    def _base_number(self, cell):
+        """A cell outside the cone as a number, like Calculator._numeric_cell_value"""
+        row, col = cell
+        if row < 0 or col < 0 or row >= self.row_count or col >= self.column_count:
+            return 0
+        value = self.base.get(cell)
+        if value is None or value == '':
+            return 0
+        try:
+            return float(value)
+        except (ValueError, TypeError):
+            return 0
@@ -0,0 +1,177 @@
+import re
+from collections import defaultdict
+
+def search_pattern(text, match_case=False, match_whole_word=False):
+    """Compile the regular expression Find and Replace use for some text"""
+    pattern = re.escape(text)
+    if match_whole_word:
+        pattern = r'\b' + pattern + r'\b'
+    return re.compile(pattern, 0 if match_case else re.IGNORECASE)
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def _folded(raw, display):
+    """The case-folded text a cell is indexed under"""
+    return raw.lower() if display is None else f"{raw}\n{display}".lower()
+
+def _text(value):
+    return '' if value is None else str(value)
+
+class SearchIndex:
+    """Trigram index over the cell text of the sheets of a workbook.
+
+    For every non-empty cell the index keeps what was entered (the formula
+    for formula cells) and, for formulas, the displayed result. Each distinct
+    case-folded three-character sequence maps to the cells containing it, so
+    a search only verifies the cells that contain every trigram of the query.
+    Queries shorter than three characters check every indexed cell.
+
+    Sources report their edits through CellSource.reindex_cells, which keeps
+    the index current without rescanning the sheets.
+    """
+
+    def __init__(self):
+        self.names = {}  # source -> sheet name, in sheet order
+        self.entries = {}  # (source, row, col) -> (entered text, displayed text or None)
+        self.trigrams = defaultdict(set)  # case-folded trigram -> {(source, row, col)}
+
+    def add_sheet(self, name, source):
+        """Index every cell of a sheet and follow its edits from now on"""
+        if source in self.names:
+            self.remove_sheet(source)
+        self.names[source] = name
+        source.search_index = self
+        entries, trigrams = self.entries, self.trigrams
+        for row, col, raw in source.iter_cells():
+            raw = _text(raw)
+            display = _text(source.get_cell_value(row, col)) if raw.startswith('=') else None
+            key = (source, row, col)
+            entries[key] = (raw, display)
+            text = _folded(raw, display)
+            for i in range(len(text) - 2):
+                trigrams[text[i:i + 3]].add(key)
+
+    def remove_sheet(self, source):
+        """Stop indexing a sheet"""
+        for key in [key for key in self.entries if key[0] is source]:
+            self._unindex(key)
+        self.names.pop(source, None)
+        if source.search_index is self:
+            source.search_index = None
+
+    def rename_sheet(self, source, name):
+        self.names[source] = name
+
+    def refresh_sheet(self, source):
+        """Rebuild a sheet's entries after its contents were replaced wholesale"""
+        self.add_sheet(self.names[source], source)
+
+    def update_cells(self, source, cells):
+        """Re-read some cells of an indexed sheet after they changed"""
+        if source not in self.names:
+            return
+        for row, col in cells:
+            self._unindex((source, row, col))
+            self._index(source, row, col)
+
+    def _index(self, source, row, col):
+        raw = _text(source.get_raw_value(row, col))
+        if not raw:
+            return
+        display = _text(source.get_cell_value(row, col)) if raw.startswith('=') else None
+        key = (source, row, col)
+        self.entries[key] = (raw, display)
+        for trigram in _trigrams(_folded(raw, display)):
+            self.trigrams[trigram].add(key)
+
+    def _unindex(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        for trigram in _trigrams(_folded(*entry)):
+            keys = self.trigrams.get(trigram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.trigrams[trigram]
+
+    def _candidates(self, text, sources):
+        """Cells that may contain text, from the trigram sets"""
+        trigrams = _trigrams(text.lower())
+        if not trigrams:
+            keys = self.entries.keys()
+        else:
+            sets = sorted((self.trigrams.get(trigram, set()) for trigram in trigrams), key=len)
+            keys = set.intersection(*sets) if sets[0] else set()
+        return [key for key in keys if key[0] in sources]
+
+    def find_all(self, text, match_case=False, match_whole_word=False, search_in_formulas=True, sheets=None):
+        """Find every cell containing some text
+
+        Args:
+            text: Text to look for
+            match_case: Only match the same capitalization
+            match_whole_word: Only match whole words
+            search_in_formulas: Also match formula text; otherwise formula
+                cells match on their displayed result only
+            sheets: Sources to search (defaults to every indexed sheet)
+
+        Returns:
+            List of dictionaries with 'sheet' (name), 'source', 'row', 'col'
+            and 'text' (the entered text), in sheet, row, column order
+        """
+        if not text:
+            return []
+        sources = self.names if sheets is None else [source for source in sheets if source in self.names]
+        order = {source: i for i, source in enumerate(self.names)}
+        pattern = search_pattern(text, match_case, match_whole_word)
+
+        matches = []
+        for key in self._candidates(text, set(sources)):
+            raw, display = self.entries[key]
+            if display is None or search_in_formulas:
+                found = pattern.search(raw) or (display is not None and pattern.search(display))
+            else:
+                found = pattern.search(display)
+            if found:
+                matches.append(key)
+        matches.sort(key=lambda key: (order[key[0]], key[1], key[2]))
+        return [{'sheet': self.names[source], 'source': source, 'row': row, 'col': col,
+                 'text': self.entries[(source, row, col)][0]} for source, row, col in matches]
+
+    def replace_all(self, text, replacement, match_case=False, match_whole_word=False, search_in_formulas=True,
+                    sheets=None):
+        """Replace some text in every cell that contains it
+
+        Replacement works on what was entered in the cells; formula cells are
+        left alone unless search_in_formulas is set. Each sheet's edits are
+        written with one CellSource.set_cells call, a single undo step in
+        the GUI.
+
+        Returns:
+            Dictionary with 'cells' (cells changed), 'occurrences' (matches
+            replaced) and 'changed' ({source: [(row, col), ...]})
+        """
+        if not text:
+            return {'cells': 0, 'occurrences': 0, 'changed': {}}
+        pattern = search_pattern(text, match_case, match_whole_word)
+        edits = defaultdict(list)
+        occurrences = 0
+        for match in self.find_all(text, match_case, match_whole_word, search_in_formulas, sheets):
+            raw = match['text']
+            if raw.startswith('=') and not search_in_formulas:
+                continue
+            # A function keeps the replacement literal (no backslash escapes)
+            new_text, count = pattern.subn(lambda _: replacement, raw)
+            if count:
+                edits[match['source']].append((match['row'], match['col'], new_text))
+                occurrences += count
+
+        for source, cells in edits.items():
+            source.set_cells(cells)
+        return {
+            'cells': sum(len(cells) for cells in edits.values()),
+            'occurrences': occurrences,
+            'changed': {source: [(row, col) for row, col, _ in cells] for source, cells in edits.items()},
+        }
@@ -0,0 +1,228 @@
+import math
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .scenarios import ScenarioModel, to_cell
+from ..utils.config import SOLVER_MAX_ITERATIONS, SOLVER_TOLERANCE, SOLVER_CONSTRAINT_TOLERANCE
+
+SOLVER_GOALS = ('max', 'min', 'value')
+SOLVER_METHODS = ('SLSQP', 'COBYLA')
+CONSTRAINT_OPERATORS = ('<=', '>=', '=')
+
+class _Stop(Exception):
+    """Raised from the objective to end the optimization early"""
+
+class Solver:
+    """Maximize, minimize or hit a value in a target cell by changing several
+    input cells, subject to constraints on other cells.
+
+    The formulas between the changing cells and the objective and constraint
+    cells are extracted once (see ScenarioModel); each trial point only
+    re-evaluates that cone. Gradients are forward finite differences: the
+    point and its n perturbations are evaluated as one vectorized batch of
+    n + 1 scenarios, optionally split across a process pool.
+
+    Build the Solver on the thread that owns the sheet; solve() only uses the
+    extracted model and can run on a worker thread.
+    """
+
+    # Relative finite-difference step
+    STEP = 1e-7
+
+    def __init__(self, calculator, objective_cell, changing_cells, goal='max', target_value=None,
+                 constraints=None, method='SLSQP', max_iterations=None, tolerance=None, workers=1):
+        """Prepare an optimization
+
+        Args:
+            calculator: Calculator attached to the sheet
+            objective_cell: Formula cell to optimize ('B10' or (row, col))
+            changing_cells: Input cells the solver may adjust
+            goal: 'max', 'min', or 'value' to bring the objective to target_value
+            target_value: Target for goal='value'
+            constraints: List of (cell, operator, value) with operator one of
+                '<=', '>=' or '='; on changing cells, '<=' and '>=' become bounds
+            method: scipy.optimize method, one of SOLVER_METHODS
+            max_iterations: Maximum optimizer iterations
+            tolerance: Optimizer convergence tolerance
+            workers: Processes to spread the finite-difference batches across
+        """
+        if goal not in SOLVER_GOALS:
+            raise ValueError(f"Unsupported goal: {goal}")
+        if goal == 'value' and target_value is None:
+            raise ValueError("A target value is required to solve for a value")
+        if method not in SOLVER_METHODS:
+            raise ValueError(f"Unsupported solver method: {method}")
+
+        self.goal = goal
+        self.target_value = None if target_value is None else float(target_value)
+        self.method = method
+        self.max_iterations = max_iterations or SOLVER_MAX_ITERATIONS
+        self.tolerance = tolerance or SOLVER_TOLERANCE
+        self.workers = max(1, workers or 1)
+        self.objective_cell = to_cell(objective_cell)
+        self.changing_cells = [to_cell(ref) for ref in changing_cells]
+        if not self.changing_cells:
+            raise ValueError("At least one changing cell is required")
+
+        self.constraints = []
+        self.bounds = [[None, None] for _ in self.changing_cells]
+        for cell, operator, value in constraints or []:
+            if operator not in CONSTRAINT_OPERATORS:
+                raise ValueError(f"Unsupported constraint operator: {operator}")
+            cell, value = to_cell(cell), float(value)
+            self.constraints.append((cell, operator, value))
+            if cell in self.changing_cells and operator != '=':
+                bound = self.bounds[self.changing_cells.index(cell)]
+                if operator == '>=':
+                    bound[0] = value if bound[0] is None else max(bound[0], value)
+                else:
+                    bound[1] = value if bound[1] is None else min(bound[1], value)
+        # Constraints on formula cells go to the optimizer; bounds cover the rest.
+        # COBYLA takes every constraint as a general one, older scipy ignores its bounds
+        self._general = [i for i, (cell, operator, _) in enumerate(self.constraints)
+                         if method == 'COBYLA' or cell not in self.changing_cells or operator == '=']
+
+        outputs = [self.objective_cell] + [cell for cell, _, _ in self.constraints]
+        self.model = ScenarioModel(calculator, self.changing_cells, outputs)
+        if self.objective_cell not in dict(self.model.order):
+            raise ValueError("The objective cell must contain a formula that depends on the changing cells")
+
+        self.start = []
+        for row, col in self.changing_cells:
+            try:
+                self.start.append(float(calculator.cell_source.get_cell_value(row, col)))
+            except (ValueError, TypeError):
+                self.start.append(0.0)
+
+        self.evaluations = 0
+        self._executor = None
+        self._cache = (None, None, None)  # (point bytes, outputs, jacobian)
+        self._last = np.array(self.start)
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """Ask a running solve() to stop; it reports the last point tried"""
+        self._cancelled.set()
+
+    def _outputs(self, x, gradient):
+        """Objective and constraint cell values at x, plus their Jacobian
+
+        Returns:
+            Tuple (values, jacobian); jacobian has shape (outputs, changing
+            cells) and is None unless requested
+        """
+        x = np.asarray(x, dtype=float)
+        key, values, jacobian = self._cache
+        if key == x.tobytes() and (jacobian is not None or not gradient):
+            return values, jacobian
+        if self._cancelled.is_set():
+            raise _Stop("Solver was cancelled")
+
+        self._last = x.copy()
+        self.evaluations += 1
+        if gradient:
+            steps = self.STEP * np.maximum(1.0, np.abs(x))
+            points = np.vstack([x, x + np.diag(steps)])
+            outputs = self.model.evaluate(points, self.workers, self._executor)
+            values = outputs[0]
+            jacobian = ((outputs[1:] - values) / steps[:, None]).T
+        else:
+            values = self.model.evaluate(x)[0]
+            jacobian = None
+        self._cache = (x.tobytes(), values, jacobian)
+        return values, jacobian
+
+    def _objective(self, x):
+        value = self._outputs(x, self.method == 'SLSQP')[0][0]
+        if self.goal == 'max':
+            return -value
+        if self.goal == 'min':
+            return value
+        return (value - self.target_value) ** 2
+
+    def _objective_gradient(self, x):
+        values, jacobian = self._outputs(x, True)
+        if self.goal == 'max':
+            return -jacobian[0]
+        if self.goal == 'min':
+            return jacobian[0]
+        return 2 * (values[0] - self.target_value) * jacobian[0]
+
+    def _scipy_constraints(self):
+        """Constraints in scipy's form: 'ineq' means fun(x) >= 0"""
+        gradient = self.method == 'SLSQP'
+        constraints = []
+        for i in self._general:
+            _, operator, value = self.constraints[i]
+            sign = -1.0 if operator == '<=' else 1.0
+            constraint = {
+                'type': 'eq' if operator == '=' else 'ineq',
+                'fun': lambda x, i=i, sign=sign, value=value: sign * (self._outputs(x, gradient)[0][i + 1] - value),
+            }
+            if gradient:
+                constraint['jac'] = lambda x, i=i, sign=sign: sign * self._outputs(x, True)[1][i + 1]
+            constraints.append(constraint)
+        return constraints
+
+    def solve(self):
+        """Run the optimization
+
+        Returns:
+            Dictionary with 'success', 'values' (one per changing cell),
+            'objective', 'constraints' (cell, operator, value, actual,
+            satisfied), 'iterations', 'evaluations' and 'message'
+        """
+        from scipy.optimize import minimize
+
+        options = {'maxiter': self.max_iterations}
+        kwargs = {}
+        if self.method == 'SLSQP':
+            kwargs['jac'] = self._objective_gradient
+            # For 'value' the objective is the squared error, so square the tolerance too
+            options['ftol'] = self.tolerance ** 2 if self.goal == 'value' else self.tolerance
+        else:
+            options['tol'] = self.tolerance
+        if self.method == 'SLSQP' and any(low is not None or high is not None for low, high in self.bounds):
+            kwargs['bounds'] = [tuple(bound) for bound in self.bounds]
+
+        x0 = np.array(self.start)
+        for i, (low, high) in enumerate(self.bounds):
+            x0[i] = min(max(x0[i], -math.inf if low is None else low), math.inf if high is None else high)
+
+        try:
+            if self.workers > 1:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            result = minimize(self._objective, x0, method=self.method, constraints=self._scipy_constraints(),
+                              options=options, **kwargs)
+            x, success, message, iterations = result.x, bool(result.success), str(result.message), getattr(result, 'nit', None)
+        except _Stop as e:
+            x, success, message, iterations = self._last, False, str(e), None
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+        values = self._outputs(x, False)[0]
+        report = []
+        for i, (cell, operator, value) in enumerate(self.constraints):
+            actual = values[i + 1]
+            slack = SOLVER_CONSTRAINT_TOLERANCE * max(1.0, abs(value))
+            satisfied = bool(
+                (operator == '<=' and actual <= value + slack) or
+                (operator == '>=' and actual >= value - slack) or
+                (operator == '=' and abs(actual - value) <= slack)
+            )
+            report.append((cell, operator, value, float(actual), satisfied))
+        feasible = all(satisfied for *_, satisfied in report)
+        if success and not feasible:
+            success, message = False, "The solution does not satisfy all constraints"
+
+        return {
+            'success': success,
+            'values': [float(value) for value in x],
+            'objective': float(values[0]),
+            'constraints': report,
+            'iterations': iterations,
+            'evaluations': self.evaluations,
+            'message': message,
+        }
@@ -0,0 +1,101 @@
+import numpy as np
+from ..utils.helpers import cell_number
+
+# Rank of each kind of value within one sort key. Numbers come before text
+# when ascending and after it when descending; blanks always go last.
+_NUMBER, _TEXT, _BLANK = 0, 1, 2
+
+def key_arrays(values, ascending=True):
+    """Typed sort keys for one column
+
+    Args:
+        values: The column's cell values (numbers, numeric text, text, None or '')
+        ascending: Sort direction for this column
+
+    Returns:
+        Tuple (kind, value) of arrays for np.lexsort, most significant first:
+        kind orders numbers, text and blanks; value orders within a kind
+        (the number itself, or the rank of case-folded text)
+    """
+    count = len(values)
+    try:
+        # All numbers or numeric text (None becomes NaN and is caught below)
+        numbers = np.array(values, dtype=float)
+        blank = is_text = np.zeros(count, dtype=bool)
+        if np.isnan(numbers).any():
+            raise ValueError
+    except (ValueError, TypeError):
+        numbers = np.fromiter(map(cell_number, values), dtype=float, count=count)
+        blank = np.fromiter((value is None or value == '' for value in values), dtype=bool, count=count)
+        is_text = np.isnan(numbers) & ~blank
+
+    value = np.where(np.isnan(numbers), 0.0, numbers)
+    if is_text.any():
+        import pandas as pd
+        text = pd.Series(values, dtype=object)[is_text].astype(str).str.lower()
+        ranks, _ = pd.factorize(text, sort=True)
+        value[is_text] = ranks
+
+    kind = np.where(is_text, _TEXT, _NUMBER)
+    if not ascending:
+        kind = _TEXT - kind
+        value = -value
+    kind[blank] = _BLANK
+    return kind, value
+
+def sort_order(columns, ascending=True):
+    """Stable multi-key sort order
+
+    Args:
+        columns: Key columns, most significant first, each a sequence of cell values
+        ascending: One direction for all keys, or a list with one per key
+
+    Returns:
+        Integer array: position i of the sorted rows holds original row order[i]
+    """
+    if isinstance(ascending, bool):
+        ascending = [ascending] * len(columns)
+    if len(ascending) != len(columns):
+        raise ValueError("Give one sort direction per key column")
+
+    keys = []
+    # np.lexsort sorts by its last key first
+    for values, direction in zip(reversed(columns), reversed(ascending)):
+        kind, value = key_arrays(values, direction)
+        keys.append(value)
+        if kind.min() != kind.max():
+            keys.append(kind)
+    return np.lexsort(keys)
+
+def sort_range(source, bounds, keys, has_header=False):
+    """Sort the rows of a block of cells in place
+
+    Args:
+        source: CellSource holding the block
+        bounds: (top, left, bottom, right) of the block, 0-based inclusive
+        keys: List of (col, ascending) with col a sheet column inside the
+            block; earlier keys take precedence
+        has_header: Leave the block's first row where it is
+
+    Returns:
+        Dictionary with 'rows' (rows sorted) and 'moved_rows' (sheet rows
+        whose contents changed)
+    """
+    top, left, bottom, right = bounds
+    if has_header:
+        top += 1
+    if not keys:
+        raise ValueError("At least one sort key is required")
+    for col, _ in keys:
+        if not left <= col <= right:
+            raise ValueError("Sort keys must be columns of the sorted range")
+    if bottom <= top:
+        return {'rows': max(bottom - top + 1, 0), 'moved_rows': []}
+
+    columns = [source.get_column_values(col, top, bottom) for col, _ in keys]
+    order = sort_order(columns, [ascending for _, ascending in keys])
+    moved = np.flatnonzero(order != np.arange(len(order)))
+    if len(moved):
+        source.move_rows(top, left, bottom, right, order)
+
+    return {'rows': len(order), 'moved_rows': (moved + top).tolist()}
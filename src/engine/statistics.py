@@ -0,0 +1,245 @@
+import numpy as np
+
+from ..utils.config import STATS_CHUNK_ROWS, STATS_DIGEST_COMPRESSION, STATS_MODE_LIMIT
+from ..utils.helpers import cell_number
+
+def numeric_values(values):
+    """The numbers among some cell values
+
+    Args:
+        values: Cell values (numbers, numeric text, text, None or '')
+
+    Returns:
+        Float array of the values that read as numbers, in order
+    """
+    try:
+        # All numbers or numeric text (None becomes NaN)
+        numbers = np.array(values, dtype=float)
+    except (ValueError, TypeError):
+        numbers = np.fromiter(map(cell_number, values), dtype=float, count=len(values))
+    return numbers[~np.isnan(numbers)]
+
+def iter_numeric_chunks(source, bounds, chunk_rows=None):
+    """Read the numbers of a block column by column, a few rows at a time
+
+    Args:
+        source: CellSource holding the block
+        bounds: (top, left, bottom, right) of the block, 0-based inclusive
+        chunk_rows: Rows read per chunk (defaults to STATS_CHUNK_ROWS)
+
+    Yields:
+        Float arrays of the numeric cells of each chunk
+    """
+    chunk_rows = chunk_rows or STATS_CHUNK_ROWS
+    top, left, bottom, right = bounds
+    for col in range(left, right + 1):
+        for start in range(top, bottom + 1, chunk_rows):
+            numbers = numeric_values(source.get_column_values(col, start, min(start + chunk_rows - 1, bottom)))
+            if len(numbers):
+                yield numbers
+
+class TDigest:
+    """Mergeable quantile sketch (a merging t-digest)
+
+    Values are kept as weighted centroids. Each compression pass sorts the
+    centroids and merges neighbours whose quantiles fall in the same unit
+    of the arcsine scale k(q) = compression / (2 pi) * asin(2q - 1), so the
+    digest holds about compression / 2 centroids: wide ones around the
+    median, single values in the tails. While every centroid is a single
+    value, quantiles match np.percentile exactly.
+    """
+
+    def __init__(self, compression=None):
+        self.compression = compression or STATS_DIGEST_COMPRESSION
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.low = np.inf
+        self.high = -np.inf
+
+    @property
+    def count(self):
+        return float(self.weights.sum())
+
+    def update(self, values):
+        """Add an array of values"""
+        values = np.asarray(values, dtype=float)
+        if not len(values):
+            return
+        self.low = min(self.low, float(values.min()))
+        self.high = max(self.high, float(values.max()))
+        self._compress(np.concatenate([self.means, values]),
+                       np.concatenate([self.weights, np.ones(len(values))]))
+
+    def merge(self, other):
+        """Add the values of another digest (from another chunk or thread)"""
+        if not len(other.means):
+            return
+        self.low = min(self.low, other.low)
+        self.high = max(self.high, other.high)
+        self._compress(np.concatenate([self.means, other.means]),
+                       np.concatenate([self.weights, other.weights]))
+
+    def _compress(self, means, weights):
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        cumulative = np.cumsum(weights)
+        middle = (cumulative - weights / 2) / cumulative[-1]
+        units = np.floor(self.compression / (2 * np.pi) * np.arcsin(2 * middle - 1))
+        # Sorted values have increasing quantiles, so each unit is a run of centroids
+        starts = np.flatnonzero(np.r_[True, units[1:] != units[:-1]])
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def quantile(self, q):
+        """Estimate quantiles, interpolated like np.percentile
+
+        Args:
+            q: Quantile or array of quantiles between 0 and 1
+
+        Returns:
+            The estimate(s), NaN when the digest is empty
+        """
+        if not len(self.means):
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        # A centroid stands at the mean position of the sorted values it holds
+        centers = np.cumsum(self.weights) - self.weights / 2 - 0.5
+        last = self.weights.sum() - 1
+        positions = np.r_[0.0, centers, last]
+        estimates = np.r_[self.low, self.means, self.high]
+        return np.interp(np.asarray(q, dtype=float) * last, positions, estimates)
+
+class StreamingStatistics:
+    """Descriptive statistics gathered in one pass over chunks of values
+
+    Count, mean and the central moments up to the fourth are combined chunk
+    by chunk with the pairwise update of Chan et al. (Welford's update for
+    whole arrays); quartiles come from a TDigest. Partial results for
+    different chunks, columns or threads combine with merge. The mode is
+    counted exactly until more than STATS_MODE_LIMIT distinct values turn
+    up, after which it is not reported.
+    """
+
+    def __init__(self, compression=None, mode_limit=None):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # Sums of the 2nd-4th powers of the deviations from the mean
+        self.m3 = 0.0
+        self.m4 = 0.0
+        self.total = 0.0
+        self.low = np.inf
+        self.high = -np.inf
+        self.digest = TDigest(compression)
+        self.mode_limit = STATS_MODE_LIMIT if mode_limit is None else mode_limit
+        self.value_counts = None  # value -> occurrences, False once past mode_limit
+
+    def update(self, values):
+        """Add a chunk of values; NaN entries are ignored"""
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        count = len(values)
+        if not count:
+            return
+        mean = values.mean()
+        deviations = values - mean
+        squares = deviations * deviations
+        self._combine(count, mean, squares.sum(), (squares * deviations).sum(), (squares * squares).sum())
+        self.total += float(values.sum())
+        self.low = min(self.low, float(values.min()))
+        self.high = max(self.high, float(values.max()))
+        self.digest.update(values)
+        self._count_values(values)
+
+    def merge(self, other):
+        """Add the values gathered by another StreamingStatistics"""
+        if not other.count:
+            return
+        self._combine(other.count, other.mean, other.m2, other.m3, other.m4)
+        self.total += other.total
+        self.low = min(self.low, other.low)
+        self.high = max(self.high, other.high)
+        self.digest.merge(other.digest)
+        if other.value_counts is False:
+            self.value_counts = False
+        elif other.value_counts is not None:
+            self._add_counts(other.value_counts)
+
+    def _combine(self, count, mean, m2, m3, m4):
+        na, nb = float(self.count), float(count)
+        n = na + nb
+        delta = mean - self.mean
+        delta_n = delta / n
+        self.m4 = (self.m4 + m4 + delta * delta_n ** 3 * na * nb * (na * na - na * nb + nb * nb)
+                   + 6 * delta_n ** 2 * (na * na * m2 + nb * nb * self.m2)
+                   + 4 * delta_n * (na * m3 - nb * self.m3))
+        self.m3 = (self.m3 + m3 + delta * delta_n ** 2 * na * nb * (na - nb)
+                   + 3 * delta_n * (na * m2 - nb * self.m2))
+        self.m2 = self.m2 + m2 + delta * delta_n * na * nb
+        self.mean = self.mean + delta_n * nb
+        self.count += count
+
+    def _count_values(self, values):
+        if self.value_counts is False:
+            return
+        import pandas as pd
+        self._add_counts(pd.Series(values).value_counts(sort=False))
+
+    def _add_counts(self, counts):
+        if self.value_counts is not None:
+            counts = self.value_counts.add(counts, fill_value=0)
+        self.value_counts = counts if len(counts) <= self.mode_limit else False
+
+    def mode(self):
+        """The most frequent value (the smallest one on a tie), or None if not counted"""
+        if self.value_counts is None or self.value_counts is False:
+            return None
+        counts = self.value_counts
+        return float(counts.index[counts.to_numpy() == counts.max()].min())
+
+    def result(self):
+        """The statistics gathered so far
+
+        Returns:
+            Dictionary with the keys of DescriptiveStatistics.calculate_statistics
+        """
+        if not self.count:
+            return {'error': 'No data provided'}
+        n = self.count
+        q1, median, q3 = self.digest.quantile([0.25, 0.5, 0.75])
+        variance = self.m2 / (n - 1) if n > 1 else np.nan
+        stats_dict = {
+            'count': n,
+            'mean': self.mean,
+            'median': median,
+            'mode': self.mode(),
+            'std_dev': np.sqrt(variance),
+            'variance': variance,
+            'min': self.low,
+            'max': self.high,
+            'range': self.high - self.low,
+            'sum': self.total,
+            'quartile_1': q1,
+            'quartile_2': median,
+            'quartile_3': q3,
+            'iqr': q3 - q1
+        }
+        if n > 1:
+            # Population (biased) estimates, as scipy.stats.skew and kurtosis give by default
+            stats_dict['skewness'] = np.sqrt(n) * self.m3 / self.m2 ** 1.5 if self.m2 else np.nan
+            stats_dict['kurtosis'] = n * self.m4 / self.m2 ** 2 - 3 if self.m2 else np.nan
+        return stats_dict
+
+def describe_range(source, bounds, chunk_rows=None):
+    """Descriptive statistics of the numeric cells of a block, read in chunks
+
+    Args:
+        source: CellSource holding the block
+        bounds: (top, left, bottom, right) of the block, 0-based inclusive
+        chunk_rows: Rows read per chunk (defaults to STATS_CHUNK_ROWS)
+
+    Returns:
+        Dictionary of statistics (see StreamingStatistics.result)
+    """
+    stats = StreamingStatistics()
+    for numbers in iter_numeric_chunks(source, bounds, chunk_rows):
+        stats.update(numbers)
+    return stats.result()
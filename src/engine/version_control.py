@@ -1,20 +1,115 @@
 import os
+import io
+import bz2
 import json
+import lzma
 import shutil
 import hashlib
 import datetime
+import sqlite3
+import tempfile
+import threading
+import time
 import zipfile
+import zlib
 from pathlib import Path
-import tempfile
 import uuid
+from ..utils.config import (VERSION_COMPRESSION_CODEC, VERSION_COMPRESSION_LEVEL,
+                            VERSION_RETENTION, VERSION_GC_INTERVAL)
 
 class VersionControl:
-    def __init__(self):
-        """Initialize version control system"""
-        self.app_data_dir = self._get_app_data_dir()
+    # Sheets are stored as tiles of TILE_ROWS x TILE_COLS cells. Each tile is a
+    # content-addressed chunk, so versions share unchanged regions and a diff
+    # only has to decompress the tiles whose hashes differ. New versions use
+    # this shape; each manifest records the shape it was written with, and
+    # stored versions are always read back with their own.
+    TILE_ROWS = 256
+    TILE_COLS = 16
+    
+    # Format 2 manifests do not record a tile shape; they all used 256 x 16
+    UNRECORDED_TILE_SHAPE = (256, 16)
+    
+    # Older versions are stored as reverse deltas against the next newer
+    # version. Every KEYFRAME_INTERVAL-th version keeps a full manifest so the
+    # chain that has to be walked to rebuild an old version stays short.
+    KEYFRAME_INTERVAL = 32
+    
+    MANIFEST_FORMAT = 3
+    
+    # Supported chunk codecs. Chunks are self-describing (each codec's stream
+    # starts with a distinct magic prefix), so the codec can be changed at any
+    # time and chunks written with a previous setting still load.
+    COMPRESSION_CODECS = ('zlib', 'lzma', 'bz2', 'none')
+    
+    # Block size used when streaming chunk files into a decompressor
+    READ_BLOCK_SIZE = 64 * 1024
+    
+    # Chunks modified this recently are never swept, which covers coarse
+    # filesystem timestamps for chunks reused by a save running concurrently
+    GC_GRACE_SECONDS = 2
+    
+    CATALOG_SCHEMA = """
+        CREATE TABLE IF NOT EXISTS versions (
+            version_id TEXT PRIMARY KEY,
+            document_id TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            timestamp TEXT NOT NULL,
+            comment TEXT NOT NULL DEFAULT '',
+            filepath TEXT NOT NULL,
+            size INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_versions_document_seq ON versions(document_id, seq);
+        CREATE INDEX IF NOT EXISTS idx_versions_document_timestamp ON versions(document_id, timestamp);
+    """
+    
+    def __init__(self, app_data_dir=None, codec=None, level=None, retention=None):
+        """Initialize version control system
+        
+        Args:
+            app_data_dir: Optional storage root (defaults to the per-user app data dir)
+            codec: Chunk compression codec, one of COMPRESSION_CODECS
+                   (defaults to VERSION_COMPRESSION_CODEC)
+            level: Compression level 0-9 (defaults to VERSION_COMPRESSION_LEVEL)
+            retention: Retention policy dictionary (defaults to VERSION_RETENTION)
+        """
+        self.retention = dict(VERSION_RETENTION, **(retention or {}))
+        self.codec = codec or VERSION_COMPRESSION_CODEC
+        self.level = VERSION_COMPRESSION_LEVEL if level is None else level
+        if self.codec not in self.COMPRESSION_CODECS:
+            raise ValueError(f"Unsupported compression codec: {self.codec}")
+        
+        self.app_data_dir = app_data_dir or self._get_app_data_dir()
         self.versions_dir = os.path.join(self.app_data_dir, 'versions')
         self._ensure_directories_exist()
         
+        # Directories already created this session, so they are not re-checked on every access
+        self._known_dirs = set()
+        # Documents whose legacy versions.json has been checked for migration
+        self._migrated_documents = set()
+        
+        self._catalog_lock = threading.RLock()
+        self._catalog = sqlite3.connect(os.path.join(self.versions_dir, 'catalog.db'),
+                                        check_same_thread=False)
+        self._catalog.row_factory = sqlite3.Row
+        self._catalog.execute('PRAGMA journal_mode=WAL')
+        self._catalog.executescript(self.CATALOG_SCHEMA)
+        
+        # Saves currently writing chunks; the chunk sweep waits for a quiet moment
+        self._saves_in_progress = 0
+        # Held while a save reuses an existing chunk and while the sweep checks
+        # and deletes one, so a chunk is never deleted just after being reused
+        self._chunk_lock = threading.Lock()
+        self._gc_thread = None
+        self._gc_stop = threading.Event()
+        self._gc_wakeup = threading.Event()
+        self._gc_pending = set()
+        
+    def close(self):
+        """Stop background garbage collection and close the version catalog"""
+        self.stop_background_gc()
+        with self._catalog_lock:
+            self._catalog.close()
+        
     def _get_app_data_dir(self):
         """Get the application data directory based on OS"""
         home = str(Path.home())
@@ -36,7 +131,9 @@ class VersionControl:
     def _get_document_versions_dir(self, document_id):
         """Get the directory for a specific document's versions"""
         doc_dir = os.path.join(self.versions_dir, document_id)
-        os.makedirs(doc_dir, exist_ok=True)
+        if doc_dir not in self._known_dirs:
+            os.makedirs(doc_dir, exist_ok=True)
+            self._known_dirs.add(doc_dir)
         return doc_dir
     
     def _generate_document_id(self, filepath):
@@ -44,12 +141,289 @@ class VersionControl:
         return hashlib.md5(filepath.encode('utf-8')).hexdigest()
     
     def _get_version_data_path(self, document_id):
-        """Get the path to the versions metadata file"""
+        """Get the path to the legacy versions metadata file"""
         return os.path.join(self._get_document_versions_dir(document_id), 'versions.json')
     
+    def _migrate_legacy_catalog(self, document_id):
+        """Import a document's legacy versions.json into the catalog (once)"""
+        if document_id in self._migrated_documents:
+            return
+        self._migrated_documents.add(document_id)
+        
+        versions_file = self._get_version_data_path(document_id)
+        if not os.path.exists(versions_file):
+            return
+            
+        try:
+            with open(versions_file, 'r') as f:
+                legacy_versions = json.load(f)
+        except Exception as e:
+            print(f"Error reading legacy version metadata: {e}")
+            return
+            
+        with self._catalog_lock, self._catalog:
+            for seq, version in enumerate(legacy_versions):
+                self._catalog.execute(
+                    'INSERT OR IGNORE INTO versions (version_id, document_id, seq, timestamp, comment, filepath, size) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (version['version_id'], document_id, seq, version['timestamp'],
+                     version.get('comment') or '', version['filepath'], version.get('size', 0)))
+        os.replace(versions_file, versions_file + '.migrated')
+    
+    def _get_latest_version(self, document_id):
+        """Get the newest version's catalog row for a document, or None"""
+        self._migrate_legacy_catalog(document_id)
+        with self._catalog_lock:
+            row = self._catalog.execute(
+                'SELECT * FROM versions WHERE document_id = ? ORDER BY seq DESC LIMIT 1',
+                (document_id,)).fetchone()
+        return dict(row) if row else None
+    
+    def _get_version_info(self, document_id, version_id):
+        """Get a single version's catalog row, or None"""
+        self._migrate_legacy_catalog(document_id)
+        with self._catalog_lock:
+            row = self._catalog.execute(
+                'SELECT * FROM versions WHERE document_id = ? AND version_id = ?',
+                (document_id, version_id)).fetchone()
+        return dict(row) if row else None
+    
+    def _get_chunks_dir(self, document_id):
+        """Get the directory holding a document's content-addressed tile chunks"""
+        chunks_dir = os.path.join(self._get_document_versions_dir(document_id), 'chunks')
+        if chunks_dir not in self._known_dirs:
+            os.makedirs(chunks_dir, exist_ok=True)
+            self._known_dirs.add(chunks_dir)
+        return chunks_dir
+    
+    def _get_manifest_path(self, document_id, version_id):
+        """Get the path to the tile manifest of a version"""
+        return os.path.join(self._get_document_versions_dir(document_id), f"{version_id}.manifest.json")
+    
+    def _tile_shape(self, manifest):
+        """The (rows, cols) of the tiles a manifest's keys refer to"""
+        if 'tile_rows' not in manifest:
+            return self.UNRECORDED_TILE_SHAPE
+        return manifest['tile_rows'], manifest['tile_cols']
+    
+    def _split_into_tiles(self, sheet_data, tile_shape=None):
+        """Split a sheet (list of rows) into tiles
+        
+        Args:
+            sheet_data: List of row lists
+            tile_shape: (rows, cols) of a tile; defaults to TILE_ROWS x TILE_COLS
+            
+        Returns:
+            Tuple of (row count, column count, {tile_key: tile rows}). Tiles
+            that contain only empty cells are omitted.
+        """
+        tile_rows, tile_cols = tile_shape or (self.TILE_ROWS, self.TILE_COLS)
+        n_rows = len(sheet_data)
+        n_cols = max((len(row) for row in sheet_data), default=0)
+        tiles = {}
+        
+        for row_start in range(0, n_rows, tile_rows):
+            block = sheet_data[row_start:row_start + tile_rows]
+            for col_start in range(0, n_cols, tile_cols):
+                tile = [list(row[col_start:col_start + tile_cols]) for row in block]
+                if any(value not in ('', None) for row in tile for value in row):
+                    key = f"{row_start // tile_rows},{col_start // tile_cols}"
+                    tiles[key] = tile
+                    
+        return n_rows, n_cols, tiles
+    
+    def _make_compressor(self):
+        """Create a streaming compressor for the configured codec (None for 'none')"""
+        if self.codec == 'zlib':
+            return zlib.compressobj(self.level)
+        elif self.codec == 'lzma':
+            return lzma.LZMACompressor(preset=self.level)
+        elif self.codec == 'bz2':
+            return bz2.BZ2Compressor(max(1, self.level))
+        return None
+    
+    def _make_decompressor(self, header):
+        """Create a streaming decompressor for a chunk, detected from its first bytes"""
+        if header.startswith(b'\xfd7zXZ\x00'):
+            return lzma.LZMADecompressor()
+        elif header.startswith(b'BZh'):
+            return bz2.BZ2Decompressor()
+        elif header[:1] == b'x':
+            return zlib.decompressobj()
+        return None  # Uncompressed JSON
+    
+    def _write_chunk(self, document_id, tile):
+        """Store a tile as a compressed chunk and return its hash
+        
+        Chunks are content addressed, so a tile that is identical to one
+        already stored (by this or any earlier version) is not compressed or
+        written again. The JSON encoder's output is hashed and fed to the
+        compressor piece by piece, straight into the chunk file.
+        """
+        pieces = [piece.encode('utf-8') for piece in
+                  json.JSONEncoder(separators=(',', ':')).iterencode(tile)]
+        hasher = hashlib.sha1()
+        for piece in pieces:
+            hasher.update(piece)
+        chunk_hash = hasher.hexdigest()
+        chunk_path = os.path.join(self._get_chunks_dir(document_id), chunk_hash)
+        
+        with self._chunk_lock:
+            try:
+                # Refresh the timestamp so a concurrent sweep treats the chunk as in use
+                os.utime(chunk_path)
+                return chunk_hash
+            except FileNotFoundError:
+                pass
+                
+        compressor = self._make_compressor()
+        
+        def write(f):
+            for piece in pieces:
+                f.write(compressor.compress(piece) if compressor else piece)
+            if compressor:
+                f.write(compressor.flush())
+                
+        self._write_atomically(chunk_path, write, 'wb')
+        return chunk_hash
+    
+    def _write_atomically(self, path, write, mode):
+        """Write a file through a temporary file of its own in the same directory
+        
+        Readers only ever see a complete file, and concurrent writers of the
+        same path each use a different temporary file.
+        
+        Args:
+            path: Destination path
+            write: Callable receiving the open temporary file
+            mode: File mode, 'w' or 'wb'
+        """
+        fd, temp_path = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp',
+                                         dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, mode) as f:
+                write(f)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+    
+    def _read_chunk(self, document_id, chunk_hash):
+        """Load a single tile chunk, decompressing it block by block"""
+        chunk_path = os.path.join(self._get_chunks_dir(document_id), chunk_hash)
+        with open(chunk_path, 'rb') as f:
+            block = f.read(self.READ_BLOCK_SIZE)
+            decompressor = self._make_decompressor(block)
+            parts = []
+            while block:
+                parts.append(decompressor.decompress(block) if decompressor else block)
+                block = f.read(self.READ_BLOCK_SIZE)
+        return json.loads(b''.join(parts))
+    
+    def _read_manifest(self, document_id, version_id):
+        """Read a version manifest, or None for legacy (single zip) versions"""
+        manifest_path = self._get_manifest_path(document_id, version_id)
+        if not os.path.exists(manifest_path):
+            return None
+        with open(manifest_path, 'r') as f:
+            return json.load(f)
+    
+    def _write_manifest(self, document_id, version_id, manifest):
+        """Write a version manifest atomically"""
+        self._write_atomically(self._get_manifest_path(document_id, version_id),
+                               lambda f: json.dump(manifest, f, separators=(',', ':')), 'w')
+    
+    def _resolve_manifest(self, document_id, version_id):
+        """Resolve a version's manifest into a full tile map
+        
+        Walks the reverse-delta chain towards the newest full manifest and
+        then applies the deltas back down to the requested version. Only
+        manifests are read; no chunk is decompressed.
+        
+        Returns:
+            Full manifest dictionary, or None if the version has no manifest
+        """
+        chain = []
+        current_id = version_id
+        while current_id:
+            manifest = self._read_manifest(document_id, current_id)
+            if manifest is None:
+                return None
+            chain.append(manifest)
+            current_id = manifest.get('base')
+            
+        # The last manifest in the chain is a full one
+        resolved = chain.pop()
+        sheets = {name: dict(sheet, tiles=dict(sheet['tiles']))
+                  for name, sheet in resolved['sheets'].items()}
+        
+        for delta in reversed(chain):
+            for name in delta.get('removed_sheets', []):
+                sheets.pop(name, None)
+            for name, sheet in delta['sheets'].items():
+                tiles = sheets[name]['tiles'] if name in sheets else {}
+                for key, chunk_hash in sheet['tiles'].items():
+                    if chunk_hash is None:
+                        tiles.pop(key, None)
+                    else:
+                        tiles[key] = chunk_hash
+                sheets[name] = {'rows': sheet['rows'], 'cols': sheet['cols'], 'tiles': tiles}
+            resolved = delta
+            
+        # A delta always has the tile shape of its base
+        tile_rows, tile_cols = self._tile_shape(resolved)
+        return {
+            'format': self.MANIFEST_FORMAT,
+            'base': None,
+            'tile_rows': tile_rows,
+            'tile_cols': tile_cols,
+            'sheet_order': resolved['sheet_order'],
+            'sheets': sheets
+        }
+    
+    def _make_delta(self, manifest, base_manifest, base_id):
+        """Express a full manifest as a reverse delta against a newer full manifest"""
+        delta_sheets = {}
+        for name, sheet in manifest['sheets'].items():
+            base_tiles = base_manifest['sheets'].get(name, {}).get('tiles', {})
+            tiles = {key: chunk_hash for key, chunk_hash in sheet['tiles'].items()
+                     if base_tiles.get(key) != chunk_hash}
+            # Tiles that only exist in the base are empty in this version
+            tiles.update({key: None for key in base_tiles if key not in sheet['tiles']})
+            delta_sheets[name] = {'rows': sheet['rows'], 'cols': sheet['cols'], 'tiles': tiles}
+            
+        tile_rows, tile_cols = self._tile_shape(manifest)
+        return {
+            'format': self.MANIFEST_FORMAT,
+            'base': base_id,
+            'tile_rows': tile_rows,
+            'tile_cols': tile_cols,
+            'sheet_order': manifest['sheet_order'],
+            'sheets': delta_sheets,
+            'removed_sheets': [name for name in base_manifest['sheets'] if name not in manifest['sheets']]
+        }
+    
+    def _assemble_sheet(self, document_id, sheet, tile_shape):
+        """Rebuild a sheet's rows from its resolved tile map"""
+        tile_rows, tile_cols = tile_shape
+        rows = [[''] * sheet['cols'] for _ in range(sheet['rows'])]
+        for key, chunk_hash in sheet['tiles'].items():
+            tile_row, tile_col = (int(part) for part in key.split(','))
+            row_start = tile_row * tile_rows
+            col_start = tile_col * tile_cols
+            for r, tile_values in enumerate(self._read_chunk(document_id, chunk_hash)):
+                rows[row_start + r][col_start:col_start + len(tile_values)] = tile_values
+        return rows
+    
     def save_version(self, filepath, data, comment=''):
         """Save a new version of the document
         
+        The new version gets a full manifest; the previous newest version is
+        rewritten as a reverse delta against it (unless it is a keyframe).
+        
         Args:
             filepath: Path to the original document
             data: Document data to save (workbook dictionary)
@@ -58,68 +432,119 @@ class VersionControl:
         Returns:
             Dictionary with version info
         """
+        # Chunks written below are unreferenced until the manifest and catalog
+        # row exist, so the chunk sweep must not run in the meantime
+        with self._catalog_lock:
+            self._saves_in_progress += 1
+            
         try:
             # Generate document ID
             document_id = self._generate_document_id(filepath)
-            doc_versions_dir = self._get_document_versions_dir(document_id)
             
             # Create version metadata
             timestamp = datetime.datetime.now().isoformat()
             version_id = str(uuid.uuid4())
-            version_file = os.path.join(doc_versions_dir, f"{version_id}.zip")
             
-            # Save document data
-            with tempfile.NamedTemporaryFile(mode='w', delete=False) as temp_file:
-                json.dump(data, temp_file)
-                temp_path = temp_file.name
-                
-            # Create a zip archive of the document data
-            with zipfile.ZipFile(version_file, 'w', compression=zipfile.ZIP_DEFLATED) as zipf:
-                zipf.write(temp_path, arcname='document.json')
+            # Store every non-empty tile as a chunk
+            manifest = {
+                'format': self.MANIFEST_FORMAT,
+                'base': None,
+                'tile_rows': self.TILE_ROWS,
+                'tile_cols': self.TILE_COLS,
+                'sheet_order': list(data.keys()),
+                'sheets': {}
+            }
+            size = 0
+            chunks_dir = self._get_chunks_dir(document_id)
+            for sheet_name, sheet_data in data.items():
+                n_rows, n_cols, tiles = self._split_into_tiles(sheet_data)
+                tile_hashes = {}
+                for key, tile in tiles.items():
+                    chunk_hash = self._write_chunk(document_id, tile)
+                    tile_hashes[key] = chunk_hash
+                    size += os.path.getsize(os.path.join(chunks_dir, chunk_hash))
+                manifest['sheets'][sheet_name] = {'rows': n_rows, 'cols': n_cols, 'tiles': tile_hashes}
                 
-            # Clean up temp file
-            os.unlink(temp_path)
+            self._write_manifest(document_id, version_id, manifest)
             
-            # Update versions metadata
             version_info = {
                 'version_id': version_id,
                 'timestamp': timestamp,
                 'comment': comment,
                 'filepath': filepath,
-                'size': os.path.getsize(version_file)
+                'size': size
             }
             
-            versions_data = self.get_versions(document_id)
-            versions_data.append(version_info)
-            
-            with open(self._get_version_data_path(document_id), 'w') as f:
-                json.dump(versions_data, f, indent=2)
+            with self._catalog_lock:
+                previous = self._get_latest_version(document_id)
+                
+                # Register the version; the manifest and chunks are already on disk,
+                # so a failure here leaves only unreferenced files behind
+                with self._catalog:
+                    self._catalog.execute(
+                        'INSERT INTO versions (version_id, document_id, seq, timestamp, comment, filepath, size) '
+                        'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                        (version_id, document_id, previous['seq'] + 1 if previous else 0,
+                         timestamp, comment, filepath, size))
+                
+                # Turn the previous head into a reverse delta against the new version;
+                # tile keys only line up when both were written with the same shape
+                if previous:
+                    previous_id = previous['version_id']
+                    previous_manifest = self._read_manifest(document_id, previous_id)
+                    if (previous_manifest is not None and previous_manifest.get('base') is None
+                            and previous['seq'] % self.KEYFRAME_INTERVAL != 0
+                            and self._tile_shape(previous_manifest) == self._tile_shape(manifest)):
+                        self._write_manifest(document_id, previous_id,
+                                             self._make_delta(previous_manifest, manifest, version_id))
+                
+            # Let the background collector apply the retention policy soon
+            if self._gc_thread is not None:
+                self._gc_pending.add(document_id)
+                self._gc_wakeup.set()
                 
             return version_info
             
         except Exception as e:
             print(f"Error saving version: {e}")
             return None
+            
+        finally:
+            with self._catalog_lock:
+                self._saves_in_progress -= 1
     
-    def get_versions(self, document_id):
-        """Get all versions for a document
+    def get_versions(self, document_id, offset=0, limit=None, newest_first=False):
+        """Get versions for a document
         
         Args:
             document_id: Document ID
+            offset: Number of versions to skip (for paged listing)
+            limit: Maximum number of versions to return (None for all)
+            newest_first: Return the newest versions first
             
         Returns:
             List of version metadata dictionaries
         """
-        versions_file = self._get_version_data_path(document_id)
-        if os.path.exists(versions_file):
-            try:
-                with open(versions_file, 'r') as f:
-                    return json.load(f)
-            except:
-                return []
-        else:
+        self._migrate_legacy_catalog(document_id)
+        order = 'DESC' if newest_first else 'ASC'
+        try:
+            with self._catalog_lock:
+                rows = self._catalog.execute(
+                    'SELECT version_id, timestamp, comment, filepath, size FROM versions '
+                    f'WHERE document_id = ? ORDER BY seq {order} LIMIT ? OFFSET ?',
+                    (document_id, -1 if limit is None else limit, offset)).fetchall()
+            return [dict(row) for row in rows]
+        except sqlite3.Error as e:
+            print(f"Error reading versions: {e}")
             return []
     
+    def count_versions(self, document_id):
+        """Get the number of versions stored for a document"""
+        self._migrate_legacy_catalog(document_id)
+        with self._catalog_lock:
+            return self._catalog.execute(
+                'SELECT COUNT(*) FROM versions WHERE document_id = ?', (document_id,)).fetchone()[0]
+    
     def get_document_id_from_path(self, filepath):
         """Get a document ID from a filepath
         
@@ -142,26 +567,123 @@ class VersionControl:
             Document data dictionary
         """
         try:
+            manifest = self._resolve_manifest(document_id, version_id)
+            if manifest is not None:
+                tile_shape = self._tile_shape(manifest)
+                return {name: self._assemble_sheet(document_id, manifest['sheets'][name], tile_shape)
+                        for name in manifest['sheet_order']}
+                
+            # Versions saved before tiled storage are a single zip archive
             doc_versions_dir = self._get_document_versions_dir(document_id)
             version_file = os.path.join(doc_versions_dir, f"{version_id}.zip")
             
             if not os.path.exists(version_file):
                 return None
                 
-            # Extract the document data from the zip archive
-            with tempfile.TemporaryDirectory() as temp_dir:
-                with zipfile.ZipFile(version_file, 'r') as zipf:
-                    zipf.extractall(temp_dir)
+            # Decompress the document straight from the zip archive into the parser
+            with zipfile.ZipFile(version_file, 'r') as zipf:
+                if 'document.json' not in zipf.namelist():
+                    return None
+                with zipf.open('document.json') as f:
+                    return json.load(io.TextIOWrapper(f, encoding='utf-8'))
+            
+        except Exception as e:
+            print(f"Error loading version: {e}")
+            return None
+    
+    def get_version_sheets(self, document_id, version_id):
+        """List the sheets stored in a version without loading any cell data
+        
+        Args:
+            document_id: Document ID
+            version_id: Version ID
+            
+        Returns:
+            List of {'name', 'rows', 'cols'} dictionaries in sheet order, or None
+        """
+        try:
+            manifest = self._resolve_manifest(document_id, version_id)
+            if manifest is not None:
+                return [{'name': name,
+                         'rows': manifest['sheets'][name]['rows'],
+                         'cols': manifest['sheets'][name]['cols']}
+                        for name in manifest['sheet_order']]
+                
+            data = self.load_version(document_id, version_id)
+            if data is None:
+                return None
+            return [{'name': name,
+                     'rows': len(sheet),
+                     'cols': max((len(row) for row in sheet), default=0)}
+                    for name, sheet in data.items()]
                     
-                doc_file = os.path.join(temp_dir, 'document.json')
-                if os.path.exists(doc_file):
-                    with open(doc_file, 'r') as f:
-                        return json.load(f)
-                        
+        except Exception as e:
+            print(f"Error reading version sheets: {e}")
             return None
+    
+    def load_version_partial(self, document_id, version_id, sheet_name, cell_range=None):
+        """Load a single sheet, or a block of cells from it, from a version
+        
+        Only the tiles overlapping the requested block are decompressed.
+        
+        Args:
+            document_id: Document ID
+            version_id: Version ID
+            sheet_name: Name of the sheet to load
+            cell_range: Optional (start_row, start_col, end_row, end_col) tuple,
+                        0-based and inclusive; None loads the whole sheet
+            
+        Returns:
+            List of rows covering the requested block (clipped to the sheet's
+            stored size), or None if the version or sheet does not exist
+        """
+        try:
+            manifest = self._resolve_manifest(document_id, version_id)
+            if manifest is None:
+                # Legacy versions are a single archive, so the whole document is read
+                data = self.load_version(document_id, version_id)
+                if data is None or sheet_name not in data:
+                    return None
+                if cell_range is None:
+                    return data[sheet_name]
+                start_row, start_col, end_row, end_col = cell_range
+                rows = []
+                for row in data[sheet_name][start_row:end_row + 1]:
+                    values = list(row[start_col:end_col + 1])
+                    rows.append(values + [''] * (end_col - start_col + 1 - len(values)))
+                return rows
+                
+            sheet = manifest['sheets'].get(sheet_name)
+            if sheet is None:
+                return None
+            tile_rows, tile_cols = self._tile_shape(manifest)
+            if cell_range is None:
+                return self._assemble_sheet(document_id, sheet, (tile_rows, tile_cols))
+                
+            start_row, start_col, end_row, end_col = cell_range
+            end_row = min(end_row, sheet['rows'] - 1)
+            if end_row < start_row or start_col > end_col:
+                return []
+            rows = [[''] * (end_col - start_col + 1) for _ in range(end_row - start_row + 1)]
+            
+            for tile_row in range(start_row // tile_rows, end_row // tile_rows + 1):
+                for tile_col in range(start_col // tile_cols, end_col // tile_cols + 1):
+                    chunk_hash = sheet['tiles'].get(f"{tile_row},{tile_col}")
+                    if chunk_hash is None:
+                        continue  # Empty tile
+                        
+                    row_start = tile_row * tile_rows
+                    col_start = tile_col * tile_cols
+                    tile = self._read_chunk(document_id, chunk_hash)
+                    for r in range(max(start_row, row_start), min(end_row, row_start + len(tile) - 1) + 1):
+                        tile_values = tile[r - row_start]
+                        for c in range(max(start_col, col_start), min(end_col, col_start + len(tile_values) - 1) + 1):
+                            rows[r - start_row][c - start_col] = tile_values[c - col_start]
+                            
+            return rows
             
         except Exception as e:
-            print(f"Error loading version: {e}")
+            print(f"Error loading partial version: {e}")
             return None
     
     def delete_version(self, document_id, version_id):
@@ -181,12 +703,34 @@ class VersionControl:
             if os.path.exists(version_file):
                 os.remove(version_file)
                 
+            # Manifests are rewired under the catalog lock so a concurrent
+            # save_version cannot demote the same versions at the same time
+            with self._catalog_lock:
+                version = self._get_version_info(document_id, version_id)
+                
+                manifest = self._read_manifest(document_id, version_id)
+                if manifest is not None and version is not None:
+                    # The next older version may be a delta against this one; rebase
+                    # it onto this version's own base before the manifest goes away
+                    older = self._catalog.execute(
+                        'SELECT version_id FROM versions WHERE document_id = ? AND seq < ? '
+                        'ORDER BY seq DESC LIMIT 1', (document_id, version['seq'])).fetchone()
+                    if older:
+                        older_id = older['version_id']
+                        older_manifest = self._read_manifest(document_id, older_id)
+                        if older_manifest is not None and older_manifest.get('base') == version_id:
+                            older_full = self._resolve_manifest(document_id, older_id)
+                            if manifest.get('base'):
+                                base_full = self._resolve_manifest(document_id, manifest['base'])
+                                older_full = self._make_delta(older_full, base_full, manifest['base'])
+                            self._write_manifest(document_id, older_id, older_full)
+                            
+                    os.remove(self._get_manifest_path(document_id, version_id))
+                
             # Update versions metadata
-            versions_data = self.get_versions(document_id)
-            versions_data = [v for v in versions_data if v['version_id'] != version_id]
-            
-            with open(self._get_version_data_path(document_id), 'w') as f:
-                json.dump(versions_data, f, indent=2)
+            with self._catalog_lock, self._catalog:
+                self._catalog.execute('DELETE FROM versions WHERE document_id = ? AND version_id = ?',
+                                      (document_id, version_id))
                 
             return True
             
@@ -194,6 +738,233 @@ class VersionControl:
             print(f"Error deleting version: {e}")
             return False
     
+    def _select_versions_to_prune(self, versions, now):
+        """Apply the time-based tiers of the retention policy
+        
+        Args:
+            versions: Version metadata dictionaries, newest first
+            now: datetime the ages are measured from
+            
+        Returns:
+            List of version IDs that fall outside every tier
+        """
+        keep_all = datetime.timedelta(hours=self.retention.get('keep_all_hours') or 0)
+        hourly = keep_all + datetime.timedelta(days=self.retention.get('hourly_days') or 0)
+        daily = hourly + datetime.timedelta(weeks=self.retention.get('daily_weeks') or 0)
+        
+        prune = []
+        kept_buckets = set()
+        for i, version in enumerate(versions):
+            timestamp = datetime.datetime.fromisoformat(version['timestamp'])
+            age = now - timestamp
+            if age <= keep_all:
+                continue
+            elif age <= hourly:
+                bucket = ('hour', timestamp.strftime('%Y-%m-%d %H'))
+            elif age <= daily:
+                bucket = ('day', timestamp.strftime('%Y-%m-%d'))
+            else:
+                bucket = None
+                
+            # Versions are visited newest first, so the first one seen in a bucket
+            # is kept; the newest version is always kept
+            if i > 0 and (bucket is None or bucket in kept_buckets):
+                prune.append(version['version_id'])
+            else:
+                kept_buckets.add(bucket)
+                
+        return prune
+    
+    def _select_versions_over_budget(self, document_id, versions, max_bytes):
+        """Pick the oldest versions to drop until the document fits in max_bytes
+        
+        Disk usage is counted exactly: chunks shared between versions are
+        counted once, and a chunk's bytes are only freed once the last
+        version referencing it is dropped.
+        
+        Args:
+            document_id: Document ID
+            versions: Remaining version metadata dictionaries, newest first
+            max_bytes: Byte budget for the document
+            
+        Returns:
+            List of version IDs to delete, oldest first
+        """
+        chunks_dir = self._get_chunks_dir(document_id)
+        doc_versions_dir = self._get_document_versions_dir(document_id)
+        
+        references = {}
+        chunk_sizes = {}
+        version_chunks = {}
+        own_bytes = {}
+        for version in versions:
+            version_id = version['version_id']
+            manifest = self._resolve_manifest(document_id, version_id)
+            if manifest is None:
+                version_chunks[version_id] = set()
+                legacy_file = os.path.join(doc_versions_dir, f"{version_id}.zip")
+                own_bytes[version_id] = os.path.getsize(legacy_file) if os.path.exists(legacy_file) else 0
+                continue
+                
+            hashes = {chunk_hash for sheet in manifest['sheets'].values()
+                      for chunk_hash in sheet['tiles'].values()}
+            version_chunks[version_id] = hashes
+            own_bytes[version_id] = os.path.getsize(self._get_manifest_path(document_id, version_id))
+            for chunk_hash in hashes:
+                references[chunk_hash] = references.get(chunk_hash, 0) + 1
+                if chunk_hash not in chunk_sizes:
+                    chunk_path = os.path.join(chunks_dir, chunk_hash)
+                    chunk_sizes[chunk_hash] = os.path.getsize(chunk_path) if os.path.exists(chunk_path) else 0
+                    
+        total = sum(chunk_sizes.values()) + sum(own_bytes.values())
+        
+        prune = []
+        for version in reversed(versions[1:]):
+            if total <= max_bytes:
+                break
+            version_id = version['version_id']
+            prune.append(version_id)
+            total -= own_bytes[version_id]
+            for chunk_hash in version_chunks[version_id]:
+                references[chunk_hash] -= 1
+                if references[chunk_hash] == 0:
+                    total -= chunk_sizes[chunk_hash]
+                    
+        return prune
+    
+    def _sweep_chunks(self, document_id):
+        """Delete chunk files no longer referenced by any version of a document
+        
+        Returns:
+            Tuple of (chunks deleted, bytes freed)
+        """
+        with self._catalog_lock:
+            # Chunks being written by a save are not referenced by any manifest
+            # yet; skip this sweep and let the next pass pick up the garbage
+            if self._saves_in_progress:
+                return 0, 0
+            started = time.time()
+            version_ids = [row['version_id'] for row in self._catalog.execute(
+                'SELECT version_id FROM versions WHERE document_id = ?', (document_id,))]
+            
+            # Every chunk a version uses appears in its own manifest or in a
+            # manifest along its delta chain, so reading each file once is enough
+            referenced = set()
+            for version_id in version_ids:
+                manifest = self._read_manifest(document_id, version_id)
+                if manifest is not None:
+                    for sheet in manifest['sheets'].values():
+                        referenced.update(chunk_hash for chunk_hash in sheet['tiles'].values() if chunk_hash)
+                        
+        # Chunks touched after the sweep started belong to a save that began since
+        chunks_dir = self._get_chunks_dir(document_id)
+        deleted = 0
+        freed = 0
+        for entry in os.scandir(chunks_dir):
+            if entry.name in referenced:
+                continue
+            # Checked and deleted in one step, so a save cannot reuse the chunk in between
+            with self._chunk_lock:
+                try:
+                    stat = os.stat(entry.path)
+                    if stat.st_mtime >= started - self.GC_GRACE_SECONDS:
+                        continue
+                    os.remove(entry.path)
+                except OSError:
+                    continue
+            deleted += 1
+            freed += stat.st_size
+                
+        return deleted, freed
+    
+    def collect_garbage(self, document_id, now=None):
+        """Apply the retention policy to a document and delete unreferenced chunks
+        
+        Args:
+            document_id: Document ID
+            now: Optional datetime to measure version ages from (defaults to now)
+            
+        Returns:
+            Dictionary with 'versions_deleted', 'chunks_deleted' and 'bytes_freed',
+            or None if collection failed
+        """
+        try:
+            now = now or datetime.datetime.now()
+            versions = self.get_versions(document_id, newest_first=True)
+            
+            prune = set(self._select_versions_to_prune(versions, now))
+            
+            max_bytes = self.retention.get('max_bytes')
+            if max_bytes is not None:
+                remaining = [version for version in versions if version['version_id'] not in prune]
+                prune.update(self._select_versions_over_budget(document_id, remaining, max_bytes))
+            
+            # Delete oldest first so each rebase only has to touch one neighbour
+            versions_deleted = 0
+            for version in reversed(versions):
+                if version['version_id'] in prune and self.delete_version(document_id, version['version_id']):
+                    versions_deleted += 1
+                    
+            chunks_deleted, bytes_freed = self._sweep_chunks(document_id)
+            return {
+                'versions_deleted': versions_deleted,
+                'chunks_deleted': chunks_deleted,
+                'bytes_freed': bytes_freed
+            }
+            
+        except Exception as e:
+            print(f"Error collecting garbage: {e}")
+            return None
+    
+    def start_background_gc(self, interval=None):
+        """Run garbage collection on a background thread
+        
+        Every document is collected each interval; documents that get a new
+        version are collected shortly after save_version returns, so saving
+        never waits for pruning.
+        
+        Args:
+            interval: Seconds between full passes (defaults to VERSION_GC_INTERVAL minutes)
+        """
+        if self._gc_thread is not None:
+            return
+            
+        interval = interval or VERSION_GC_INTERVAL * 60
+        self._gc_stop.clear()
+        
+        def run():
+            while not self._gc_stop.is_set():
+                woken = self._gc_wakeup.wait(interval)
+                self._gc_wakeup.clear()
+                if self._gc_stop.is_set():
+                    break
+                    
+                if woken:
+                    document_ids = list(self._gc_pending)
+                else:
+                    with self._catalog_lock:
+                        document_ids = [row['document_id'] for row in self._catalog.execute(
+                            'SELECT DISTINCT document_id FROM versions')]
+                self._gc_pending.difference_update(document_ids)
+                
+                for document_id in document_ids:
+                    if self._gc_stop.is_set():
+                        break
+                    self.collect_garbage(document_id)
+                    
+        self._gc_thread = threading.Thread(target=run, name='VersionGC', daemon=True)
+        self._gc_thread.start()
+    
+    def stop_background_gc(self):
+        """Stop the background garbage collection thread"""
+        if self._gc_thread is None:
+            return
+            
+        self._gc_stop.set()
+        self._gc_wakeup.set()
+        self._gc_thread.join()
+        self._gc_thread = None
+    
     def restore_version(self, document_id, version_id, target_filepath=None):
         """Restore a document to a specific version
         
@@ -211,11 +982,9 @@ class VersionControl:
             
         # Find original filepath if not provided
         if not target_filepath:
-            versions = self.get_versions(document_id)
-            for version in versions:
-                if version['version_id'] == version_id:
-                    target_filepath = version['filepath']
-                    break
+            version = self._get_version_info(document_id, version_id)
+            if version:
+                target_filepath = version['filepath']
                     
         if not target_filepath:
             return None
@@ -235,3 +1004,115 @@ class VersionControl:
                             comment='Auto-saved before restoring to previous version')
         
         return data
+    
+    def diff_versions(self, document_id, version_a, version_b):
+        """Compute the cell-level differences between two versions
+        
+        Tile hashes from the two manifests are compared first; only tiles
+        whose hashes differ are decompressed and compared cell by cell.
+        
+        Args:
+            document_id: Document ID
+            version_a: Version ID of the older (reference) version
+            version_b: Version ID of the newer version
+            
+        Returns:
+            Dictionary with 'sheets_added', 'sheets_removed' and 'cells', a list
+            of {'sheet', 'row', 'col', 'old', 'new'} dictionaries, or None if
+            either version could not be loaded
+        """
+        try:
+            manifest_a = self._resolve_manifest(document_id, version_a)
+            manifest_b = self._resolve_manifest(document_id, version_b)
+            manifests = [manifest for manifest in (manifest_a, manifest_b) if manifest is not None]
+            tile_shape = self._tile_shape(manifests[0]) if manifests else None
+            
+            # Legacy versions, and a version stored with another tile shape, are
+            # tiled in memory so both sides can be compared tile by tile
+            tile_cache = {}
+            stored = []
+            for version_id, manifest in ((version_a, manifest_a), (version_b, manifest_b)):
+                if manifest is None or self._tile_shape(manifest) != tile_shape:
+                    data = self.load_version(document_id, version_id)
+                    if data is None:
+                        return None
+                    tile_cache[version_id] = {name: self._split_into_tiles(sheet, tile_shape)
+                                              for name, sheet in data.items()}
+                    manifest = None
+                stored.append(manifest)
+            manifest_a, manifest_b = stored
+            
+            def sheet_tiles(version_id, manifest, name):
+                if manifest is not None:
+                    sheet = manifest['sheets'].get(name)
+                    return sheet['tiles'] if sheet else {}
+                return tile_cache[version_id].get(name, (0, 0, {}))[2]
+            
+            def load_tile(version_id, manifest, tiles, key):
+                if key not in tiles:
+                    return []
+                if manifest is not None:
+                    return self._read_chunk(document_id, tiles[key])
+                return tiles[key]
+            
+            tile_rows, tile_cols = tile_shape or (self.TILE_ROWS, self.TILE_COLS)
+            names_a = manifest_a['sheet_order'] if manifest_a else list(tile_cache[version_a])
+            names_b = manifest_b['sheet_order'] if manifest_b else list(tile_cache[version_b])
+            
+            diff = {
+                'sheets_added': [name for name in names_b if name not in names_a],
+                'sheets_removed': [name for name in names_a if name not in names_b],
+                'cells': []
+            }
+            
+            for name in names_b:
+                if name not in names_a:
+                    continue
+                    
+                tiles_a = sheet_tiles(version_a, manifest_a, name)
+                tiles_b = sheet_tiles(version_b, manifest_b, name)
+                
+                for key in sorted(set(tiles_a) | set(tiles_b)):
+                    # Identical tiles (same hash, or same content for legacy versions) are skipped
+                    if tiles_a.get(key) == tiles_b.get(key):
+                        continue
+                        
+                    tile_a = load_tile(version_a, manifest_a, tiles_a, key)
+                    tile_b = load_tile(version_b, manifest_b, tiles_b, key)
+                    tile_row, tile_col = (int(part) for part in key.split(','))
+                    
+                    for r in range(max(len(tile_a), len(tile_b))):
+                        row_a = tile_a[r] if r < len(tile_a) else []
+                        row_b = tile_b[r] if r < len(tile_b) else []
+                        for c in range(max(len(row_a), len(row_b))):
+                            old = row_a[c] if c < len(row_a) else ''
+                            new = row_b[c] if c < len(row_b) else ''
+                            if old != new:
+                                diff['cells'].append({
+                                    'sheet': name,
+                                    'row': tile_row * tile_rows + r,
+                                    'col': tile_col * tile_cols + c,
+                                    'old': old,
+                                    'new': new
+                                })
+                                
+            return diff
+            
+        except Exception as e:
+            print(f"Error comparing versions: {e}")
+            return None
+    
+    def changes_since(self, document_id, version_id):
+        """Get all cell changes made since a version, up to the newest version
+        
+        Args:
+            document_id: Document ID
+            version_id: Version ID to compare from
+            
+        Returns:
+            Diff dictionary as returned by diff_versions, or None
+        """
+        latest = self._get_latest_version(document_id)
+        if not latest:
+            return None
+        return self.diff_versions(document_id, version_id, latest['version_id'])
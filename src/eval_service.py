@@ -0,0 +1,256 @@
+"""Local HTTP service that evaluates workbooks kept warm in memory.
+
+Usage:
+    python -m src.eval_service --port 8765 --workers 8
+
+    POST /evaluate
+    {"workbook": "/models/pricing.xlsx",
+     "inputs": {"B2": 0.05, "Rates!B3": 360},
+     "outputs": ["B10", "Summary!C4"]}
+
+    -> {"outputs": {"B10": 1342.05, "Summary!C4": "OK"},
+        "recalculated": 12, "cache": "hit", "elapsed_ms": 0.8}
+
+Parsed workbooks stay in an LRU cache keyed by path and modification time,
+so editing the file on disk transparently loads the new version. Each request
+only recalculates the formulas downstream of the cells it changes. Inputs
+apply to a single request: cells set by earlier requests are put back to
+their saved contents as part of the next request's recalculation.
+"""
+import os
+import sys
+import time
+import argparse
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the project root to the Python path to enable absolute imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.workbook import Workbook
+from src.engine.calculator import Calculator
+from src.utils.helpers import parse_cell_reference, column_name_to_index
+
+DEFAULT_CACHE_SIZE = 32
+DEFAULT_WORKERS = 8
+
+class CachedWorkbook:
+    """A loaded, fully calculated workbook plus the state needed for incremental recalc"""
+
+    def __init__(self, path, mtime):
+        self.path = path
+        self.mtime = mtime
+        self.workbook = Workbook().load(path)
+        self.calculators = {}
+        for name, sheet in self.workbook.sheets.items():
+            calculator = Calculator(sheet)
+            calculator.recalculate_all()
+            self.calculators[name] = calculator
+        # (sheet, row, col) -> saved raw value of cells overridden by the last request
+        self.overrides = {}
+        # Requests against the same workbook are serialized; different workbooks run concurrently
+        self.lock = threading.Lock()
+
+    def resolve(self, address):
+        """Turn 'A1' or 'Sheet!A1' into (sheet name, row, col)"""
+        sheet_name, _, ref = address.rpartition('!')
+        sheet_name = sheet_name.strip("'") or self.workbook.sheet_names()[0]
+        if not self.workbook.sheet_exists(sheet_name):
+            raise KeyError(f"Unknown sheet: {sheet_name}")
+        col_name, row = parse_cell_reference(ref.replace('$', '').upper())
+        if col_name is None or row < 1:
+            raise KeyError(f"Invalid cell reference: {address}")
+        return sheet_name, row - 1, column_name_to_index(col_name)
+
+    def evaluate(self, inputs, outputs):
+        """Apply inputs, recalculate what they affect and read the outputs
+
+        Returns:
+            Tuple (outputs dictionary, number of formulas recalculated)
+        """
+        targets = {self.resolve(address): value for address, value in inputs.items()}
+        output_cells = [(address, self.resolve(address)) for address in outputs]
+
+        with self.lock:
+            changed = {}
+            # Undo the previous request's inputs that this request does not set again
+            for key in list(self.overrides):
+                if key not in targets:
+                    sheet_name, row, col = key
+                    self.workbook.get_sheet(sheet_name).set_cell_value(row, col, self.overrides.pop(key))
+                    changed.setdefault(sheet_name, []).append((row, col))
+
+            for key, value in targets.items():
+                sheet_name, row, col = key
+                sheet = self.workbook.get_sheet(sheet_name)
+                if key not in self.overrides:
+                    self.overrides[key] = sheet.get_raw_value(row, col)
+                sheet.set_cell_value(row, col, value)
+                changed.setdefault(sheet_name, []).append((row, col))
+
+            recalculated = 0
+            for sheet_name, cells in changed.items():
+                recalculated += len(self.calculators[sheet_name].recalculate_cells(cells))
+
+            values = {}
+            for address, (sheet_name, row, col) in output_cells:
+                values[address] = _json_value(self.workbook.get_sheet(sheet_name).get_cell_value(row, col))
+        return values, recalculated
+
+class WorkbookCache:
+    """LRU cache of CachedWorkbook entries keyed by (path, mtime)"""
+
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # One loader lock per path so concurrent first requests parse the file once
+        self._load_locks = {}
+
+    def get(self, path):
+        """Get the calculated workbook for a path, loading it if missing or changed on disk
+
+        Returns:
+            Tuple (CachedWorkbook, True if it was already cached)
+        """
+        path = os.path.abspath(path)
+        key = (path, os.stat(path).st_mtime_ns)
+
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry, True
+            load_lock = self._load_locks.setdefault(path, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                entry = self.entries.get(key)
+                if entry is not None:
+                    self.hits += 1
+                    return entry, True
+
+            entry = CachedWorkbook(path, key[1])
+
+            with self._lock:
+                self.misses += 1
+                # Drop stale versions of the same file, then the least recently used
+                for stale in [k for k in self.entries if k[0] == path]:
+                    del self.entries[stale]
+                self.entries[key] = entry
+                while len(self.entries) > self.max_size:
+                    self.entries.popitem(last=False)
+            return entry, False
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self.entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'workbooks': [path for path, _ in self.entries],
+            }
+
+def _json_value(value):
+    """Return numeric results as numbers; the calculator stores them as text"""
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    return value
+
+def create_app(cache=None):
+    """Create the Flask application
+
+    Args:
+        cache: Optional WorkbookCache to serve from
+    """
+    from flask import Flask, jsonify, request
+
+    app = Flask(__name__)
+    app.config['WORKBOOK_CACHE'] = cache or WorkbookCache()
+
+    @app.route('/health', methods=['GET'])
+    def health():
+        return jsonify({'status': 'ok'})
+
+    @app.route('/cache', methods=['GET'])
+    def cache_stats():
+        return jsonify(app.config['WORKBOOK_CACHE'].stats())
+
+    @app.route('/evaluate', methods=['POST'])
+    def evaluate():
+        started = time.perf_counter()
+        payload = request.get_json(silent=True) or {}
+        path = payload.get('workbook')
+        inputs = payload.get('inputs') or {}
+        outputs = payload.get('outputs') or []
+        if not path or not isinstance(inputs, dict) or not isinstance(outputs, list):
+            return jsonify({'error': "Expected {'workbook': path, 'inputs': {cell: value}, 'outputs': [cell]}"}), 400
+
+        try:
+            entry, hit = app.config['WORKBOOK_CACHE'].get(path)
+            values, recalculated = entry.evaluate(inputs, outputs)
+        except FileNotFoundError:
+            return jsonify({'error': f"Workbook not found: {path}"}), 404
+        except (KeyError, ValueError) as e:
+            return jsonify({'error': str(e).strip("'\"")}), 400
+        except Exception as e:
+            return jsonify({'error': f"Error evaluating workbook: {e}"}), 500
+
+        return jsonify({
+            'outputs': values,
+            'recalculated': recalculated,
+            'cache': 'hit' if hit else 'miss',
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 3),
+        })
+
+    return app
+
+def serve(app, host='127.0.0.1', port=8765, workers=DEFAULT_WORKERS):
+    """Serve the app with a fixed pool of worker threads"""
+    from werkzeug.serving import BaseWSGIServer
+
+    class PooledWSGIServer(BaseWSGIServer):
+        """Handles each connection on a thread from a bounded pool"""
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='eval')
+
+        def process_request(self, request, client_address):
+            self.pool.submit(self._process_request, request, client_address)
+
+        def _process_request(self, request, client_address):
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    server = PooledWSGIServer(host, port, app)
+    print(f"Evaluation service listening on http://{host}:{port} ({workers} workers)")
+    try:
+        server.serve_forever()
+    finally:
+        server.pool.shutdown(wait=False)
+    return server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve workbook evaluations over HTTP")
+    parser.add_argument('--host', default='127.0.0.1', help="interface to bind (default: localhost only)")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="request handling threads")
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE, help="workbooks kept in memory")
+    args = parser.parse_args(argv)
+    serve(create_app(WorkbookCache(args.cache_size)), args.host, args.port, args.workers)
+
+if __name__ == '__main__':
+    main()
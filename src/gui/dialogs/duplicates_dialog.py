@@ -0,0 +1,92 @@
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QCheckBox, QListWidget, QListWidgetItem,
+    QPushButton, QDialogButtonBox
+)
+from ...utils.helpers import index_to_column_name
+
+class RemoveDuplicatesDialog(QDialog):
+    """Collects the key columns and options for removing duplicate rows from a range"""
+
+    def __init__(self, parent=None, left=0, right=0, headers=None):
+        """
+        Args:
+            left, right: Sheet columns of the selected range
+            headers: Optional first-row text of each column, shown when the
+                range has a header row
+        """
+        super().__init__(parent)
+        self.setWindowTitle("Remove Duplicates")
+        self.columns = list(range(left, right + 1))
+        self.headers = headers or [""] * len(self.columns)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel("Rows are duplicates when they match on the checked columns:"))
+        self.column_list = QListWidget()
+        for col in self.columns:
+            item = QListWidgetItem()
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Checked)
+            self.column_list.addItem(item)
+        layout.addWidget(self.column_list)
+
+        buttons = QHBoxLayout()
+        select_all = QPushButton("Select All")
+        select_all.clicked.connect(lambda: self.set_all_checked(True))
+        unselect_all = QPushButton("Unselect All")
+        unselect_all.clicked.connect(lambda: self.set_all_checked(False))
+        buttons.addWidget(select_all)
+        buttons.addWidget(unselect_all)
+        buttons.addStretch()
+        layout.addLayout(buttons)
+
+        self.header_check = QCheckBox("Data has a header row")
+        self.header_check.toggled.connect(self.update_column_names)
+        layout.addWidget(self.header_check)
+        self.match_case_check = QCheckBox("Match case")
+        self.match_case_check.setChecked(True)
+        layout.addWidget(self.match_case_check)
+
+        keep_layout = QHBoxLayout()
+        keep_layout.addWidget(QLabel("Keep:"))
+        self.keep_combo = QComboBox()
+        self.keep_combo.addItems(["First occurrence", "Last occurrence"])
+        keep_layout.addWidget(self.keep_combo)
+        layout.addLayout(keep_layout)
+        self.update_column_names()
+
+        self.button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        self.button_box.accepted.connect(self.accept)
+        self.button_box.rejected.connect(self.reject)
+        self.column_list.itemChanged.connect(self.update_ok_button)
+        layout.addWidget(self.button_box)
+
+    def update_column_names(self):
+        """List the columns by letter, or by header text when there is a header row"""
+        use_headers = self.header_check.isChecked()
+        for i, (col, header) in enumerate(zip(self.columns, self.headers)):
+            self.column_list.item(i).setText(
+                f"Column {index_to_column_name(col)}" + (f" ({header})" if use_headers and header else ""))
+
+    def set_all_checked(self, checked):
+        for i in range(self.column_list.count()):
+            self.column_list.item(i).setCheckState(Qt.Checked if checked else Qt.Unchecked)
+
+    def update_ok_button(self):
+        """At least one key column is needed"""
+        self.button_box.button(QDialogButtonBox.Ok).setEnabled(bool(self.get_settings()['key_columns']))
+
+    def get_settings(self):
+        """Get the settings entered in the dialog
+
+        Returns:
+            Dictionary with 'key_columns', 'keep' ('first' or 'last'),
+            'has_header' and 'match_case'
+        """
+        return {
+            'key_columns': [col for i, col in enumerate(self.columns)
+                            if self.column_list.item(i).checkState() == Qt.Checked],
+            'keep': 'first' if self.keep_combo.currentIndex() == 0 else 'last',
+            'has_header': self.header_check.isChecked(),
+            'match_case': self.match_case_check.isChecked(),
+        }
@@ -1,25 +1,36 @@
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QListWidget, QPushButton,
-    QGroupBox, QDialogButtonBox, QListWidgetItem
+    QGroupBox, QDialogButtonBox, QListWidgetItem, QComboBox, QLineEdit, QCheckBox
 )
 from PyQt5.QtCore import Qt
+from ...engine.pivot import PIVOT_AGGREGATIONS, PivotField, pivot
+
+# Item data of the fields placed in the areas
+FIELD_ROLE = Qt.UserRole  # Index of the field in the source's columns
+SETTING_ROLE = Qt.UserRole + 1  # Aggregation of a value field, included labels of a filter field
 
 class PivotTableDialog(QDialog):
-    def __init__(self, data, parent=None):
+    def __init__(self, data, parent=None, field_labels=None, location=""):
+        """
+        Args:
+            data: Source rows, field names in the first row; only the first
+                row is needed when field_labels is given
+            field_labels: Optional function returning the distinct labels of
+                a field (by index), listed when the field is used as a filter
+            location: Initial top-left cell for the pivot table
+        """
         super().__init__(parent)
         self.setWindowTitle("Create Pivot Table")
         self.setMinimumSize(700, 500)
         self.data = data
         self.column_headers = data[0] if data else []
-        self.values = []
-        self.rows = []
-        self.columns = []
-        self.filters = []
+        self.field_labels = field_labels or (lambda index: PivotField([row[index] for row in data[1:]]).labels)
         
         self.main_layout = QVBoxLayout(self)
         
         self.create_field_section()
         self.create_pivot_area_section()
+        self.create_options_section(location)
         
         buttons = QDialogButtonBox(
             QDialogButtonBox.Ok | QDialogButtonBox.Cancel
@@ -36,9 +47,10 @@ class PivotTableDialog(QDialog):
         field_layout.addWidget(field_label)
         
         self.field_list = QListWidget()
-        for header in self.column_headers:
+        for index, header in enumerate(self.column_headers):
             item = QListWidgetItem(header)
             item.setFlags(item.flags() | Qt.ItemIsDragEnabled)
+            item.setData(FIELD_ROLE, index)
             self.field_list.addItem(item)
         
         field_layout.addWidget(self.field_list)
@@ -114,6 +126,42 @@ class PivotTableDialog(QDialog):
         areas_group.setLayout(areas_layout)
         self.main_layout.addWidget(areas_group)
     
+    def create_options_section(self, location):
+        options_group = QGroupBox("Options")
+        options_layout = QVBoxLayout()
+        
+        # How the selected value field is summarized
+        summarize_layout = QHBoxLayout()
+        summarize_layout.addWidget(QLabel("Summarize selected value by:"))
+        self.aggregation_combo = QComboBox()
+        for name, label in PIVOT_AGGREGATIONS.items():
+            self.aggregation_combo.addItem(label, name)
+        self.aggregation_combo.activated.connect(self.set_value_aggregation)
+        summarize_layout.addWidget(self.aggregation_combo)
+        options_layout.addLayout(summarize_layout)
+        
+        # Labels kept by the selected filter field
+        options_layout.addWidget(QLabel("Show items of selected filter:"))
+        self.filter_items_list = QListWidget()
+        self.filter_items_list.setMaximumHeight(120)
+        self.filter_items_list.itemChanged.connect(self.update_filter_labels)
+        options_layout.addWidget(self.filter_items_list)
+        self.filters_list.currentItemChanged.connect(self.show_filter_labels)
+        self.values_list.currentItemChanged.connect(self.show_value_aggregation)
+        
+        location_layout = QHBoxLayout()
+        location_layout.addWidget(QLabel("Place pivot table at:"))
+        self.location_input = QLineEdit(location)
+        self.location_input.setPlaceholderText("e.g. H1")
+        location_layout.addWidget(self.location_input)
+        self.totals_check = QCheckBox("Grand totals")
+        self.totals_check.setChecked(True)
+        location_layout.addWidget(self.totals_check)
+        options_layout.addLayout(location_layout)
+        
+        options_group.setLayout(options_layout)
+        self.main_layout.addWidget(options_group)
+    
     def add_to_filters(self):
         self._add_selected_to_list(self.filters_list)
     
@@ -124,15 +172,19 @@ class PivotTableDialog(QDialog):
         self._add_selected_to_list(self.rows_list)
     
     def add_to_values(self):
-        self._add_selected_to_list(self.values_list, "(Sum of) ")
+        self._add_selected_to_list(self.values_list, 'sum')
     
-    def _add_selected_to_list(self, target_list, prefix=""):
+    def _add_selected_to_list(self, target_list, aggregation=None):
         selected_items = self.field_list.selectedItems()
         if not selected_items:
             return
             
         for item in selected_items:
-            new_item = QListWidgetItem(prefix + item.text())
+            new_item = QListWidgetItem(item.text())
+            new_item.setData(FIELD_ROLE, item.data(FIELD_ROLE))
+            if aggregation:
+                new_item.setData(SETTING_ROLE, aggregation)
+                new_item.setText(f"{PIVOT_AGGREGATIONS[aggregation]} of {item.text()}")
             target_list.addItem(new_item)
     
     def remove_field(self):
@@ -141,103 +193,77 @@ class PivotTableDialog(QDialog):
             for item in selected_items:
                 list_widget.takeItem(list_widget.row(item))
     
+    def show_value_aggregation(self, item):
+        if item is not None:
+            self.aggregation_combo.setCurrentIndex(self.aggregation_combo.findData(item.data(SETTING_ROLE)))
+    
+    def set_value_aggregation(self):
+        """Apply the chosen aggregation to the selected value field"""
+        item = self.values_list.currentItem()
+        if item is None:
+            return
+        aggregation = self.aggregation_combo.currentData()
+        item.setData(SETTING_ROLE, aggregation)
+        item.setText(f"{PIVOT_AGGREGATIONS[aggregation]} of {self.column_headers[item.data(FIELD_ROLE)]}")
+    
+    def show_filter_labels(self, item):
+        """List the labels of the selected filter field, checked when included"""
+        self.filter_items_list.blockSignals(True)
+        self.filter_items_list.clear()
+        if item is not None:
+            included = item.data(SETTING_ROLE)
+            for label in self.field_labels(item.data(FIELD_ROLE)):
+                label_item = QListWidgetItem(label)
+                label_item.setFlags(label_item.flags() | Qt.ItemIsUserCheckable)
+                label_item.setCheckState(Qt.Checked if included is None or label in included else Qt.Unchecked)
+                self.filter_items_list.addItem(label_item)
+        self.filter_items_list.blockSignals(False)
+    
+    def update_filter_labels(self):
+        """Store the checked labels on the selected filter field"""
+        item = self.filters_list.currentItem()
+        if item is None:
+            return
+        included = [self.filter_items_list.item(i).text() for i in range(self.filter_items_list.count())
+                    if self.filter_items_list.item(i).checkState() == Qt.Checked]
+        item.setData(SETTING_ROLE, None if len(included) == self.filter_items_list.count() else included)
+    
     def get_settings(self):
-        """Get the PivotTable configuration"""
-        filters = [self.filters_list.item(i).text() for i in range(self.filters_list.count())]
-        columns = [self.columns_list.item(i).text() for i in range(self.columns_list.count())]
-        rows = [self.rows_list.item(i).text() for i in range(self.rows_list.count())]
-        values = [self.values_list.item(i).text() for i in range(self.values_list.count())]
+        """Get the PivotTable configuration
+        
+        Returns:
+            Dictionary with 'rows' and 'columns' (field indexes, outermost
+            first), 'values' ((field, aggregation) pairs), 'filters'
+            ({field: included labels}, only for fields that exclude some),
+            'totals' and 'location' (cell address text)
+        """
+        def fields(list_widget):
+            return [list_widget.item(i) for i in range(list_widget.count())]
         
         return {
-            'filters': filters,
-            'columns': columns,
-            'rows': rows,
-            'values': values
+            'filters': {item.data(FIELD_ROLE): item.data(SETTING_ROLE) for item in fields(self.filters_list)
+                        if item.data(SETTING_ROLE) is not None},
+            'columns': [item.data(FIELD_ROLE) for item in fields(self.columns_list)],
+            'rows': [item.data(FIELD_ROLE) for item in fields(self.rows_list)],
+            'values': [(item.data(FIELD_ROLE), item.data(SETTING_ROLE)) for item in fields(self.values_list)],
+            'totals': self.totals_check.isChecked(),
+            'location': self.location_input.text().strip(),
         }
 
 def generate_pivot_table(data, settings):
-    """Generate a pivot table based on the settings"""
+    """Generate a pivot table based on the settings
+    
+    Args:
+        data: Source rows, field names in the first row
+        settings: Settings as returned by PivotTableDialog.get_settings
+        
+    Returns:
+        The pivot table as a list of rows (see engine.pivot.pivot)
+    """
     if not data or len(data) <= 1:
         return [["No data"]]
     
-    # This is a simplified implementation
     headers = data[0]
-    rows_data = data[1:]
-    
-    # Get indices for the specified fields
-    row_indices = [headers.index(field) for field in settings['rows'] if field in headers]
-    column_indices = [headers.index(field) for field in settings['columns'] if field in headers]
-    value_indices = [headers.index(field.replace("(Sum of) ", "")) 
-                    for field in settings['values'] if field.replace("(Sum of) ", "") in headers]
-    filter_indices = [headers.index(field) for field in settings['filters'] if field in headers]
-    
-    # Filter data if filters are specified
-    filtered_data = rows_data
-    # Filter implementation would go here
-    
-    # Create unique values for rows and columns
-    unique_row_values = {}
-    for idx in row_indices:
-        unique_row_values[idx] = sorted(set(row[idx] for row in filtered_data))
-    
-    unique_column_values = {}
-    for idx in column_indices:
-        unique_column_values[idx] = sorted(set(row[idx] for row in filtered_data))
-    
-    # Generate pivot table header row
-    pivot_headers = []
-    
-    # Add row headers
-    for idx in row_indices:
-        pivot_headers.append(headers[idx])
-    
-    # Add column headers (can be complex for multiple columns)
-    if column_indices:
-        for col_val in unique_column_values[column_indices[0]]:
-            for val_idx in value_indices:
-                pivot_headers.append(f"{col_val} - {headers[val_idx]}")
-    else:
-        # Just add value headers if no column fields
-        for val_idx in value_indices:
-            pivot_headers.append(headers[val_idx])
-    
-    pivot_table = [pivot_headers]
-    
-    # Generate data rows
-    # This is a simplified approach - for a real pivot table, you'd need
-    # a more sophisticated algorithm to handle multiple row/column fields
-    if row_indices:
-        for row_val in unique_row_values[row_indices[0]]:
-            # Filter data for this row value
-            row_data = [row for row in filtered_data if row[row_indices[0]] == row_val]
-            
-            pivot_row = [row_val]
-            
-            # Calculate values for each column/value combination
-            if column_indices:
-                for col_val in unique_column_values[column_indices[0]]:
-                    # Filter further by column value
-                    col_data = [row for row in row_data if row[column_indices[0]] == col_val]
-                    
-                    # Calculate sum for each value field
-                    for val_idx in value_indices:
-                        try:
-                            # Sum numeric values
-                            total = sum(float(row[val_idx]) for row in col_data 
-                                      if row[val_idx] and row[val_idx].replace('.','').isdigit())
-                            pivot_row.append(str(total))
-                        except:
-                            pivot_row.append("0")
-            else:
-                # No column fields, just calculate values directly
-                for val_idx in value_indices:
-                    try:
-                        total = sum(float(row[val_idx]) for row in row_data 
-                                  if row[val_idx] and row[val_idx].replace('.','').isdigit())
-                        pivot_row.append(str(total))
-                    except:
-                        pivot_row.append("0")
-            
-            pivot_table.append(pivot_row)
-    
-    return pivot_table
+    columns = [[row[index] if index < len(row) else '' for row in data[1:]] for index in range(len(headers))]
+    return pivot(headers, columns, settings['rows'], settings['columns'], settings['values'],
+                 settings.get('filters'), settings.get('totals', True))
@@ -0,0 +1,146 @@
+import re
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QGridLayout, QLabel, QLineEdit, QSpinBox, QPlainTextEdit,
+    QDialogButtonBox, QMessageBox, QTableWidget, QTableWidgetItem, QTabWidget, QHeaderView
+)
+from ...engine.monte_carlo import SIMULATION_DISTRIBUTIONS
+from ...utils.config import SIMULATION_TRIALS
+from ...utils.helpers import parse_cell_list, format_cell_address
+
+_DISTRIBUTION_LINE = re.compile(r'^\s*([A-Za-z]+\d+)\s*:\s*([a-z]+)\s*\((.*)\)\s*$')
+
+class SimulationDialog(QDialog):
+    """Collects the output cells, trial count, seed and input distributions for a Monte Carlo run"""
+
+    def __init__(self, parent=None, output_cells=""):
+        super().__init__(parent)
+        self.setWindowTitle("Monte Carlo Simulation")
+        self.setMinimumWidth(420)
+
+        layout = QVBoxLayout(self)
+        grid = QGridLayout()
+
+        grid.addWidget(QLabel("Output cells:"), 0, 0)
+        self.outputs_input = QLineEdit(output_cells)
+        self.outputs_input.setPlaceholderText("e.g. D10, F2:F4")
+        grid.addWidget(self.outputs_input, 0, 1)
+
+        grid.addWidget(QLabel("Trials:"), 1, 0)
+        self.trials_spin = QSpinBox()
+        self.trials_spin.setRange(1, 10000000)
+        self.trials_spin.setSingleStep(1000)
+        self.trials_spin.setValue(SIMULATION_TRIALS)
+        grid.addWidget(self.trials_spin, 1, 1)
+
+        grid.addWidget(QLabel("Seed:"), 2, 0)
+        self.seed_input = QLineEdit()
+        self.seed_input.setPlaceholderText("Random")
+        grid.addWidget(self.seed_input, 2, 1)
+        layout.addLayout(grid)
+
+        layout.addWidget(QLabel(
+            "RAND() and RANDBETWEEN() cells are drawn automatically.\n"
+            "Other random inputs, one per line (" + ", ".join(SIMULATION_DISTRIBUTIONS) + "):"
+        ))
+        self.distributions_input = QPlainTextEdit()
+        self.distributions_input.setPlaceholderText("B2: normal(100, 15)\nB3: triangular(1, 2, 4)")
+        layout.addWidget(self.distributions_input)
+
+        button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        button_box.button(QDialogButtonBox.Ok).setText("Run")
+        button_box.accepted.connect(self.validate_and_accept)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+
+    def _distributions(self):
+        """Parse the distribution lines, raising ValueError on a bad line"""
+        distributions = {}
+        for line in self.distributions_input.toPlainText().splitlines():
+            if not line.strip():
+                continue
+            match = _DISTRIBUTION_LINE.match(line)
+            if not match:
+                raise ValueError(f"Could not read '{line.strip()}'; use the form B2: normal(100, 15)")
+            try:
+                params = tuple(float(param) for param in match.group(3).split(','))
+            except ValueError:
+                raise ValueError(f"The parameters in '{line.strip()}' must be numbers")
+            distributions[match.group(1).upper()] = (match.group(2), params)
+        return distributions
+
+    def validate_and_accept(self):
+        if not parse_cell_list(self.outputs_input.text()):
+            QMessageBox.warning(self, "Monte Carlo Simulation", "Enter the output cells to collect.")
+            return
+        if self.seed_input.text().strip() and not self.seed_input.text().strip().isdigit():
+            QMessageBox.warning(self, "Monte Carlo Simulation", "The seed must be a non-negative whole number.")
+            return
+        try:
+            self._distributions()
+        except ValueError as e:
+            QMessageBox.warning(self, "Monte Carlo Simulation", str(e))
+            return
+        self.accept()
+
+    def get_settings(self):
+        """Get the simulation settings entered in the dialog
+
+        Returns:
+            Dictionary of keyword arguments for MonteCarloSimulation, besides the calculator
+        """
+        seed = self.seed_input.text().strip()
+        return {
+            'output_cells': parse_cell_list(self.outputs_input.text()),
+            'distributions': self._distributions(),
+            'trials': self.trials_spin.value(),
+            'seed': int(seed) if seed else None,
+        }
+
+class SimulationResultsDialog(QDialog):
+    """Shows the summary statistics and histogram of each simulated output cell"""
+
+    def __init__(self, result, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Monte Carlo Results")
+        self.resize(560, 480)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel(f"{result['trials']} trials, seed {result['seed']}, "
+                                f"{result['elapsed_s']:.2f} s"))
+
+        tabs = QTabWidget()
+        tabs.addTab(self._summary_table(result['outputs']), "Summary")
+        for cell, summary in result['outputs'].items():
+            tabs.addTab(self._histogram_table(summary), f"{format_cell_address(*cell)} histogram")
+        layout.addWidget(tabs)
+
+        button_box = QDialogButtonBox(QDialogButtonBox.Close)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+
+    def _summary_table(self, outputs):
+        first = next(iter(outputs.values()))
+        labels = ["Mean", "Std. dev.", "Min", "Max"] + [f"P{p:g}" for p in first['percentiles']] + ["Errors"]
+        table = QTableWidget(len(labels), len(outputs))
+        table.setVerticalHeaderLabels(labels)
+        table.setHorizontalHeaderLabels([format_cell_address(*cell) for cell in outputs])
+        for col, summary in enumerate(outputs.values()):
+            values = [summary['mean'], summary['std'], summary['min'], summary['max']]
+            values += list(summary['percentiles'].values()) + [summary['errors']]
+            for row, value in enumerate(values):
+                table.setItem(row, col, QTableWidgetItem("" if value is None else f"{value:.6g}"))
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        return table
+
+    def _histogram_table(self, summary):
+        counts, edges = summary['histogram']['counts'], summary['histogram']['edges']
+        table = QTableWidget(len(counts), 3)
+        table.setHorizontalHeaderLabels(["From", "To", "Trials"])
+        peak = max(counts) if counts else 0
+        for row, count in enumerate(counts):
+            table.setItem(row, 0, QTableWidgetItem(f"{edges[row]:.6g}"))
+            table.setItem(row, 1, QTableWidgetItem(f"{edges[row + 1]:.6g}"))
+            bar = "█" * round(30 * count / peak) if peak else ""
+            table.setItem(row, 2, QTableWidgetItem(f"{count:>8}  {bar}"))
+        table.horizontalHeader().setStretchLastSection(True)
+        return table
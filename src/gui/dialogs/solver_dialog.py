@@ -0,0 +1,165 @@
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QLineEdit, QComboBox,
+    QPushButton, QGroupBox, QRadioButton, QListWidget, QSpinBox, QDialogButtonBox,
+    QMessageBox
+)
+from ...engine.solver import SOLVER_METHODS, CONSTRAINT_OPERATORS
+from ...utils.config import SOLVER_MAX_ITERATIONS
+from ...utils.helpers import parse_cell_list
+
+class SolverDialog(QDialog):
+    """Collects the objective, changing cells, constraints and options for the Solver"""
+
+    def __init__(self, parent=None, objective_cell=""):
+        super().__init__(parent)
+        self.setWindowTitle("Solver")
+        self.setMinimumWidth(450)
+
+        self.constraints = []
+
+        self.main_layout = QVBoxLayout(self)
+        self.create_objective_group(objective_cell)
+        self.create_constraints_group()
+        self.create_options_group()
+
+        self.button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        self.button_box.button(QDialogButtonBox.Ok).setText("Solve")
+        self.button_box.accepted.connect(self.validate_and_accept)
+        self.button_box.rejected.connect(self.reject)
+        self.main_layout.addWidget(self.button_box)
+
+    def create_objective_group(self, objective_cell):
+        group = QGroupBox("Objective")
+        layout = QGridLayout()
+
+        layout.addWidget(QLabel("Set objective:"), 0, 0)
+        self.objective_input = QLineEdit(objective_cell)
+        layout.addWidget(self.objective_input, 0, 1, 1, 3)
+
+        layout.addWidget(QLabel("To:"), 1, 0)
+        self.max_radio = QRadioButton("Max")
+        self.max_radio.setChecked(True)
+        self.min_radio = QRadioButton("Min")
+        self.value_radio = QRadioButton("Value of:")
+        self.value_input = QLineEdit("0")
+        self.value_input.setEnabled(False)
+        self.value_radio.toggled.connect(self.value_input.setEnabled)
+        goal_layout = QHBoxLayout()
+        for widget in (self.max_radio, self.min_radio, self.value_radio, self.value_input):
+            goal_layout.addWidget(widget)
+        layout.addLayout(goal_layout, 1, 1, 1, 3)
+
+        layout.addWidget(QLabel("By changing cells:"), 2, 0)
+        self.changing_input = QLineEdit()
+        self.changing_input.setPlaceholderText("e.g. B2:B5, D2")
+        layout.addWidget(self.changing_input, 2, 1, 1, 3)
+
+        group.setLayout(layout)
+        self.main_layout.addWidget(group)
+
+    def create_constraints_group(self):
+        group = QGroupBox("Subject to the constraints")
+        layout = QVBoxLayout()
+
+        self.constraint_list = QListWidget()
+        layout.addWidget(self.constraint_list)
+
+        add_layout = QHBoxLayout()
+        self.constraint_cell_input = QLineEdit()
+        self.constraint_cell_input.setPlaceholderText("Cell or range")
+        self.constraint_operator_combo = QComboBox()
+        self.constraint_operator_combo.addItems(CONSTRAINT_OPERATORS)
+        self.constraint_value_input = QLineEdit()
+        self.constraint_value_input.setPlaceholderText("Value")
+        add_button = QPushButton("Add")
+        add_button.clicked.connect(self.add_constraint)
+        remove_button = QPushButton("Remove")
+        remove_button.clicked.connect(self.remove_constraint)
+        for widget in (self.constraint_cell_input, self.constraint_operator_combo,
+                       self.constraint_value_input, add_button, remove_button):
+            add_layout.addWidget(widget)
+        layout.addLayout(add_layout)
+
+        group.setLayout(layout)
+        self.main_layout.addWidget(group)
+
+    def create_options_group(self):
+        group = QGroupBox("Options")
+        layout = QGridLayout()
+
+        layout.addWidget(QLabel("Method:"), 0, 0)
+        self.method_combo = QComboBox()
+        self.method_combo.addItems(SOLVER_METHODS)
+        layout.addWidget(self.method_combo, 0, 1)
+
+        layout.addWidget(QLabel("Max iterations:"), 1, 0)
+        self.iterations_spin = QSpinBox()
+        self.iterations_spin.setRange(1, 100000)
+        self.iterations_spin.setValue(SOLVER_MAX_ITERATIONS)
+        layout.addWidget(self.iterations_spin, 1, 1)
+
+        group.setLayout(layout)
+        self.main_layout.addWidget(group)
+
+    def add_constraint(self):
+        """Add one constraint per cell in the entered cell or range"""
+        cells = parse_cell_list(self.constraint_cell_input.text())
+        try:
+            value = float(self.constraint_value_input.text())
+        except ValueError:
+            QMessageBox.warning(self, "Solver", "The constraint value must be a number.")
+            return
+        if not cells:
+            QMessageBox.warning(self, "Solver", "Enter a valid cell or range for the constraint.")
+            return
+
+        operator = self.constraint_operator_combo.currentText()
+        text = self.constraint_cell_input.text().strip().upper()
+        self.constraints.append((text, cells, operator, value))
+        self.constraint_list.addItem(f"{text} {operator} {value:g}")
+        self.constraint_cell_input.clear()
+        self.constraint_value_input.clear()
+
+    def remove_constraint(self):
+        row = self.constraint_list.currentRow()
+        if row >= 0:
+            self.constraint_list.takeItem(row)
+            del self.constraints[row]
+
+    def validate_and_accept(self):
+        if len(parse_cell_list(self.objective_input.text()) or []) != 1:
+            QMessageBox.warning(self, "Solver", "Enter a single objective cell.")
+            return
+        if not parse_cell_list(self.changing_input.text()):
+            QMessageBox.warning(self, "Solver", "Enter the cells the solver may change.")
+            return
+        if self.value_radio.isChecked():
+            try:
+                float(self.value_input.text())
+            except ValueError:
+                QMessageBox.warning(self, "Solver", "The target value must be a number.")
+                return
+        self.accept()
+
+    def get_settings(self):
+        """Get the solver settings entered in the dialog
+
+        Returns:
+            Dictionary of keyword arguments for Solver, besides the calculator
+        """
+        if self.max_radio.isChecked():
+            goal, target_value = 'max', None
+        elif self.min_radio.isChecked():
+            goal, target_value = 'min', None
+        else:
+            goal, target_value = 'value', float(self.value_input.text())
+        return {
+            'objective_cell': parse_cell_list(self.objective_input.text())[0],
+            'changing_cells': parse_cell_list(self.changing_input.text()),
+            'goal': goal,
+            'target_value': target_value,
+            'constraints': [(cell, operator, value) for _, cells, operator, value in self.constraints
+                            for cell in cells],
+            'method': self.method_combo.currentText(),
+            'max_iterations': self.iterations_spin.value(),
+        }
@@ -0,0 +1,75 @@
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QGridLayout, QLabel, QComboBox, QCheckBox, QDialogButtonBox
+)
+from ...utils.helpers import index_to_column_name
+
+class SortDialog(QDialog):
+    """Collects the sort keys (column and direction, most significant first) for a range"""
+
+    MAX_KEYS = 3
+
+    def __init__(self, parent=None, left=0, right=0, headers=None):
+        """
+        Args:
+            left, right: Sheet columns of the range being sorted
+            headers: Optional first-row text of each column, shown when the
+                range has a header row
+        """
+        super().__init__(parent)
+        self.setWindowTitle("Sort Range")
+        self.columns = list(range(left, right + 1))
+        self.headers = headers or [""] * len(self.columns)
+
+        layout = QVBoxLayout(self)
+        self.header_check = QCheckBox("Data has a header row")
+        self.header_check.toggled.connect(self.update_column_names)
+        layout.addWidget(self.header_check)
+
+        grid = QGridLayout()
+        self.column_combos = []
+        self.order_combos = []
+        for i in range(self.MAX_KEYS):
+            grid.addWidget(QLabel("Sort by" if i == 0 else "Then by"), i, 0)
+            column_combo = QComboBox()
+            order_combo = QComboBox()
+            order_combo.addItems(["Ascending (A to Z)", "Descending (Z to A)"])
+            grid.addWidget(column_combo, i, 1)
+            grid.addWidget(order_combo, i, 2)
+            self.column_combos.append(column_combo)
+            self.order_combos.append(order_combo)
+        layout.addLayout(grid)
+        self.update_column_names()
+
+        button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+
+    def update_column_names(self):
+        """List the columns by letter, or by header text when there is a header row"""
+        use_headers = self.header_check.isChecked()
+        names = [f"Column {index_to_column_name(col)}" + (f" ({header})" if use_headers and header else "")
+                 for col, header in zip(self.columns, self.headers)]
+        for i, combo in enumerate(self.column_combos):
+            current = combo.currentIndex()
+            combo.clear()
+            if i > 0:
+                combo.addItem("(none)")
+            combo.addItems(names)
+            combo.setCurrentIndex(max(current, 0))
+
+    def get_settings(self):
+        """Get the sort settings entered in the dialog
+
+        Returns:
+            Dictionary with 'keys', a list of (column, ascending), and 'has_header'
+        """
+        keys = []
+        for i, (column_combo, order_combo) in enumerate(zip(self.column_combos, self.order_combos)):
+            index = column_combo.currentIndex() - (1 if i > 0 else 0)
+            if index < 0:
+                continue
+            column = self.columns[index]
+            if column not in [key for key, _ in keys]:
+                keys.append((column, order_combo.currentIndex() == 0))
+        return {'keys': keys, 'has_header': self.header_check.isChecked()}
@@ -4,12 +4,14 @@ from PyQt5.QtWidgets import (
     QMainWindow, QAction, QFileDialog, QApplication, QVBoxLayout, QHBoxLayout, 
     QWidget, QLabel, QStatusBar, QTabWidget, QColorDialog, QFontDialog, QMessageBox,
     QDialog, QInputDialog, QMenu, QSplitter, QGridLayout, QLineEdit, QPushButton,
-    QComboBox, QCheckBox, QDialogButtonBox, QListWidget, QGroupBox, QRadioButton, QTableWidgetItem
+    QComboBox, QCheckBox, QDialogButtonBox, QListWidget, QGroupBox, QRadioButton, QTableWidgetItem,
+    QTableWidget, QProgressDialog
 )
 from PyQt5.QtCore import Qt, QSize, QSettings
 from PyQt5.QtGui import QFont, QIcon, QPalette, QColor
 from src.gui.sheet_view import SheetView, FindDialog, ReplaceDialog
 from src.gui.toolbar import Toolbar
+from src.gui.tasks import BackgroundTask
 from src.gui.widgets import CustomLineEdit, FormulaLineEdit
 from src.gui.style_manager import apply_stylesheet
 from src.data_io.file_manager import FileManager
@@ -17,11 +19,40 @@ from src.data_io.excel_handler import read_excel, write_excel
 from src.data_io.csv_handler import read_csv, write_csv
 from src.core.workbook import Workbook
 from src.engine.calculator import Calculator
+from src.engine.goal_seek import GoalSeek
+from src.engine.solver import Solver
+from src.engine.data_table import DataTable
+from src.engine.monte_carlo import MonteCarloSimulation
+from src.engine.search import SearchIndex
+from src.engine.correlation import correlation_matrix
+from src.engine.forecasting import fit_forecast
+from src.engine.regression import column_numbers, multiple_regression
+from src.engine.statistics import describe_range
+from src.engine.pivot import PivotTable, PivotField, LivePivot
 from src.engine.chart import ChartDialog
-from src.utils.config import USER_PREFERENCES
+from src.utils.config import USER_PREFERENCES, DATA_TABLE_WORKERS, FORECAST_WORKERS
+from src.utils.helpers import format_cell_address, index_to_column_name, parse_range_reference
 from src.gui.dialogs.preferences_dialog import PreferencesDialog
 
+def _service(name):
+    """Property that resolves an engine from the window's service registry"""
+    def getter(self):
+        if self.services is None or not self.services.has(name):
+            # Keeps hasattr() checks working when the window runs without a registry
+            raise AttributeError(name)
+        return self.services.get(name)
+    return property(getter)
+
 class MainWindow(QMainWindow):
+    # Service registry providing the engines below, set by main()
+    services = None
+    
+    regression_analyzer = _service('regression_analyzer')
+    stats_analyzer = _service('stats_analyzer')
+    forecaster = _service('forecaster')
+    chart_engine = _service('chart_engine')
+    version_control = _service('version_control')
+    
     def __init__(self):
         super().__init__()
         self.setWindowTitle("PySpreadsheet")
@@ -32,6 +63,7 @@ class MainWindow(QMainWindow):
         self.workbook.add_sheet("Sheet1")
         self.file_manager = FileManager()
         self.calculator = Calculator()
+        self.search_index = SearchIndex()  # Find/Replace index over the sheet views
         self.current_sheet_name = "Sheet1"
         self.settings = QSettings("AryanTech", "PySpreadsheet")
         self.named_ranges = {}  # Initialize named ranges dictionary
@@ -293,6 +325,10 @@ class MainWindow(QMainWindow):
         sort_desc_action.triggered.connect(lambda: self.sort_data(False))
         data_menu.addAction(sort_desc_action)
         
+        sort_range_action = QAction("&Sort Range...", self)
+        sort_range_action.triggered.connect(self.show_sort_dialog)
+        data_menu.addAction(sort_range_action)
+        
         data_menu.addSeparator()
         
         filter_action = QAction("&Filter...", self)
@@ -303,6 +339,12 @@ class MainWindow(QMainWindow):
         remove_filter_action.triggered.connect(self.remove_filter)
         data_menu.addAction(remove_filter_action)
         
+        data_menu.addSeparator()
+        
+        solver_action = QAction("&Solver...", self)
+        solver_action.triggered.connect(self.show_solver)
+        data_menu.addAction(solver_action)
+        
         # Data Analysis menu (new)
         data_analysis_menu = menu_bar.addMenu("&Data Analysis")
         
@@ -329,9 +371,16 @@ class MainWindow(QMainWindow):
         goal_seek_action = QAction("&Goal Seek...", self)
         goal_seek_action.triggered.connect(self.show_goal_seek)
         what_if_menu.addAction(goal_seek_action)
+        data_table_action = QAction("&Data Table...", self)
+        data_table_action.triggered.connect(self.show_data_table)
+        what_if_menu.addAction(data_table_action)
         what_if_action.setMenu(what_if_menu)
         data_analysis_menu.addAction(what_if_action)
         
+        simulation_action = QAction("&Monte Carlo Simulation...", self)
+        simulation_action.triggered.connect(self.show_simulation)
+        data_analysis_menu.addAction(simulation_action)
+        
         # Data Analysis menu additions
         data_analysis_menu.addSeparator()
 
@@ -481,6 +530,8 @@ class MainWindow(QMainWindow):
         # Create sheet view
         self.sheet_view = SheetView(self)
         self.main_layout.addWidget(self.sheet_view)
+        self.calculator.set_sheet_view(self.sheet_view)
+        self.search_index.add_sheet(self.current_sheet_name, self.sheet_view)
         
         # Connect cell selection to formula bar
         self.sheet_view.currentCellChanged.connect(self.update_formula_bar)
@@ -564,6 +615,8 @@ class MainWindow(QMainWindow):
         
         self.sheet_view.currentCellChanged.connect(self.update_formula_bar)
         self.calculator.set_sheet_view(self.sheet_view)
+        self.search_index = SearchIndex()
+        self.search_index.add_sheet(self.current_sheet_name, self.sheet_view)
         
         self.file_manager.close_file()
         self.statusBar().showMessage("New spreadsheet created")
@@ -779,9 +832,8 @@ class MainWindow(QMainWindow):
         if not hasattr(self, 'calculator'):
             return
             
-        # Use the calculator's dependency tracking
-        if hasattr(self.calculator, 'recalculate_all'):
-            self.calculator.recalculate_all()
+        # Use the calculator's dependency tracking; this also refreshes data tables
+        self.calculator.recalculate_cells([(changed_row, changed_col)])
 
     def undo(self):
         """Undo the last action"""
@@ -909,6 +961,7 @@ class MainWindow(QMainWindow):
                 
         self.sheet_view = SheetView(self)
         self.sheet_view.currentCellChanged.connect(self.update_formula_bar)
+        self.search_index.add_sheet(sheet_name, self.sheet_view)
         self.statusBar().showMessage(f"Added sheet: {sheet_name}")
         
         # Update workbook model
@@ -928,6 +981,7 @@ class MainWindow(QMainWindow):
             return
                 
         self.current_sheet_name = new_name
+        self.search_index.rename_sheet(self.sheet_view, new_name)
         self.statusBar().showMessage(f"Renamed sheet to: {new_name}")
         
         # Update workbook model
@@ -988,6 +1042,26 @@ class MainWindow(QMainWindow):
         direction = "ascending" if ascending else "descending"
         self.statusBar().showMessage(f"Sorted data {direction}")
 
+    def show_sort_dialog(self):
+        """Sort the selected range on several columns"""
+        from .dialogs.sort_dialog import SortDialog
+        
+        selected_ranges = self.sheet_view.selectedRanges()
+        if not selected_ranges:
+            QMessageBox.warning(self, "No Selection", "Please select a range to sort.")
+            return
+        range_ = selected_ranges[0]
+        headers = [str(self.sheet_view.get_cell_value(range_.topRow(), col) or "")
+                   for col in range(range_.leftColumn(), range_.rightColumn() + 1)]
+        dialog = SortDialog(self, range_.leftColumn(), range_.rightColumn(), headers)
+        if dialog.exec_() != QDialog.Accepted:
+            return
+            
+        settings = dialog.get_settings()
+        result = self.sheet_view.sort_selected_data(keys=settings['keys'], has_header=settings['has_header'])
+        if result is not None:
+            self.statusBar().showMessage(f"Sorted {result['rows']} rows on {len(settings['keys'])} key(s)")
+
     def filter_data(self):
         """Filter the data"""
         self.sheet_view.show_filter_dialog()
@@ -1131,116 +1205,51 @@ class MainWindow(QMainWindow):
             self.statusBar().showMessage("Sparkline feature not fully implemented")
 
     def create_pivot_table(self):
-        """Create a pivot table from the selected data"""
-        selected_items = self.sheet_view.selectedItems()
-        if not selected_items:
-            QMessageBox.warning(self, "No Selection", "Please select the data for your pivot table.")
-            return
-        
-        # Extract the data from the selection
-        rows = set()
-        cols = set()
-        
-        for item in selected_items:
-            rows.add(item.row())
-            cols.add(item.column())
-        
-        # Get ordered lists
-        rows_list = sorted(list(rows))
-        cols_list = sorted(list(cols))
+        """Summarize the selected data in a pivot table placed on the sheet"""
+        from .dialogs.pivot_table_dialog import PivotTableDialog
         
-        # Create pivot dialog
-        dialog = QDialog(self)
-        dialog.setWindowTitle("Create Pivot Table")
-        dialog.setMinimumSize(700, 500)
-        
-        layout = QVBoxLayout(dialog)
-        
-        # Areas for fields
-        fields_group = QGroupBox("Pivot Table Fields")
-        fields_layout = QGridLayout()
-        
-        # Available fields
-        available_label = QLabel("Available Fields:")
-        available_list = QListWidget()
-        
-        # Get headers from first row of selection
-        for col_idx in cols_list:
-            item = self.sheet_view.item(rows_list[0], col_idx)
-            header = item.text() if item else f"Column {col_idx+1}"
-            available_list.addItem(header)
+        selected_ranges = self.sheet_view.selectedRanges()
+        if not selected_ranges or selected_ranges[0].rowCount() < 2:
+            QMessageBox.warning(self, "No Selection", "Please select the data for your pivot table, headers included.")
+            return
+        range_ = selected_ranges[0]
+        top, left, bottom, right = range_.topRow(), range_.leftColumn(), range_.bottomRow(), range_.rightColumn()
+        headers = [str(self.sheet_view.get_cell_value(top, col) or f"Column {col - left + 1}")
+                   for col in range(left, right + 1)]
+        dialog = PivotTableDialog(
+            [headers], self,
+            field_labels=lambda index: PivotField(self.sheet_view.get_column_values(left + index, top + 1, bottom)).labels,
+            location=format_cell_address(top, right + 2))
+        if dialog.exec_() != QDialog.Accepted:
+            return
             
-        fields_layout.addWidget(available_label, 0, 0)
-        fields_layout.addWidget(available_list, 1, 0, 3, 1)
-        
-        # Pivot areas
-        row_label = QLabel("Row Labels:")
-        row_list = QListWidget()
-        fields_layout.addWidget(row_label, 0, 1)
-        fields_layout.addWidget(row_list, 1, 1)
-        
-        column_label = QLabel("Column Labels:")
-        column_list = QListWidget()
-        fields_layout.addWidget(column_label, 0, 2)
-        fields_layout.addWidget(column_list, 1, 2)
-        
-        values_label = QLabel("Values:")
-        values_list = QListWidget()
-        fields_layout.addWidget(values_label, 2, 1, 1, 2)
-        fields_layout.addWidget(values_list, 3, 1, 1, 2)
-        
-        # Add buttons
-        button_layout = QVBoxLayout()
-        add_to_row = QPushButton("Add to Row Labels")
-        add_to_column = QPushButton("Add to Column Labels")
-        add_to_values = QPushButton("Add to Values")
-        remove = QPushButton("Remove Field")
-        
-        button_layout.addWidget(add_to_row)
-        button_layout.addWidget(add_to_column)
-        button_layout.addWidget(add_to_values)
-        button_layout.addWidget(remove)
-        
-        fields_layout.addLayout(button_layout, 1, 3, 3, 1)
-        fields_group.setLayout(fields_layout)
-        layout.addWidget(fields_group)
-        
-        # Dialog buttons
-        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
-        buttons.accepted.connect(dialog.accept)
-        buttons.rejected.connect(dialog.reject)
-        layout.addWidget(buttons)
-        
-        # Connect the add/remove buttons
-        def add_to_row_labels():
-            for item in available_list.selectedItems():
-                row_list.addItem(item.text())
-                
-        def add_to_column_labels():
-            for item in available_list.selectedItems():
-                column_list.addItem(item.text())
-                
-        def add_to_values_area():
-            for item in available_list.selectedItems():
-                values_list.addItem(f"Sum of {item.text()}")
-                
-        def remove_field():
-            for list_widget in [row_list, column_list, values_list]:
-                for item in list_widget.selectedItems():
-                    list_widget.takeItem(list_widget.row(item))
-                    
-        add_to_row.clicked.connect(add_to_row_labels)
-        add_to_column.clicked.connect(add_to_column_labels)
-        add_to_values.clicked.connect(add_to_values_area)
-        remove.clicked.connect(remove_field)
-        
-        if dialog.exec_() == QDialog.Accepted:
-            self.statusBar().showMessage("Pivot table functionality not fully implemented")
-            # In a full implementation, we would:
-            # 1. Create a new sheet for the pivot table
-            # 2. Generate the pivot table structure based on the selections
-            # 3. Calculate the aggregations (sums, etc.)
-            # 4. Format the pivot table appropriately
+        settings = dialog.get_settings()
+        location = parse_range_reference(settings['location'])
+        if location is None:
+            QMessageBox.warning(self, "Pivot Table", f"Invalid location: {settings['location']}")
+            return
+        try:
+            pivot_table = PivotTable(
+                (top, left, bottom, right),
+                rows=[left + index for index in settings['rows']],
+                columns=[left + index for index in settings['columns']],
+                values=[(left + index, aggregation) for index, aggregation in settings['values']],
+                filters={left + index: labels for index, labels in settings['filters'].items()},
+                totals=settings['totals'])
+        except ValueError as e:
+            QMessageBox.warning(self, "Pivot Table", str(e))
+            return
+            
+        # Output to the right of or below the source keeps clear of it as the pivot grows
+        row, col = location[0], location[1]
+        if row <= bottom and col <= right:
+            QMessageBox.warning(self, "Pivot Table", "The pivot table must be placed beside or below its source data.")
+            return
+        # The pivot refreshes itself whenever its source cells are recalculated
+        table = self.calculator.add_pivot_table(LivePivot(pivot_table, (row, col)))
+        width = max(len(line) for line in table)
+        self.statusBar().showMessage(
+            f"Created pivot table at {format_cell_address(row, col)} ({len(table)} rows x {width} columns)")
 
     def show_data_validation(self):
         """Show data validation dialog"""
@@ -1407,9 +1416,12 @@ class MainWindow(QMainWindow):
         
         layout = QGridLayout(dialog)
         
-        # Set cell
+        # Set cell, defaulting to the current cell
         layout.addWidget(QLabel("Set cell:"), 0, 0)
         set_cell_input = QLineEdit()
+        current_row, current_col = self.sheet_view.table.currentRow(), self.sheet_view.table.currentColumn()
+        if current_row >= 0 and current_col >= 0:
+            set_cell_input.setText(format_cell_address(current_row, current_col))
         layout.addWidget(set_cell_input, 0, 1)
         
         # To value
@@ -1428,78 +1440,228 @@ class MainWindow(QMainWindow):
         buttons.rejected.connect(dialog.reject)
         layout.addWidget(buttons, 3, 0, 1, 2)
         
-        if dialog.exec_() == QDialog.Accepted:
-            # This would implement the actual goal seek algorithm
-            self.statusBar().showMessage("Goal seek feature not fully implemented")
-
-    def remove_duplicates(self):
-        """Remove duplicate rows from selection"""
-        selected_ranges = self.sheet_view.selectedRanges()
+        if dialog.exec_() != QDialog.Accepted:
+            return
+            
+        try:
+            target_value = float(to_value_input.text())
+        except ValueError:
+            QMessageBox.warning(self, "Goal Seek", "The target value must be a number.")
+            return
+            
+        # The model is extracted here, on the GUI thread; the search itself runs in the background
+        try:
+            seek = GoalSeek(self.calculator, set_cell_input.text(), target_value, by_changing_input.text())
+        except ValueError as e:
+            QMessageBox.warning(self, "Goal Seek", str(e))
+            return
+            
+        progress = QProgressDialog("Searching for a solution...", "Cancel", 0, 0, self)
+        progress.setWindowTitle("Goal Seek")
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(300)
+        progress.canceled.connect(seek.cancel)
+        
+        task = BackgroundTask(seek.solve, parent=self)
+        task.succeeded.connect(lambda result: self.finish_goal_seek(seek, result, progress))
+        task.failed.connect(lambda error: (progress.reset(), QMessageBox.warning(self, "Goal Seek", f"Error during goal seek: {error}")))
+        task.start()
+        
+    def finish_goal_seek(self, seek, result, progress):
+        """Report a goal seek result and optionally apply it to the sheet"""
+        progress.reset()
+        target = format_cell_address(*seek.target_cell)
+        changing = format_cell_address(*seek.changing_cell)
+        
+        if not result['converged']:
+            QMessageBox.information(
+                self, "Goal Seek",
+                f"Goal seeking with cell {target} may not have found a solution.\n\n"
+                f"{result['message']} ({result['iterations']} iterations)."
+            )
+            self.statusBar().showMessage("Goal seek did not converge")
+            return
+            
+        response = QMessageBox.question(
+            self, "Goal Seek",
+            f"Goal seeking with cell {target} found a solution in {result['iterations']} iterations.\n\n"
+            f"Target value: {seek.target_value:g}\n"
+            f"Current value: {result['result']:.10g}\n"
+            f"{changing} = {result['value']:.15g}\n\n"
+            f"Keep the new value?",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if response == QMessageBox.Yes:
+            row, col = seek.changing_cell
+            self.sheet_view.set_cell_value(row, col, f"{result['value']:.15g}")
+            self.calculator.recalculate_cells([(row, col)])
+            self.statusBar().showMessage(f"Goal seek set {changing} to {result['value']:.15g}")
+
+    def show_data_table(self):
+        """Fill the selected range as a one- or two-variable data table"""
+        selected_ranges = self.sheet_view.table.selectedRanges()
         if not selected_ranges:
-            QMessageBox.warning(self, "No Selection", "Please select a range to remove duplicates from.")
+            QMessageBox.warning(self, "Data Table", "Select the table range first, including its header row and column.")
             return
-        
-        # Use first range
         range_ = selected_ranges[0]
-        top = range_.topRow()
-        left = range_.leftColumn()
-        bottom = range_.bottomRow()
-        right = range_.rightColumn()
+        bounds = (range_.topRow(), range_.leftColumn(), range_.bottomRow(), range_.rightColumn())
         
-        # Extract data
-        data = []
-        for row in range(top, bottom + 1):
-            row_data = []
-            for col in range(left, right + 1):
-                item = self.sheet_view.item(row, col)
-                cell_value = item.text() if item else ""
-                row_data.append(cell_value)
-            data.append(tuple(row_data))  # Use tuple for hashability
-        
-        # Find unique rows
-        unique_rows = []
-        seen = set()
-        duplicate_count = 0
-        
-        for i, row_tuple in enumerate(data):
-            if row_tuple not in seen:
-                seen.add(row_tuple)
-                unique_rows.append((i, row_tuple))
-            else:
-                duplicate_count += 1
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Data Table")
+        layout = QGridLayout(dialog)
+        layout.addWidget(QLabel("Row input cell:"), 0, 0)
+        row_input = QLineEdit()
+        layout.addWidget(row_input, 0, 1)
+        layout.addWidget(QLabel("Column input cell:"), 1, 0)
+        column_input = QLineEdit()
+        layout.addWidget(column_input, 1, 1)
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(dialog.accept)
+        buttons.rejected.connect(dialog.reject)
+        layout.addWidget(buttons, 2, 0, 1, 2)
         
-        if duplicate_count == 0:
-            QMessageBox.information(self, "No Duplicates", "No duplicate values were found.")
+        if dialog.exec_() != QDialog.Accepted:
             return
+            
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            table = DataTable(bounds, row_input.text().strip() or None, column_input.text().strip() or None)
+            self.calculator.add_data_table(table, DATA_TABLE_WORKERS)
+        except ValueError as e:
+            QMessageBox.warning(self, "Data Table", str(e))
+            return
+        finally:
+            QApplication.restoreOverrideCursor()
+            
+        top, left, bottom, right = bounds
+        self.statusBar().showMessage(
+            f"Data table {format_cell_address(top, left)}:{format_cell_address(bottom, right)} "
+            f"filled with {(bottom - top) * (right - left)} results"
+        )
+
+    def show_solver(self):
+        """Show the Solver dialog and run the optimization in the background"""
+        from .dialogs.solver_dialog import SolverDialog
         
-        # Confirm removal
+        current_row, current_col = self.sheet_view.table.currentRow(), self.sheet_view.table.currentColumn()
+        objective = format_cell_address(current_row, current_col) if current_row >= 0 and current_col >= 0 else ""
+        dialog = SolverDialog(self, objective)
+        if dialog.exec_() != QDialog.Accepted:
+            return
+            
+        # The model is extracted here, on the GUI thread; the optimization runs in the background
+        try:
+            solver = Solver(self.calculator, **dialog.get_settings())
+        except ValueError as e:
+            QMessageBox.warning(self, "Solver", str(e))
+            return
+            
+        progress = QProgressDialog("Solving...", "Stop", 0, 0, self)
+        progress.setWindowTitle("Solver")
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(300)
+        progress.canceled.connect(solver.cancel)
+        
+        task = BackgroundTask(solver.solve, parent=self)
+        task.succeeded.connect(lambda result: self.finish_solver(solver, result, progress))
+        task.failed.connect(lambda error: (progress.reset(), QMessageBox.warning(self, "Solver", f"Error running solver: {error}")))
+        task.start()
+        
+    def finish_solver(self, solver, result, progress):
+        """Report a Solver result and optionally apply it to the sheet"""
+        progress.reset()
+        lines = [f"{format_cell_address(*cell)} = {value:.10g}"
+                 for cell, value in zip(solver.changing_cells, result['values'])]
+        lines.append(f"Objective {format_cell_address(*solver.objective_cell)} = {result['objective']:.10g}")
+        violated = [f"{format_cell_address(*cell)} {operator} {value:g} (is {actual:.6g})"
+                    for cell, operator, value, actual, satisfied in result['constraints'] if not satisfied]
+        if violated:
+            lines.append("Violated constraints:\n" + "\n".join(violated))
+            
+        heading = "Solver found a solution." if result['success'] else f"Solver could not find a solution: {result['message']}"
         response = QMessageBox.question(
-            self, "Remove Duplicates",
-            f"Found {duplicate_count} duplicate row(s). Do you want to remove them?",
+            self, "Solver",
+            f"{heading}\n\n" + "\n".join(lines) + f"\n\n{result['evaluations']} model evaluations. Keep these values?",
             QMessageBox.Yes | QMessageBox.No
         )
-        
         if response == QMessageBox.Yes:
-            # Block signals during update
-            self.sheet_view.blockSignals(True)
-            
-            # Clear the range
-            for row in range(top, bottom + 1):
-                for col in range(left, right + 1):
-                    item = self.sheet_view.item(row, col)
-                    if item:
-                        item.setText("")
+            for (row, col), value in zip(solver.changing_cells, result['values']):
+                self.sheet_view.set_cell_value(row, col, f"{value:.15g}")
+            self.calculator.recalculate_cells(solver.changing_cells)
+            self.statusBar().showMessage("Solver values applied")
+        else:
+            self.statusBar().showMessage("Solver values discarded")
+
+    def show_simulation(self):
+        """Show the Monte Carlo dialog and run the simulation in the background"""
+        from .dialogs.simulation_dialog import SimulationDialog
+        
+        current_row, current_col = self.sheet_view.table.currentRow(), self.sheet_view.table.currentColumn()
+        output = format_cell_address(current_row, current_col) if current_row >= 0 and current_col >= 0 else ""
+        dialog = SimulationDialog(self, output)
+        if dialog.exec_() != QDialog.Accepted:
+            return
             
-            # Fill with unique data
-            for i, (original_index, row_data) in enumerate(unique_rows):
-                for j, value in enumerate(row_data):
-                    item = self.sheet_view.item(top + i, left + j)
-                    if item:
-                        item.setText(value)
+        # The model is extracted here, on the GUI thread; the trials run in the background
+        try:
+            simulation = MonteCarloSimulation(self.calculator, **dialog.get_settings())
+        except ValueError as e:
+            QMessageBox.warning(self, "Monte Carlo Simulation", str(e))
+            return
             
-            self.sheet_view.blockSignals(False)
+        progress = QProgressDialog("Running trials...", "Stop", 0, 100, self)
+        progress.setWindowTitle("Monte Carlo Simulation")
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(300)
+        progress.canceled.connect(simulation.cancel)
+        
+        task = BackgroundTask(simulation.run, parent=self)
+        task.kwargs['progress'] = task.report_progress
+        task.progressed.connect(progress.setValue)
+        task.succeeded.connect(lambda result: self.finish_simulation(result, progress))
+        task.failed.connect(lambda error: (progress.reset(), QMessageBox.warning(self, "Monte Carlo Simulation", f"Error running simulation: {error}")))
+        task.start()
+        
+    def finish_simulation(self, result, progress):
+        """Show the distributions collected by a Monte Carlo run"""
+        from .dialogs.simulation_dialog import SimulationResultsDialog
+        
+        progress.reset()
+        if not result['trials']:
+            self.statusBar().showMessage("Simulation stopped before any trials finished")
+            return
+        SimulationResultsDialog(result, self).exec_()
+        stopped = " (stopped early)" if result['cancelled'] else ""
+        self.statusBar().showMessage(f"Simulated {result['trials']} trials in {result['elapsed_s']:.2f} s{stopped}")
+
+    def remove_duplicates(self):
+        """Remove duplicate rows from the selection, matched on chosen key columns"""
+        from .dialogs.duplicates_dialog import RemoveDuplicatesDialog
+        
+        selected_ranges = self.sheet_view.selectedRanges()
+        if not selected_ranges:
+            QMessageBox.warning(self, "No Selection", "Please select a range to remove duplicates from.")
+            return
+        range_ = selected_ranges[0]
+        headers = [str(self.sheet_view.get_cell_value(range_.topRow(), col) or "")
+                   for col in range(range_.leftColumn(), range_.rightColumn() + 1)]
+        dialog = RemoveDuplicatesDialog(self, range_.leftColumn(), range_.rightColumn(), headers)
+        if dialog.exec_() != QDialog.Accepted:
+            return
             
-            self.statusBar().showMessage(f"Removed {duplicate_count} duplicate row(s)")
+        settings = dialog.get_settings()
+        try:
+            result = self.sheet_view.remove_duplicate_rows(**settings)
+        except ValueError as e:
+            QMessageBox.warning(self, "Remove Duplicates", str(e))
+            return
+        if result is None:
+            return
+        if not result['duplicates']:
+            QMessageBox.information(self, "No Duplicates", "No duplicate values were found.")
+            return
+        self.statusBar().showMessage(
+            f"Removed {result['duplicates']} duplicate row(s); {result['unique']} unique row(s) remain")
 
     # Help operations
     def show_quick_help(self):
@@ -1616,11 +1778,11 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "No File", "You need to save the file first.")
             return
             
-        # Get document ID and versions
+        # Get document ID and version count
         document_id = self.version_control.get_document_id_from_path(current_path)
-        versions = self.version_control.get_versions(document_id)
+        total_versions = self.version_control.count_versions(document_id)
         
-        if not versions:
+        if not total_versions:
             QMessageBox.information(self, "No Versions", "No version history found for this document.")
             return
             
@@ -1636,12 +1798,38 @@ class MainWindow(QMainWindow):
         version_list = QListWidget()
         layout.addWidget(version_list)
         
-        # Add versions to the list
-        for version in versions:
-            timestamp = datetime.datetime.fromisoformat(version['timestamp']).strftime("%Y-%m-%d %H:%M:%S")
-            comment = version['comment'] or "(No comment)"
-            list_item = f"{timestamp} - {comment}"
-            version_list.addItem(list_item)
+        # Versions are listed newest first, one page at a time
+        page_size = 100
+        page = {'offset': 0}
+        versions = []
+        
+        page_layout = QHBoxLayout()
+        previous_page_button = QPushButton("< Newer")
+        page_label = QLabel()
+        next_page_button = QPushButton("Older >")
+        page_layout.addWidget(previous_page_button)
+        page_layout.addWidget(page_label, 1, Qt.AlignCenter)
+        page_layout.addWidget(next_page_button)
+        layout.addLayout(page_layout)
+        
+        def load_page(offset):
+            page['offset'] = max(0, offset)
+            versions[:] = self.version_control.get_versions(
+                document_id, offset=page['offset'], limit=page_size, newest_first=True)
+            
+            version_list.clear()
+            for version in versions:
+                timestamp = datetime.datetime.fromisoformat(version['timestamp']).strftime("%Y-%m-%d %H:%M:%S")
+                comment = version['comment'] or "(No comment)"
+                version_list.addItem(f"{timestamp} - {comment}")
+                
+            page_label.setText(f"Versions {page['offset'] + 1}-{page['offset'] + len(versions)} of {total_versions}")
+            previous_page_button.setEnabled(page['offset'] > 0)
+            next_page_button.setEnabled(page['offset'] + page_size < total_versions)
+            
+        previous_page_button.clicked.connect(lambda: load_page(page['offset'] - page_size))
+        next_page_button.clicked.connect(lambda: load_page(page['offset'] + page_size))
+        load_page(0)
             
         # Add buttons
         button_layout = QHBoxLayout()
@@ -1650,6 +1838,14 @@ class MainWindow(QMainWindow):
         restore_button.clicked.connect(lambda: self.restore_version(dialog, document_id, versions, version_list.currentRow()))
         button_layout.addWidget(restore_button)
         
+        partial_button = QPushButton("Restore Sheet/Range...")
+        partial_button.clicked.connect(lambda: self.restore_version_partial(dialog, document_id, versions, version_list.currentRow()))
+        button_layout.addWidget(partial_button)
+        
+        changes_button = QPushButton("Show Changes Since")
+        changes_button.clicked.connect(lambda: self.show_version_changes(dialog, document_id, versions, version_list.currentRow()))
+        button_layout.addWidget(changes_button)
+        
         delete_button = QPushButton("Delete Selected Version")
         delete_button.clicked.connect(lambda: self.delete_version(dialog, document_id, versions, version_list.currentRow()))
         button_layout.addWidget(delete_button)
@@ -1692,6 +1888,132 @@ class MainWindow(QMainWindow):
         else:
             QMessageBox.critical(dialog, "Error", "Failed to restore version.")
 
+    def restore_version_partial(self, dialog, document_id, versions, index):
+        """Preview and restore a single sheet or range from a selected version"""
+        if index < 0 or index >= len(versions):
+            return
+            
+        version_id = versions[index]['version_id']
+        version_timestamp = datetime.datetime.fromisoformat(versions[index]['timestamp']).strftime("%Y-%m-%d %H:%M:%S")
+        sheets = self.version_control.get_version_sheets(document_id, version_id)
+        if not sheets:
+            QMessageBox.critical(dialog, "Error", "Failed to read version.")
+            return
+            
+        # Choose the sheet and the block of cells to bring back
+        sheet_names = [sheet['name'] for sheet in sheets]
+        sheet_name, ok = QInputDialog.getItem(dialog, "Restore Sheet/Range", "Sheet:", sheet_names, 0, False)
+        if not ok:
+            return
+            
+        range_str, ok = QInputDialog.getText(
+            dialog, "Restore Sheet/Range",
+            "Range to restore (e.g. A1:D20), or leave empty for the whole sheet:"
+        )
+        if not ok:
+            return
+            
+        cell_range = None
+        if range_str.strip():
+            cell_range = parse_range_reference(range_str.strip())
+            if cell_range is None:
+                QMessageBox.warning(dialog, "Invalid Range", f"Invalid range: {range_str}")
+                return
+                
+        data = self.version_control.load_version_partial(document_id, version_id, sheet_name, cell_range)
+        if data is None:
+            QMessageBox.critical(dialog, "Error", "Failed to load version data.")
+            return
+            
+        start_row, start_col = (cell_range[0], cell_range[1]) if cell_range else (0, 0)
+        n_cols = max((len(row) for row in data), default=0)
+        
+        # Preview the old values before anything is written
+        preview_dialog = QDialog(dialog)
+        preview_dialog.setWindowTitle(f"{sheet_name} from {version_timestamp}")
+        preview_dialog.setMinimumWidth(600)
+        preview_dialog.setMinimumHeight(400)
+        
+        layout = QVBoxLayout(preview_dialog)
+        layout.addWidget(QLabel(f"{len(data)} row(s) x {n_cols} column(s) starting at "
+                                f"{format_cell_address(start_row, start_col)}"))
+        
+        preview_table = QTableWidget(len(data), n_cols)
+        preview_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        preview_table.setHorizontalHeaderLabels([index_to_column_name(start_col + c) for c in range(n_cols)])
+        preview_table.setVerticalHeaderLabels([str(start_row + r + 1) for r in range(len(data))])
+        for r, row in enumerate(data):
+            for c, value in enumerate(row):
+                preview_table.setItem(r, c, QTableWidgetItem(str(value)))
+        layout.addWidget(preview_table)
+        
+        button_box = QDialogButtonBox()
+        button_box.addButton("Restore Into Current Sheet", QDialogButtonBox.AcceptRole)
+        button_box.addButton(QDialogButtonBox.Cancel)
+        button_box.accepted.connect(preview_dialog.accept)
+        button_box.rejected.connect(preview_dialog.reject)
+        layout.addWidget(button_box)
+        
+        if preview_dialog.exec_() != QDialog.Accepted:
+            return
+            
+        # Write the old values back in place; each cell edit goes on the undo stack
+        table = self.sheet_view.table
+        if start_row + len(data) > table.rowCount():
+            table.setRowCount(start_row + len(data))
+            self.sheet_view.update_row_headers()
+        if start_col + n_cols > table.columnCount():
+            table.setColumnCount(start_col + n_cols)
+            self.sheet_view.update_column_headers()
+        for r, row in enumerate(data):
+            for c, value in enumerate(row):
+                self.sheet_view.set_cell_value(start_row + r, start_col + c, str(value))
+                
+        self.calculator.recalculate_all()
+        self.statusBar().showMessage(f"Restored {sheet_name} cells from version {version_timestamp}")
+
+    def show_version_changes(self, dialog, document_id, versions, index):
+        """Show the cells changed since a selected version"""
+        if index < 0 or index >= len(versions):
+            return
+            
+        version_timestamp = datetime.datetime.fromisoformat(versions[index]['timestamp']).strftime("%Y-%m-%d %H:%M:%S")
+        diff = self.version_control.changes_since(document_id, versions[index]['version_id'])
+        if diff is None:
+            QMessageBox.critical(dialog, "Error", "Failed to compare versions.")
+            return
+            
+        changes_dialog = QDialog(dialog)
+        changes_dialog.setWindowTitle(f"Changes Since {version_timestamp}")
+        changes_dialog.setMinimumWidth(600)
+        changes_dialog.setMinimumHeight(400)
+        
+        layout = QVBoxLayout(changes_dialog)
+        
+        summary = f"{len(diff['cells'])} cell(s) changed"
+        if diff['sheets_added']:
+            summary += f"; sheets added: {', '.join(diff['sheets_added'])}"
+        if diff['sheets_removed']:
+            summary += f"; sheets removed: {', '.join(diff['sheets_removed'])}"
+        layout.addWidget(QLabel(summary))
+        
+        changes_table = QTableWidget(len(diff['cells']), 4)
+        changes_table.setHorizontalHeaderLabels(["Sheet", "Cell", "Old Value", "New Value"])
+        changes_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        for i, change in enumerate(diff['cells']):
+            changes_table.setItem(i, 0, QTableWidgetItem(change['sheet']))
+            changes_table.setItem(i, 1, QTableWidgetItem(format_cell_address(change['row'], change['col'])))
+            changes_table.setItem(i, 2, QTableWidgetItem(str(change['old'])))
+            changes_table.setItem(i, 3, QTableWidgetItem(str(change['new'])))
+        changes_table.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(changes_table)
+        
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(changes_dialog.reject)
+        layout.addWidget(close_button)
+        
+        changes_dialog.exec_()
+
     def delete_version(self, dialog, document_id, versions, index):
         """Delete a selected version"""
         if index < 0 or index >= len(versions):
@@ -1740,41 +2062,28 @@ class MainWindow(QMainWindow):
         """Show regression analysis dialog"""
         selected_ranges = self.sheet_view.selectedRanges()
         if not selected_ranges or len(selected_ranges) != 1:
-            QMessageBox.warning(self, "Selection Required", "Please select a range with two columns (X and Y values)")
+            QMessageBox.warning(self, "Selection Required", "Please select a range with X columns followed by a Y column")
             return
             
         range_ = selected_ranges[0]
-        # Extract data
-        if range_.columnCount() != 2:
-            QMessageBox.warning(self, "Invalid Selection", "Please select exactly two columns of data (X and Y values)")
-            return
-            
-        x_values = []
-        y_values = []
-        for row in range(range_.topRow(), range_.bottomRow() + 1):
-            x_item = self.sheet_view.item(row, range_.leftColumn())
-            y_item = self.sheet_view.item(row, range_.leftColumn() + 1)
-            
-            if x_item and y_item:
-                try:
-                    x_val = float(x_item.text())
-                    y_val = float(y_item.text())
-                    x_values.append(x_val)
-                    y_values.append(y_val)
-                except ValueError:
-                    # Skip non-numeric values
-                    pass
-                    
-        if len(x_values) < 2:
-            QMessageBox.warning(self, "Insufficient Data", "Need at least 2 numeric data points for regression")
+        # Extract data: every column but the last is an independent variable
+        if range_.columnCount() < 2:
+            QMessageBox.warning(self, "Invalid Selection", "Please select at least two columns of data (X values, then Y values)")
             return
             
-        # Perform regression analysis
         import numpy as np
-        from scipy import stats
+        top, bottom = range_.topRow(), range_.bottomRow()
+        x_columns = list(range(range_.leftColumn(), range_.rightColumn()))
+        x_values = np.column_stack([column_numbers(self.sheet_view.get_column_values(col, top, bottom))
+                                    for col in x_columns])
+        y_values = column_numbers(self.sheet_view.get_column_values(range_.rightColumn(), top, bottom))
         
-        # Perform regression analysis
-        slope, intercept, r_value, p_value, std_err = stats.linregress(x_values, y_values)
+        # Rows with a non-numeric value are left out of the fit
+        try:
+            results = multiple_regression(x_values, y_values)
+        except ValueError as e:
+            QMessageBox.warning(self, "Insufficient Data", f"Cannot fit a regression: {e}")
+            return
         
         # Create result sheet
         sheet_name = "Regression Analysis"
@@ -1782,20 +2091,27 @@ class MainWindow(QMainWindow):
         self.sheet_view = result_sheet
         
         # Format the results
-        results = [
+        names = ["Intercept"] + [index_to_column_name(col) for col in x_columns]
+        coefficients = results['coefficients']
+        terms = " + ".join(f"{value:.4f}*{name}" for name, value in zip(names[1:], coefficients[1:]))
+        rows = [
             ["Regression Statistics"],
-            ["Slope", f"{slope:.6f}"],
-            ["Intercept", f"{intercept:.6f}"],
-            ["R-squared", f"{r_value**2:.6f}"],
-            ["R", f"{r_value:.6f}"],
-            ["P-value", f"{p_value:.6f}"],
-            ["Standard Error", f"{std_err:.6f}"],
+            ["Observations", results['observations']],
+            ["R-squared", f"{results['r_squared']:.6f}"],
+            ["Adjusted R-squared", f"{results['adjusted_r_squared']:.6f}"],
+            ["Standard Error", f"{results['std_error']:.6f}"],
+            ["F", f"{results['f_statistic']:.6f}"],
+            ["Significance F", f"{results['f_p_value']:.6f}"],
             [],
-            ["Equation", f"y = {slope:.4f}x + {intercept:.4f}"]
+            ["", "Coefficient", "Standard Error", "t Stat", "P-value"]
         ]
+        for i, name in enumerate(names):
+            rows.append([name] + [f"{results[key][i]:.6f}"
+                                  for key in ('coefficients', 'std_errors', 't_values', 'p_values')])
+        rows += [[], ["Equation", f"y = {coefficients[0]:.4f} + {terms}"]]
         
         # Load results into the sheet
-        result_sheet.load_data(results)
+        result_sheet.load_data(rows)
         
         # Create a chart of the data with regression line
         self.statusBar().showMessage("Regression analysis complete")
@@ -1808,28 +2124,13 @@ class MainWindow(QMainWindow):
             return
             
         range_ = selected_ranges[0]
-        # Extract data
+        bounds = (range_.topRow(), range_.leftColumn(), range_.bottomRow(), range_.rightColumn())
         
-        # Extract all numeric values from the selection
-        data = []
-        for row in range(range_.topRow(), range_.bottomRow() + 1):
-            for col in range(range_.leftColumn(), range_.rightColumn() + 1):
-                item = self.sheet_view.item(row, col)
-                if item:
-                    try:
-                        value = float(item.text())
-                        data.append(value)
-                    except ValueError:
-                        # Skip non-numeric values
-                        pass
-                        
-        if not data:
+        # Read the selection column by column in chunks, in a single pass
+        stats = describe_range(self.sheet_view, bounds)
+        if 'error' in stats:
             QMessageBox.warning(self, "No Numeric Data", "No numeric data found in selection")
             return
-                        
-        # Calculate statistics
-        import numpy as np
-        from scipy import stats
         
         # Create statistics sheet
         sheet_name = "Statistics"
@@ -1839,21 +2140,22 @@ class MainWindow(QMainWindow):
         # Format the results
         results = [
             ["Descriptive Statistics", "", ""],
-            ["Count", len(data), ""],
-            ["Mean", np.mean(data), ""],
-            ["Median", np.median(data), ""],
-            ["Mode", stats.mode(data, keepdims=False)[0], ""],
-            ["Standard Deviation", np.std(data, ddof=1), ""],
-            ["Variance", np.var(data, ddof=1), ""],
-            ["Minimum", np.min(data), ""],
-            ["Maximum", np.max(data), ""],
-            ["Range", np.max(data) - np.min(data), ""],
-            ["Sum", np.sum(data), ""],
-            ["Q1 (25th Percentile)", np.percentile(data, 25), ""],
-            ["Q2 (50th Percentile)", np.percentile(data, 50), ""],
-            ["Q3 (75th Percentile)", np.percentile(data, 75), ""],
-            ["Skewness", stats.skew(data), ""],
-            ["Kurtosis", stats.kurtosis(data), ""]
+            ["Count", stats['count'], ""],
+            ["Mean", stats['mean'], ""],
+            ["Median", stats['median'], ""],
+            # The mode is not tracked for selections with very many distinct values
+            ["Mode", "" if stats['mode'] is None else stats['mode'], ""],
+            ["Standard Deviation", stats['std_dev'], ""],
+            ["Variance", stats['variance'], ""],
+            ["Minimum", stats['min'], ""],
+            ["Maximum", stats['max'], ""],
+            ["Range", stats['range'], ""],
+            ["Sum", stats['sum'], ""],
+            ["Q1 (25th Percentile)", stats['quartile_1'], ""],
+            ["Q2 (50th Percentile)", stats['quartile_2'], ""],
+            ["Q3 (75th Percentile)", stats['quartile_3'], ""],
+            ["Skewness", stats.get('skewness', ""), ""],
+            ["Kurtosis", stats.get('kurtosis', ""), ""]
         ]
         
         # Load results into the sheet
@@ -1861,30 +2163,48 @@ class MainWindow(QMainWindow):
         self.statusBar().showMessage("Descriptive statistics generated")
         
     def create_forecast_sheet(self):
-        """Create a forecast sheet using time series data"""
+        """Create a forecast sheet from time series data, one series per column"""
         selected_ranges = self.sheet_view.selectedRanges()
         if not selected_ranges or len(selected_ranges) != 1:
             QMessageBox.warning(self, "Selection Required", "Please select a range with at least one column of data")
             return
             
         range_ = selected_ranges[0]
-        # Extract data (assume it's time series data)
-        data = []
-        for row in range(range_.topRow(), range_.bottomRow() + 1):
-            item = self.sheet_view.item(row, range_.leftColumn())
-            if item:
-                try:
-                    value = float(item.text())
-                    data.append(value)
-                except ValueError:
-                    # Skip non-numeric values
-                    pass
+        # Extract data (assume each column is a time series)
+        import numpy as np
+        top, bottom = range_.topRow(), range_.bottomRow()
+        columns = list(range(range_.leftColumn(), range_.rightColumn() + 1))
+        values = [self.sheet_view.get_column_values(col, top, bottom) for col in columns]
+        data = np.column_stack([column_numbers(column) for column in values])
+        names = [index_to_column_name(col) for col in columns]
+        if len(data) > 1 and np.isnan(data[0]).all():
+            # A first row without numbers holds the series names
+            names = [str(column[0]) if column[0] not in (None, '') else name for column, name in zip(values, names)]
+        # Skip rows with no numbers at all; gaps inside a series are smoothed over
+        data = data[~np.isnan(data).all(axis=1)]
         
         if len(data) < 5:
             QMessageBox.warning(self, "Insufficient Data", "Need at least 5 data points for forecast")
             return
             
-        # Simple forecasting using exponential smoothing
+        methods = {
+            "Simple exponential smoothing": 'simple',
+            "Holt (trend)": 'holt',
+            "Holt-Winters (trend and season)": 'holt_winters',
+        }
+        method_name, ok = QInputDialog.getItem(self, "Forecast Method", "Smoothing method:", list(methods), 1, False)
+        if not ok:
+            return
+        method = methods[method_name]
+        season_length = None
+        if method == 'holt_winters':
+            if len(data) < 4:
+                QMessageBox.warning(self, "Insufficient Data", "Holt-Winters needs at least two full seasons of data")
+                return
+            season_length, ok = QInputDialog.getInt(self, "Season Length", "Periods per season:",
+                                                    min(12, len(data) // 2), 2, len(data) // 2)
+            if not ok:
+                return
         
         # How many periods to forecast
         periods_dialog = QInputDialog(self)
@@ -1898,40 +2218,54 @@ class MainWindow(QMainWindow):
             
         forecast_periods = periods_dialog.intValue()
         
-        # Simple exponential smoothing with alpha = 0.3
-        alpha = 0.3
-        forecast = [data[0]]
-        for i in range(1, len(data)):
-            forecast.append(alpha * data[i] + (1 - alpha) * forecast[i-1])
-        
-        # Forecast future values
-        last_forecast = forecast[-1]
-        future_forecast = []
-        for _ in range(forecast_periods):
-            last_forecast = alpha * last_forecast + (1 - alpha) * last_forecast
-            future_forecast.append(last_forecast)
+        # The smoothing parameters are fitted per series in the background
+        progress = QProgressDialog("Fitting forecasts...", None, 0, 100, self)
+        progress.setWindowTitle("Forecast")
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(300)
+        
+        task = BackgroundTask(fit_forecast, data, method, forecast_periods, season_length,
+                              workers=FORECAST_WORKERS, parent=self)
+        task.kwargs['progress'] = task.report_progress
+        task.progressed.connect(progress.setValue)
+        task.succeeded.connect(lambda result: self.finish_forecast(names, data, result, progress))
+        task.failed.connect(lambda error: (progress.reset(), QMessageBox.warning(self, "Forecast", f"Error fitting forecast: {error}")))
+        task.start()
+        
+    def finish_forecast(self, names, data, result, progress):
+        """Lay out the fitted values and forecasts of a forecast run on a new sheet"""
+        import numpy as np
         
+        progress.reset()
         # Create forecast sheet
         sheet_name = "Forecast"
         forecast_sheet = SheetView(self)
         self.sheet_view = forecast_sheet
         
-        # Format the results
-        results = [
-            ["Period", "Actual", "Forecast", ""],
-        ]
+        # A single series is shown beside its actual values
+        single = len(names) == 1
         
-        # Add historical data and forecast
-        for i, (actual, pred) in enumerate(zip(data, forecast)):
-            results.append([i+1, actual, pred, ""])
+        def line(label, values, actual=""):
+            cells = ["" if np.isnan(value) else float(value) for value in values]
+            return [label] + ([actual] if single else []) + cells
         
-        # Add future forecast
-        for i, pred in enumerate(future_forecast):
-            results.append([len(data) + i + 1, "", pred, ""])
+        # Format the results
+        results = [["Period", "Actual", "Forecast"] if single else ["Period"] + names]
+        for i, fitted in enumerate(result['fitted']):
+            results.append(line(i + 1, fitted, "" if np.isnan(data[i, 0]) else data[i, 0]))
+        for i, forecast in enumerate(result['forecast']):
+            results.append(line(len(data) + i + 1, forecast))
+        results.append([])
+        results.append(line("Alpha", result['alpha']))
+        if result['method'] != 'simple':
+            results.append(line("Beta", result['beta']))
+        if result['method'] == 'holt_winters':
+            results.append(line("Gamma", result['gamma']))
+        results.append(line("RMSE", result['rmse']))
             
         # Load results into the sheet
         forecast_sheet.load_data(results)
-        self.statusBar().showMessage("Forecast sheet created")
+        self.statusBar().showMessage(f"Forecast sheet created for {len(names)} series")
 
     def create_correlation_matrix(self):
         """Create a correlation matrix from selected data"""
@@ -1940,63 +2274,74 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Selection Required", "Please select numeric data")
             return
             
-        # Extract data from selection
+        # Extract data from selection, column by column
+        import numpy as np
         range_ = selected_ranges[0]
-        data = []
-        headers = []
+        top, bottom = range_.topRow(), range_.bottomRow()
+        columns = list(range(range_.leftColumn(), range_.rightColumn() + 1))
+        values = [self.sheet_view.get_column_values(col, top, bottom) for col in columns]
+        # Non-numeric cells are left out of each pair rather than counted as 0
+        data = np.column_stack([column_numbers(column) for column in values])
+        headers = [f"Col {col+1}" for col in columns]
+        if len(data) > 1 and np.isnan(data[0]).all():
+            # Get headers from first row
+            headers = [str(column[0]) if column[0] not in (None, '') else header
+                       for column, header in zip(values, headers)]
+            data = data[1:]
+            
+        if not np.isfinite(data).any():
+            QMessageBox.warning(self, "No Data", "No valid data for correlation analysis")
+            return
+            
+        # Spearman ranks each column over all its values, so gaps make it approximate
+        spearman = "Spearman (approximate with missing values)" if np.isnan(data).any() else "Spearman"
+        options = ["Pearson", "Pearson with p-values", spearman, f"{spearman} with p-values"]
+        option, ok = QInputDialog.getItem(self, "Correlation Matrix", "Coefficient:", options, 0, False)
+        if not ok:
+            return
+        method = 'spearman' if option.startswith("Spearman") else 'pearson'
+        
+        # Wide selections take a while, so the matrix is computed in the background
+        progress = QProgressDialog("Computing correlations...", None, 0, 100, self)
+        progress.setWindowTitle("Correlation Matrix")
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(300)
+        
+        task = BackgroundTask(correlation_matrix, data, method, option.endswith("p-values"), parent=self)
+        task.kwargs['progress'] = task.report_progress
+        task.progressed.connect(progress.setValue)
+        task.succeeded.connect(lambda result: self.finish_correlation_matrix(headers, result, progress))
+        task.failed.connect(lambda error: (progress.reset(), QMessageBox.warning(self, "Analysis Error", f"Error creating correlation matrix: {error}")))
+        task.start()
+        
+    def finish_correlation_matrix(self, headers, result, progress):
+        """Lay out a computed correlation matrix (and its p-values) on a new sheet"""
+        import numpy as np
         
-        # Get headers from first row
-        for col in range(range_.leftColumn(), range_.rightColumn() + 1):
-            item = self.sheet_view.item(range_.topRow(), col)
-            headers.append(item.text() if item else f"Col {col+1}")
+        progress.reset()
+        # Create a new sheet with the correlation matrix
+        result_sheet = SheetView(self)
         
-        # Get data from remaining rows
-        for row in range(range_.topRow() + 1, range_.bottomRow() + 1):
-            row_data = []
-            for col in range(range_.leftColumn(), range_.rightColumn() + 1):
-                item = self.sheet_view.item(row, col)
-                try:
-                    value = float(item.text() if item else 0)
-                    row_data.append(value)
-                except ValueError:
-                    row_data.append(0)  # Non-numeric values as 0
-            data.append(row_data)
+        def matrix(title, values):
+            lines = [[title], [""] + headers]
+            for header, row in zip(headers, values):
+                lines.append([header] + ["" if np.isnan(val) else f"{val:.4f}" for val in row])
+            return lines
         
-        # Calculate correlation matrix
-        try:
-            import numpy as np
-            import pandas as pd
-            
-            if not data:
-                QMessageBox.warning(self, "No Data", "No valid data for correlation analysis")
-                return
-                
-            df = pd.DataFrame(data, columns=headers)
-            corr_matrix = df.corr()
-            
-            # Create a new sheet with the correlation matrix
-            result_sheet = SheetView(self)
-            
-            # Format the results - create a list of lists with the data
-            results = [["Correlation Matrix"]]
-            results.append([""] + list(corr_matrix.columns))
-            
-            for i, row in enumerate(corr_matrix.values):
-                results.append([corr_matrix.index[i]] + [f"{val:.4f}" for val in row])
-            
-            # Load data into the sheet
-            result_sheet.load_data(results)
-            
-            # Replace the current sheet with the result sheet
-            current_index = 0
-            self.sheet_view = result_sheet
-            
-            self.statusBar().showMessage("Correlation matrix created")
-        except ImportError:
-            QMessageBox.warning(self, "Missing Libraries", 
-                              "Please install numpy and pandas to use correlation analysis")
-        except Exception as e:
-            QMessageBox.warning(self, "Analysis Error", f"Error creating correlation matrix: {str(e)}")
+        # Format the results - create a list of lists with the data
+        title = "Correlation Matrix" if result['method'] == 'pearson' else "Spearman Correlation Matrix"
+        results = matrix(title, result['r'])
+        if result['p_values'] is not None:
+            results.append([])
+            results += matrix("P-values", result['p_values'])
+        
+        # Load data into the sheet
+        result_sheet.load_data(results)
+        
+        # Replace the current sheet with the result sheet
+        self.sheet_view = result_sheet
+        
+        self.statusBar().showMessage("Correlation matrix created")
             
     # Advanced Chart Methods
     def insert_advanced_chart(self, chart_type):
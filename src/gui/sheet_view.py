@@ -11,8 +11,15 @@ import json
 import csv
 import io
 import re
-
-class SheetView(QWidget):
+import numpy as np
+from src.core.cell_source import CellSource
+from src.engine.sort import sort_range
+from src.engine.dedup import remove_duplicates
+from src.engine.search import SearchIndex, search_pattern
+from src.engine.autofilter import AutoFilter, FILTER_CONDITIONS
+from src.utils.helpers import shift_formula_references, format_cell_address
+
+class SheetView(QWidget, CellSource):
     # Add signal to forward the table's currentCellChanged signal
     currentCellChanged = pyqtSignal(int, int, int, int)
     # Add signal for formula evaluation
@@ -62,6 +69,8 @@ class SheetView(QWidget):
         # Track if filtering is active
         self.filtering_active = False
         self.hidden_rows = set()
+        self.autofilter = None  # AutoFilter behind the hidden rows
+        self.dataChanged.connect(self.invalidate_filter_index)
         
         # Find/replace context
         self.find_text = ""
@@ -161,6 +170,24 @@ class SheetView(QWidget):
         # Otherwise, return the normal text
         return item.text()
 
+    def get_raw_value(self, row, column):
+        """Get what was entered in a cell: the formula for formula cells, else the text"""
+        item = self.table.item(row, column)
+        if not item:
+            return ''
+        formula = item.data(Qt.UserRole)
+        if formula and isinstance(formula, str) and formula.startswith('='):
+            return formula
+        return item.text()
+
+    def row_count(self):
+        """Number of rows (CellSource interface)"""
+        return self.table.rowCount()
+
+    def column_count(self):
+        """Number of columns (CellSource interface)"""
+        return self.table.columnCount()
+
     def get_cell_display_value(self, row, column):
         """Get the display value (evaluated result) for a cell"""
         cell_key = f"{row},{column}"
@@ -202,10 +229,65 @@ class SheetView(QWidget):
         # Apply any conditional formatting
         self.apply_conditional_formatting_to_cell(row, column)
 
+    def set_cell_values(self, row, column, rows, record=True):
+        """Write a block of values as one update and one undo step"""
+        self.set_cells([(row + r, column + c, value) for r, values in enumerate(rows)
+                        for c, value in enumerate(values)], record)
+
+    def set_cells(self, cells, record=True):
+        """Write scattered (row, column, value) cells as one update and one undo step
+
+        record=False writes without touching the undo history or redo stack
+        """
+        if not cells:
+            return
+        edits = self._write_cells(cells)
+        if record:
+            self.history.append({'type': 'batch_edit', 'cells': edits})
+            self.redo_stack = []
+        self.dataChanged.emit()
+
+    def _write_cells(self, cells):
+        """Write (row, column, value) cells without recording them
+        
+        Returns:
+            List of (row, column, old value, new value) for the undo history
+        """
+        table = self.table
+        bottom = max(row for row, _, _ in cells) + 1
+        right = max(column for _, column, _ in cells) + 1
+        if bottom > table.rowCount():
+            table.setRowCount(bottom)
+            self.update_row_headers()
+        if right > table.columnCount():
+            table.setColumnCount(right)
+            self.update_column_headers()
+            
+        edits = []
+        table.setUpdatesEnabled(False)
+        self.table.itemChanged.disconnect(self.on_item_changed)
+        try:
+            for row, column, value in cells:
+                item = table.item(row, column)
+                if not item:
+                    item = QTableWidgetItem()
+                    table.setItem(row, column, item)
+                edits.append((row, column, self.get_raw_value(row, column), value))
+                item.setData(Qt.UserRole, None)
+                item.setText(value)
+                self.cell_display_values.pop(f"{row},{column}", None)
+        finally:
+            self.table.itemChanged.connect(self.on_item_changed)
+            table.setUpdatesEnabled(True)
+            
+        self.reindex_cells([(row, column) for row, column, _ in cells])
+        return edits
+
     def set_cell_display_value(self, row, column, display_value):
         """Set the display value for a cell with a formula"""
         cell_key = f"{row},{column}"
         self.cell_display_values[cell_key] = display_value
+        self.reindex_cells([(row, column)])
         
         # Update the cell's display if it's a formula result
         item = self.table.item(row, column)
@@ -245,8 +327,20 @@ class SheetView(QWidget):
             
         action = self.history.pop()
         self.redo_stack.append(action)
-        
-        if action['type'] == 'cell_edit':
+        self.invalidate_filter_index()
+        
+        if action['type'] == 'batch_edit':
+            self._apply_batch(action['cells'], undo=True)
+        elif action['type'] == 'move_rows':
+            # Put every row back where it came from
+            inverse = sorted(range(len(action['order'])), key=action['order'].__getitem__)
+            self.move_rows(*action['bounds'], inverse, record=False)
+        elif action['type'] == 'compact_rows':
+            # Refill the cleared rows, then move every row back
+            self._apply_batch(action['cells'], undo=True)
+            inverse = sorted(range(len(action['order'])), key=action['order'].__getitem__)
+            self.move_rows(*action['bounds'], inverse, record=False)
+        elif action['type'] == 'cell_edit':
             row = action['row']
             column = action['column']
             old_value = action['old_value']
@@ -261,6 +355,7 @@ class SheetView(QWidget):
                 
             # Reconnect the signal
             self.table.itemChanged.connect(self.on_item_changed)
+            self.reindex_cells([(row, column)])
 
     def redo(self):
         """Redo the last undone action"""
@@ -269,8 +364,16 @@ class SheetView(QWidget):
             
         action = self.redo_stack.pop()
         self.history.append(action)
-        
-        if action['type'] == 'cell_edit':
+        self.invalidate_filter_index()
+        
+        if action['type'] == 'batch_edit':
+            self._apply_batch(action['cells'], undo=False)
+        elif action['type'] == 'move_rows':
+            self.move_rows(*action['bounds'], action['order'], record=False)
+        elif action['type'] == 'compact_rows':
+            self.move_rows(*action['bounds'], action['order'], record=False)
+            self._apply_batch(action['cells'], undo=False)
+        elif action['type'] == 'cell_edit':
             row = action['row']
             column = action['column']
             new_value = action['new_value']
@@ -285,6 +388,19 @@ class SheetView(QWidget):
                 
             # Reconnect the signal
             self.table.itemChanged.connect(self.on_item_changed)
+            self.reindex_cells([(row, column)])
+
+    def _apply_batch(self, cells, undo):
+        """Put back the old (undo) or new (redo) values of a batch edit"""
+        self.table.itemChanged.disconnect(self.on_item_changed)
+        for row, column, old_value, new_value in cells:
+            item = self.table.item(row, column)
+            if item:
+                value = old_value if undo else new_value
+                item.setData(Qt.UserRole, None)
+                item.setText(value if value else "")
+        self.table.itemChanged.connect(self.on_item_changed)
+        self.reindex_cells([(row, column) for row, column, _, _ in cells])
 
     def load_data(self, data):
         """Load data from a list of lists into the sheet"""
@@ -326,6 +442,9 @@ class SheetView(QWidget):
         # Reconnect the signal
         self.table.itemChanged.connect(self.on_item_changed)
         
+        if self.search_index is not None:
+            self.search_index.refresh_sheet(self)
+            
         # Apply conditional formatting to all cells
         self.apply_conditional_formatting_to_all_cells()
 
@@ -373,6 +492,9 @@ class SheetView(QWidget):
         self.conditional_formatting_rules = []
         self.hidden_rows = set()
         self.filtering_active = False
+        self.autofilter = None
+        if self.search_index is not None:
+            self.search_index.refresh_sheet(self)
 
     def zoom_in(self):
         """Increase the zoom level of the sheet"""
@@ -498,6 +620,7 @@ class SheetView(QWidget):
         row = item.row()
         column = item.column()
         value = item.text()
+        self.reindex_cells([(row, column)])
         
         # Check if it's a formula
         if value and value.startswith('='):
@@ -509,6 +632,11 @@ class SheetView(QWidget):
         else:
             # Non-formula data changed, may affect formulas
             self.dataChanged.emit()
+            
+        # Recalculate what reads the cell; this also updates data and pivot tables
+        parent = self.window()
+        if hasattr(parent, 'calculator') and parent.calculator.cell_source is self:
+            parent.calculator.recalculate_cells([(row, column)])
 
     def evaluateFormula(self, formula, row, column):
         """Evaluate a formula using the calculator from parent window"""
@@ -953,108 +1081,189 @@ class SheetView(QWidget):
             # Update column headers
             self.update_column_headers()
 
-    def sort_selected_data(self, ascending=True):
-        """Sort the selected data"""
+    def sort_selected_data(self, ascending=True, keys=None, has_header=False):
+        """Sort the rows of the selected range
+        
+        Args:
+            ascending: Direction when sorting by the selection's first column
+            keys: Optional list of (column, ascending) sort keys, most
+                significant first, instead of the first column
+            has_header: Keep the selection's first row in place
+            
+        Returns:
+            Result of engine.sort.sort_range, or None without a selection
+        """
         selected_ranges = self.table.selectedRanges()
         if not selected_ranges:
-            return
+            return None
             
         range_ = selected_ranges[0]  # Use the first selected range
+        bounds = (range_.topRow(), range_.leftColumn(), range_.bottomRow(), range_.rightColumn())
+        result = sort_range(self, bounds, keys or [(range_.leftColumn(), ascending)], has_header)
         
-        # Get the column to sort by (use the first column in the selection)
-        sort_col = range_.leftColumn()
-        
-        # Extract the data and associated rows
-        data_with_indices = []
-        for row in range(range_.topRow(), range_.bottomRow() + 1):
-            row_data = []
-            for col in range(range_.leftColumn(), range_.rightColumn() + 1):
-                item = self.table.item(row, col)
-                value = item.text() if item else ""
-                row_data.append(value)
-            data_with_indices.append((row, row_data))
-            
-        # Sort by the first column in the selection
-        data_with_indices.sort(key=lambda x: self._sort_key(x[1][0]), reverse=not ascending)
-        
-        # Temporarily disconnect item changed signal
+        # Moved formulas now read different cells
+        parent = self.window()
+        if result['moved_rows'] and hasattr(parent, 'calculator') and parent.calculator.cell_source is self:
+            parent.calculator.recalculate_cells(
+                [(row, col) for row in result['moved_rows'] for col in range(bounds[1], bounds[3] + 1)])
+        return result
+
+    def move_rows(self, top, left, bottom, right, order, record=True):
+        """Rearrange the rows of a block by moving its items, formatting included
+        
+        Row top + i receives what was in row top + order[i]; relative
+        references in moved formulas are adjusted. Recorded as one undo step.
+        """
+        order = [int(source) for source in order]
+        moves = [(top + i, top + source) for i, source in enumerate(order) if i != source]
+        columns = range(left, right + 1)
+        table = self.table
+        
+        table.setUpdatesEnabled(False)
         self.table.itemChanged.disconnect(self.on_item_changed)
+        try:
+            # Every target row is also a source row, so take everything before placing anything
+            taken = [(target, source, col, table.takeItem(source, col),
+                      self.cell_display_values.pop(f"{source},{col}", None))
+                     for target, source in moves for col in columns]
+            for target, source, col, item, display_value in taken:
+                if item is None:
+                    item = QTableWidgetItem("")
+                formula = item.data(Qt.UserRole)
+                if formula and isinstance(formula, str) and formula.startswith('='):
+                    formula = shift_formula_references(formula, target - source)
+                    item.setData(Qt.UserRole, formula)
+                    item.setToolTip(f"Formula: {formula}\nResult: {display_value}")
+                elif item.text().startswith('='):
+                    item.setText(shift_formula_references(item.text(), target - source))
+                table.setItem(target, col, item)
+                if display_value is not None:
+                    self.cell_display_values[f"{target},{col}"] = display_value
+        finally:
+            self.table.itemChanged.connect(self.on_item_changed)
+            table.setUpdatesEnabled(True)
+            
+        self.reindex_cells([(target, col) for target, _ in moves for col in columns])
+        if record:
+            self.history.append({'type': 'move_rows', 'bounds': (top, left, bottom, right), 'order': order})
+            self.redo_stack = []
+        self.dataChanged.emit()
+
+    def compact_rows(self, top, left, bottom, right, kept):
+        """Move the kept rows of a block up and clear the rows left below, as one undo step"""
+        kept = [int(source) for source in kept]
+        dropped = sorted(set(range(bottom - top + 1)) - set(kept))
+        order = kept + dropped
+        self.move_rows(top, left, bottom, right, order, record=False)
+        cleared = [(row, col, '') for row in range(top + len(kept), bottom + 1) for col in range(left, right + 1)
+                   if self.get_raw_value(row, col)]
+        edits = self._write_cells(cleared) if cleared else []
+        self.history.append({'type': 'compact_rows', 'bounds': (top, left, bottom, right), 'order': order,
+                             'cells': edits})
+        self.redo_stack = []
+        self.dataChanged.emit()
+
+    def remove_duplicate_rows(self, key_columns=None, keep='first', has_header=False, match_case=True):
+        """Remove the rows of the selected range that repeat another row
         
-        # Update the table with sorted data
-        for i, (original_row, row_data) in enumerate(data_with_indices):
-            target_row = range_.topRow() + i
-            for j, value in enumerate(row_data):
-                col = range_.leftColumn() + j
-                item = self.table.item(target_row, col)
-                if item:
-                    item.setText(value)
+        Args:
+            key_columns: Sheet columns that identify a row (defaults to every
+                column of the selection)
+            keep: 'first' or 'last' row of each group of duplicates
+            has_header: Keep the selection's first row in place
+            match_case: Compare text case-sensitively
+            
+        Returns:
+            Result of engine.dedup.remove_duplicates, or None without a selection
+        """
+        selected_ranges = self.table.selectedRanges()
+        if not selected_ranges:
+            return None
+            
+        range_ = selected_ranges[0]
+        bounds = (range_.topRow(), range_.leftColumn(), range_.bottomRow(), range_.rightColumn())
+        result = remove_duplicates(self, bounds, key_columns, keep, has_header, match_case)
         
-        # Reconnect signal
-        self.table.itemChanged.connect(self.on_item_changed)
-
-    def _sort_key(self, value):
-        """Create a sort key that properly handles numbers and text"""
-        try:
-            return (0, float(value))  # Numbers first
-        except ValueError:
-            return (1, value)  # Then text
+        parent = self.window()
+        if result['changed_rows'] and hasattr(parent, 'calculator') and parent.calculator.cell_source is self:
+            parent.calculator.recalculate_cells(
+                [(row, col) for row in result['changed_rows'] for col in range(bounds[1], bounds[3] + 1)])
+        return result
 
     def show_filter_dialog(self):
-        """Show the filter dialog"""
-        dialog = FilterDialog(self)
+        """Show the filter dialog for the selected rows, or the whole sheet"""
+        bounds = None
+        selected_ranges = self.table.selectedRanges()
+        if selected_ranges and selected_ranges[0].rowCount() > 1:
+            range_ = selected_ranges[0]
+            bounds = (range_.topRow(), range_.leftColumn(), range_.bottomRow(), range_.rightColumn())
+        dialog = FilterDialog(self, bounds)
         if dialog.exec_() == QDialog.Accepted:
             self.apply_filter(dialog.get_filter_options())
 
     def apply_filter(self, options):
-        """Apply filter to the data based on the options"""
-        col_index = options['column']
-        condition = options['condition']
-        filter_value = options['value']
-        
-        self.hidden_rows = set()
+        """Apply a filter to the data based on the options
+        
+        Args:
+            options: Dictionary with 'criteria', a list of (column, condition,
+                value) as in AutoFilter.add_criterion, and optionally 'match'
+                ('all' or 'any'), 'has_header' and 'bounds' (top, left,
+                bottom, right; the whole sheet by default). A single
+                'column', 'condition' and 'value' is also accepted.
+        """
+        criteria = options.get('criteria')
+        if criteria is None:
+            condition = {'not_contains': 'does_not_contain'}.get(options['condition'], options['condition'])
+            criteria = [(options['column'], condition, options['value'])]
+        bounds = tuple(options.get('bounds') or (0, 0, self.table.rowCount() - 1, self.table.columnCount() - 1))
+        has_header = options.get('has_header', False)
+        
+        # Keep the column index when only the criteria changed
+        autofilter = self.autofilter
+        if autofilter is None or autofilter.bounds != bounds or autofilter.has_header != has_header:
+            autofilter = AutoFilter(bounds, has_header)
+        autofilter.match = options.get('match', 'all')
+        autofilter.clear_criteria()
+        for column, condition, value in criteria:
+            autofilter.add_criterion(column, condition, value)
+            
+        visible = autofilter.evaluate(self)
+        hidden = np.zeros(self.table.rowCount(), dtype=bool)
+        hidden[autofilter.first_row:autofilter.first_row + len(visible)] = ~visible
+        self.set_hidden_rows(hidden)
+        self.autofilter = autofilter
         self.filtering_active = True
+        return int(visible.sum())
+
+    def set_hidden_rows(self, hidden):
+        """Show and hide rows to match a boolean array
         
-        for row in range(self.table.rowCount()):
-            item = self.table.item(row, col_index)
-            cell_value = item.text() if item else ""
-            
-            show_row = True  # Default to showing the row
-            
-            # Apply filter condition
-            if condition == "equal_to":
-                show_row = (cell_value == filter_value)
-            elif condition == "not_equal_to":
-                show_row = (cell_value != filter_value)
-            elif condition == "contains":
-                show_row = (filter_value in cell_value)
-            elif condition == "not_contains":
-                show_row = (filter_value not in cell_value)
-            elif condition == "greater_than":
-                try:
-                    show_row = (float(cell_value) > float(filter_value))
-                except ValueError:
-                    show_row = False
-            elif condition == "less_than":
-                try:
-                    show_row = (float(cell_value) < float(filter_value))
-                except ValueError:
-                    show_row = False
-            
-            # Hide or show the row
-            if not show_row:
-                self.table.hideRow(row)
-                self.hidden_rows.add(row)
-            else:
-                self.table.showRow(row)
+        QTableWidget hides rows one at a time, so only the rows whose state
+        changes are touched, with repainting suspended until all are done.
+        """
+        table = self.table
+        previous = np.zeros(len(hidden), dtype=bool)
+        previous[[row for row in self.hidden_rows if row < len(hidden)]] = True
+        
+        table.setUpdatesEnabled(False)
+        try:
+            for row in np.flatnonzero(hidden != previous).tolist():
+                table.setRowHidden(row, bool(hidden[row]))
+        finally:
+            table.setUpdatesEnabled(True)
+        self.hidden_rows = set(np.flatnonzero(hidden).tolist())
 
     def remove_filter(self):
         """Remove all filters and show all rows"""
         if self.filtering_active:
-            for row in self.hidden_rows:
-                self.table.showRow(row)
-                
+            self.set_hidden_rows(np.zeros(self.table.rowCount(), dtype=bool))
             self.filtering_active = False
-            self.hidden_rows = set()
+            self.autofilter = None
+
+    def invalidate_filter_index(self):
+        """Drop the AutoFilter's column index after the data changed"""
+        if self.autofilter is not None:
+            self.autofilter.invalidate()
 
     def show_find_dialog(self):
         """Show the find dialog"""
@@ -1066,6 +1275,22 @@ class SheetView(QWidget):
         dialog = ReplaceDialog(self)
         dialog.exec_()
 
+    def get_search_index(self):
+        """The SearchIndex this sheet reports to, indexing the sheet on its own if it has none"""
+        if self.search_index is None:
+            SearchIndex().add_sheet(self.windowTitle(), self)
+        return self.search_index
+
+    def find_all(self, text, match_case=False, match_whole_word=False, search_in_formulas=True, all_sheets=True):
+        """Find every cell containing the text
+        
+        Returns:
+            List of matches as returned by SearchIndex.find_all, across every
+            sheet of the index unless all_sheets is False
+        """
+        return self.get_search_index().find_all(text, match_case, match_whole_word, search_in_formulas,
+                                                None if all_sheets else [self])
+
     def find_next(self, text, match_case=False, match_whole_word=False, search_in_formulas=True):
         """Find the next occurrence of the text"""
         if not text:
@@ -1074,49 +1299,14 @@ class SheetView(QWidget):
         # Save search text for next find
         self.find_text = text
         
-        rows = self.table.rowCount()
-        cols = self.table.columnCount()
-        
-        # Start from the cell after the current one
-        start_row, start_col = self.last_found_cell
-        if start_row == -1:  # First search
-            start_row = 0
-            start_col = 0
-        else:
-            # Move to next cell
-            start_col += 1
-            if start_col >= cols:
-                start_col = 0
-                start_row += 1
-        
-        # Search through cells
-        for row in range(start_row, rows):
-            for col in range(start_col if row == start_row else 0, cols):
-                item = self.table.item(row, col)
-                cell_text = item.text() if item else ""
-                
-                if not search_in_formulas and cell_text.startswith('='):
-                    continue
-                    
-                # Apply search options
-                if not match_case:
-                    cell_text = cell_text.lower()
-                    search_text = text.lower()
-                else:
-                    search_text = text
-                    
-                if match_whole_word:
-                    # Simple whole word search
-                    words = re.findall(r'\b\w+\b', cell_text)
-                    found = search_text in words
-                else:
-                    found = search_text in cell_text
-                    
-                if found:
-                    # Select and scroll to the cell
-                    self.table.setCurrentCell(row, col)
-                    self.last_found_cell = (row, col)
-                    return True
+        matches = self.find_all(text, match_case, match_whole_word, search_in_formulas, all_sheets=False)
+        # The first match after the last one found, in row-major order
+        for match in matches:
+            if (match['row'], match['col']) > self.last_found_cell:
+                # Select and scroll to the cell
+                self.table.setCurrentCell(match['row'], match['col'])
+                self.last_found_cell = (match['row'], match['col'])
+                return True
         
         # If we've searched the entire sheet without finding anything
         self.last_found_cell = (-1, -1)  # Reset for next search
@@ -1128,78 +1318,49 @@ class SheetView(QWidget):
         if row == -1:  # No current match
             return False
             
-        item = self.table.item(row, col)
-        if not item:
+        cell_text = self.get_raw_value(row, col)
+        if not search_in_formulas and cell_text.startswith('='):
             return False
             
-        cell_text = item.text()
-        
-        # Apply replacement
-        if not match_case:
-            new_text = re.sub(re.escape(find_text), replace_text, cell_text, flags=re.IGNORECASE)
-        else:
-            new_text = cell_text.replace(find_text, replace_text)
+        # A function keeps the replacement literal (no backslash escapes)
+        new_text, count = search_pattern(find_text, match_case, match_whole_word).subn(lambda _: replace_text, cell_text)
+        if not count:
+            return False
             
         # Update the cell
         self.set_cell_value(row, col, new_text)
         return True
         
-    def replace_all(self, find_text, replace_text, match_case=False, match_whole_word=False, search_in_formulas=True):
-        """Replace all occurrences of the find_text with replace_text"""
-        rows = self.table.rowCount()
-        cols = self.table.columnCount()
-        count = 0
+    def replace_all(self, find_text, replace_text, match_case=False, match_whole_word=False, search_in_formulas=True,
+                    all_sheets=False):
+        """Replace all occurrences of the find_text with replace_text
+        
+        The edits to each sheet are applied as one batch and one undo step.
         
+        Returns:
+            Number of occurrences replaced
+        """
         # Reset search position
         self.last_found_cell = (-1, -1)
         
-        # Temporarily disconnect item changed signal
-        self.table.itemChanged.disconnect(self.on_item_changed)
+        result = self.get_search_index().replace_all(find_text, replace_text, match_case, match_whole_word,
+                                                     search_in_formulas, None if all_sheets else [self])
         
-        for row in range(rows):
-            for col in range(cols):
-                item = self.table.item(row, col)
-                if not item:
-                    continue
-                    
-                cell_text = item.text()
-                
-                if not search_in_formulas and cell_text.startswith('='):
-                    continue
-                    
-                # Apply search options
-                if not match_case:
-                    search_pattern = re.compile(re.escape(find_text), re.IGNORECASE)
-                else:
-                    search_pattern = re.compile(re.escape(find_text))
-                    
-                if match_whole_word:
-                    # For whole word, use word boundaries in regex
-                    search_pattern = re.compile(r'\b' + re.escape(find_text) + r'\b', 
-                                               re.IGNORECASE if not match_case else 0)
-                
-                # Check if the text is found
-                if re.search(search_pattern, cell_text):
-                    # Record for undo
-                    old_value = cell_text
-                    new_value = re.sub(search_pattern, replace_text)
-                    
-                    self.history.append({
-                        'type': 'cell_edit',
-                        'row': row,
-                        'column': col,
-                        'old_value': old_value,
-                        'new_value': new_value
-                    })
-                    
-                    # Update cell text
-                    item.setText(new_value)
-                    count += 1
-        
-        # Reconnect signal
-        self.table.itemChanged.connect(self.on_item_changed)
-        
-        return count
+        # Replaced formulas and the cells that read replaced values need recalculating
+        parent = self.window()
+        if hasattr(parent, 'calculator') and result['changed']:
+            # The window's one calculator follows the active sheet; point it at
+            # each touched sheet in turn, ending with the active one
+            calculator = parent.calculator
+            active = calculator.cell_source
+            sheets = sorted(result['changed'], key=lambda sheet: sheet is active)
+            try:
+                for sheet in sheets:
+                    calculator.set_cell_source(sheet)
+                    calculator.recalculate_cells(result['changed'][sheet])
+            finally:
+                calculator.set_cell_source(active)
+        return result['occurrences']
 
     def apply_number_format(self, format_type):
         """Apply number format to selected cells"""
@@ -2059,11 +2220,28 @@ class FindDialog(QDialog):
         self.find_button.clicked.connect(self.find_next)
         button_layout.addWidget(self.find_button)
         
+        self.find_all_button = QPushButton("Find All")
+        self.find_all_button.clicked.connect(self.find_all)
+        button_layout.addWidget(self.find_all_button)
+        
         self.close_button = QPushButton("Close")
         self.close_button.clicked.connect(self.reject)
         button_layout.addWidget(self.close_button)
         
         layout.addLayout(button_layout)
+        
+        # Find All results, across every sheet
+        self.results_label = QLabel()
+        layout.addWidget(self.results_label)
+        self.results_table = QTableWidget(0, 3)
+        self.results_table.setHorizontalHeaderLabels(["Sheet", "Cell", "Value"])
+        self.results_table.horizontalHeader().setStretchLastSection(True)
+        self.results_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.results_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.results_table.cellDoubleClicked.connect(self.go_to_result)
+        self.results_table.hide()
+        layout.addWidget(self.results_table)
+        self.results = []
 
     def find_next(self):
         """Find the next occurrence of the text"""
@@ -2080,6 +2258,36 @@ class FindDialog(QDialog):
         
         if not found:
             QMessageBox.information(self, "Find", f"Cannot find '{text}'")
+            
+    def find_all(self):
+        """List every cell containing the text, in every sheet"""
+        text = self.find_edit.text()
+        if not text:
+            return
+            
+        self.results = self.sheet_view.find_all(
+            text,
+            match_case=self.match_case.isChecked(),
+            match_whole_word=self.match_whole_word.isChecked(),
+            search_in_formulas=self.search_formulas.isChecked()
+        )
+        
+        self.results_table.setRowCount(len(self.results))
+        for i, match in enumerate(self.results):
+            self.results_table.setItem(i, 0, QTableWidgetItem(match['sheet']))
+            self.results_table.setItem(i, 1, QTableWidgetItem(format_cell_address(match['row'], match['col'])))
+            self.results_table.setItem(i, 2, QTableWidgetItem(match['text']))
+        self.results_label.setText(f"{len(self.results)} cell(s) found")
+        self.results_table.show()
+        
+    def go_to_result(self, index, _column):
+        """Select a Find All result if it is on the sheet being shown"""
+        match = self.results[index]
+        if match['source'] is self.sheet_view:
+            self.sheet_view.table.setCurrentCell(match['row'], match['col'])
+            self.sheet_view.last_found_cell = (match['row'], match['col'])
+        else:
+            self.results_label.setText(f"{match['sheet']} is not the sheet being shown")
 
 
 class ReplaceDialog(QDialog):
@@ -2123,6 +2331,9 @@ class ReplaceDialog(QDialog):
         self.search_formulas.setChecked(True)
         options_layout.addWidget(self.search_formulas)
         
+        self.all_sheets = QCheckBox("Replace All in every sheet")
+        options_layout.addWidget(self.all_sheets)
+        
         options_group.setLayout(options_layout)
         layout.addWidget(options_group)
         
@@ -2198,69 +2409,116 @@ class ReplaceDialog(QDialog):
             replace_text,
             match_case=self.match_case.isChecked(),
             match_whole_word=self.match_whole_word.isChecked(),
-            search_in_formulas=self.search_formulas.isChecked()
+            search_in_formulas=self.search_formulas.isChecked(),
+            all_sheets=self.all_sheets.isChecked()
         )
         
         QMessageBox.information(self, "Replace", f"Replaced {count} occurrences of '{find_text}'")
 
 
 class FilterDialog(QDialog):
-    def __init__(self, parent=None):
+    """Collects up to MAX_CRITERIA column conditions for an AutoFilter"""
+    
+    MAX_CRITERIA = 3
+    
+    def __init__(self, parent=None, bounds=None):
         super().__init__(parent)
         self.sheet_view = parent
+        self.bounds = bounds or (0, 0, self.sheet_view.table.rowCount() - 1, self.sheet_view.table.columnCount() - 1)
         self.setWindowTitle("Filter Data")
-        self.setMinimumWidth(400)
+        self.setMinimumWidth(520)
         
         layout = QVBoxLayout(self)
         
-        # Column selection
-        column_layout = QHBoxLayout()
-        column_label = QLabel("Column:")
-        self.column_combo = QComboBox()
-        
-        # Add column options (A, B, C, etc.)
-        for col in range(self.sheet_view.table.columnCount()):
-            col_name = chr(65 + col) if col < 26 else chr(64 + int(col/26)) + chr(65 + (col % 26))
-            self.column_combo.addItem(col_name, col)  # Store column index as user data
-            
-        column_layout.addWidget(column_label)
-        column_layout.addWidget(self.column_combo)
-        layout.addLayout(column_layout)
-        
-        # Condition
-        condition_layout = QHBoxLayout()
-        condition_label = QLabel("Condition:")
-        self.condition_combo = QComboBox()
-        self.condition_combo.addItems([
-            "Equal to", "Not equal to", "Contains", "Does not contain",
-            "Greater than", "Less than"
-        ])
-        condition_layout.addWidget(condition_label)
-        condition_layout.addWidget(self.condition_combo)
-        layout.addLayout(condition_layout)
-        
-        # Filter value
-        value_layout = QHBoxLayout()
-        value_label = QLabel("Value:")
-        self.value_edit = QLineEdit()
-        value_layout.addWidget(value_label)
-        value_layout.addWidget(self.value_edit)
-        layout.addLayout(value_layout)
+        top, left, bottom, right = self.bounds
+        layout.addWidget(QLabel(f"Rows {top + 1} to {bottom + 1}"))
+        self.header_check = QCheckBox("First row is a header")
+        self.header_check.setChecked(bottom > top and top == 0 and bool(self.sheet_view.get_cell_value(0, left)))
+        layout.addWidget(self.header_check)
+        
+        # One row per criterion: column, condition, value
+        grid = QGridLayout()
+        self.column_combos = []
+        self.condition_combos = []
+        self.value_edits = []
+        self.joiner_labels = []
+        for i in range(self.MAX_CRITERIA):
+            column_combo = QComboBox()
+            if i > 0:
+                column_combo.addItem("(none)", None)
+            for col in range(left, right + 1):
+                # Store column index as user data
+                header = self.sheet_view.table.horizontalHeaderItem(col)
+                column_combo.addItem(header.text() if header else str(col + 1), col)
+            condition_combo = QComboBox()
+            for name, label in FILTER_CONDITIONS.items():
+                condition_combo.addItem(label, name)
+            value_edit = QLineEdit()
+            value_edit.setPlaceholderText("Value; 'low, high' for Between; a list for Is one of")
+            label = QLabel("Column:" if i == 0 else "And:")
+            if i > 0:
+                self.joiner_labels.append(label)
+            grid.addWidget(label, i, 0)
+            grid.addWidget(column_combo, i, 1)
+            grid.addWidget(condition_combo, i, 2)
+            grid.addWidget(value_edit, i, 3)
+            self.column_combos.append(column_combo)
+            self.condition_combos.append(condition_combo)
+            self.value_edits.append(value_edit)
+        layout.addLayout(grid)
+        
+        match_layout = QHBoxLayout()
+        match_layout.addWidget(QLabel("Show rows matching:"))
+        self.match_combo = QComboBox()
+        self.match_combo.addItem("All conditions", 'all')
+        self.match_combo.addItem("Any condition", 'any')
+        self.match_combo.currentIndexChanged.connect(self.update_joiner_labels)
+        match_layout.addWidget(self.match_combo)
+        layout.addLayout(match_layout)
         
         # Buttons
         button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
-        button_box.accepted.connect(self.accept)
+        button_box.accepted.connect(self.validate_and_accept)
         button_box.rejected.connect(self.reject)
         layout.addWidget(button_box)
+        
+    def update_joiner_labels(self):
+        joiner = "And:" if self.match_combo.currentData() == 'all' else "Or:"
+        for label in self.joiner_labels:
+            label.setText(joiner)
+            
+    @staticmethod
+    def _parse_value(condition, text):
+        """Turn the entered text into the operand AutoFilter expects"""
+        if condition == 'between':
+            return tuple(part.strip() for part in re.split(r',|\band\b', text) if part.strip())
+        if condition == 'in_list':
+            return [part.strip() for part in text.split(',')]
+        return text
+        
+    def validate_and_accept(self):
+        try:
+            probe = AutoFilter(self.bounds, self.header_check.isChecked())
+            for column, condition, value in self.get_filter_options()['criteria']:
+                probe.add_criterion(column, condition, value)
+        except ValueError as e:
+            QMessageBox.warning(self, "Filter Data", str(e))
+            return
+        self.accept()
 
     def get_filter_options(self):
         """Get the selected filter options"""
-        column_index = self.column_combo.currentData()
-        condition = self.condition_combo.currentText().lower().replace(' ', '_')
-        value = self.value_edit.text()
-        
+        criteria = []
+        for column_combo, condition_combo, value_edit in zip(self.column_combos, self.condition_combos, self.value_edits):
+            column = column_combo.currentData()
+            if column is None:
+                continue
+            condition = condition_combo.currentData()
+            criteria.append((column, condition, self._parse_value(condition, value_edit.text())))
+            
         return {
-            'column': column_index,
-            'condition': condition,
-            'value': value
-        }
\ No newline at end of file
+            'criteria': criteria,
+            'match': self.match_combo.currentData(),
+            'has_header': self.header_check.isChecked(),
+            'bounds': self.bounds,
+        }
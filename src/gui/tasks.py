@@ -0,0 +1,31 @@
+from PyQt5.QtCore import QThread, pyqtSignal
+
+class BackgroundTask(QThread):
+    """Runs a function on a worker thread and reports the outcome through
+    signals, which Qt delivers on the GUI thread.
+
+    The function must not touch widgets; gather what it needs from the sheet
+    before starting the task.
+    """
+    succeeded = pyqtSignal(object)  # the function's return value
+    failed = pyqtSignal(str)  # error message
+    progressed = pyqtSignal(int)  # percent done, from report_progress
+
+    def __init__(self, function, *args, parent=None, **kwargs):
+        super().__init__(parent)
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.finished.connect(self.deleteLater)
+
+    def report_progress(self, fraction):
+        """Progress callback for the function; safe to call from the worker thread"""
+        self.progressed.emit(int(fraction * 100))
+
+    def run(self):
+        try:
+            result = self.function(*self.args, **self.kwargs)
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.succeeded.emit(result)
@@ -1,16 +1,18 @@
 import sys
 import os
+import time
 import logging
 from datetime import datetime
 
+# Taken before the application imports so the startup log covers them
+STARTUP_BEGIN = time.perf_counter()
+
 # Add the project root to the Python path to enable absolute imports
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.gui.main_window import MainWindow
-from src.engine.calculator import Calculator
-from src.engine.data_analysis import RegressionAnalysis, DescriptiveStatistics, TimeSeriesForecasting
-from src.engine.chart_engine import ChartEngine
-from src.engine.version_control import VersionControl
+from src.utils.services import ServiceRegistry
+from src.utils.config import WARM_UP_SERVICES
 from PyQt5.QtWidgets import QApplication, QSplashScreen
 from PyQt5.QtGui import QPixmap
 from PyQt5.QtCore import Qt, QTimer
@@ -31,6 +33,40 @@ def configure_logging():
     )
     return logging.getLogger('PySpreadsheet')
 
+def create_services():
+    """Register the application's engines; each is built on first access"""
+    services = ServiceRegistry()
+    
+    def regression_analyzer():
+        from src.engine.data_analysis import RegressionAnalysis
+        return RegressionAnalysis()
+        
+    def stats_analyzer():
+        from src.engine.data_analysis import DescriptiveStatistics
+        return DescriptiveStatistics()
+        
+    def forecaster():
+        from src.engine.data_analysis import TimeSeriesForecasting
+        return TimeSeriesForecasting()
+        
+    def chart_engine():
+        from src.engine.chart_engine import ChartEngine
+        return ChartEngine()
+        
+    def version_control():
+        from src.engine.version_control import VersionControl
+        vc = VersionControl()
+        vc.start_background_gc()
+        return vc
+    
+    services.register('regression_analyzer', regression_analyzer)
+    services.register('stats_analyzer', stats_analyzer)
+    services.register('forecaster', forecaster)
+    services.register('chart_engine', chart_engine)
+    # Opens the version catalog on disk, so it is built off the GUI thread when warming up
+    services.register('version_control', version_control, warm=True)
+    return services
+
 def main():
     # Set up logging
     logger = configure_logging()
@@ -57,46 +93,26 @@ def main():
             splash.showMessage(message, Qt.AlignBottom | Qt.AlignCenter, Qt.white)
             app.processEvents()
     
-    # Initialize formula evaluation system
-    update_splash("Initializing formula engine...")
-    calculator = Calculator()
-    logger.info("Formula engine initialized")
-    
-    # Initialize data analysis tools
-    update_splash("Loading data analysis tools...")
-    regression_analyzer = RegressionAnalysis()
-    stats_analyzer = DescriptiveStatistics()
-    forecaster = TimeSeriesForecasting()
-    logger.info("Data analysis tools loaded")
-    
-    # Initialize charting engine
-    update_splash("Setting up chart engine...")
-    chart_engine = ChartEngine()
-    logger.info("Chart engine ready")
-    
-    # Initialize version control system
-    update_splash("Configuring version control...")
-    version_control = VersionControl()
-    logger.info("Version control system initialized")
+    # Engines are registered here and built when first used
+    services = create_services()
     
     # Create main window
     update_splash("Starting application...")
     window = MainWindow()
-    
-    # Inject dependencies
-    window.calculator = calculator
-    window.regression_analyzer = regression_analyzer
-    window.stats_analyzer = stats_analyzer
-    window.forecaster = forecaster
-    window.chart_engine = chart_engine
-    window.version_control = version_control
+    window.services = services
+    app.aboutToQuit.connect(services.shutdown)
     
     # Close splash and show main window
     if splash:
         QTimer.singleShot(1000, splash.close)
     
     window.show()
-    logger.info("Application started successfully")
+    if WARM_UP_SERVICES:
+        # Build rarely-used engines in the background once the first frame is up
+        QTimer.singleShot(0, services.warm_up)
+    
+    logger.info(f"Application started successfully in {(time.perf_counter() - STARTUP_BEGIN) * 1000:.0f} ms "
+                "(run 'python -m src.utils.startup_report' for an import breakdown)")
     
     # Run the application
     sys.exit(app.exec_())
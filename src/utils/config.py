@@ -7,6 +7,32 @@ DEFAULT_FONT_FAMILY = "Arial"
 DEFAULT_CELL_COLOR = "#FFFFFF"
 DEFAULT_TEXT_COLOR = "#000000"
 AUTO_SAVE_INTERVAL = 5  # in minutes
+VERSION_COMPRESSION_CODEC = "zlib"  # zlib, lzma, bz2 or none
+VERSION_COMPRESSION_LEVEL = 6  # 0 (fastest) - 9 (smallest)
+VERSION_RETENTION = {
+    "keep_all_hours": 24,  # keep every version this recent
+    "hourly_days": 7,  # then the newest version of each hour
+    "daily_weeks": 8,  # then the newest version of each day; older ones are pruned
+    "max_bytes": 256 * 1024 * 1024,  # per-document cap, oldest versions go first (None for no cap)
+}
+VERSION_GC_INTERVAL = 10  # in minutes
+GOAL_SEEK_MAX_ITERATIONS = 100  # formula evaluations before goal seek gives up
+GOAL_SEEK_TOLERANCE = 1e-9  # relative to the target value (absolute below 1)
+SOLVER_MAX_ITERATIONS = 200  # optimizer iterations
+SOLVER_TOLERANCE = 1e-8  # optimizer convergence tolerance
+SOLVER_CONSTRAINT_TOLERANCE = 1e-6  # slack allowed when checking constraints
+DATA_TABLE_WORKERS = 1  # processes for data tables; 1 evaluates in-process, vectorized
+SIMULATION_TRIALS = 10000  # default Monte Carlo trials
+SIMULATION_CHUNK_SIZE = 10000  # trials per random stream / work unit
+SIMULATION_PERCENTILES = [1, 5, 10, 25, 50, 75, 90, 95, 99]
+SIMULATION_HISTOGRAM_BINS = 50
+STATS_CHUNK_ROWS = 65536  # rows read at a time for descriptive statistics
+STATS_DIGEST_COMPRESSION = 1000  # t-digest accuracy; about half as many centroids are kept
+STATS_MODE_LIMIT = 100000  # distinct values counted before the mode is given up
+FORECAST_SERIES_CHUNK = 500  # series fitted per block / work unit
+FORECAST_WORKERS = 1  # processes for fitting forecasts; 1 fits in-process
+CORRELATION_BLOCK_SIZE = 512  # columns per block of the correlation matrix
+WARM_UP_SERVICES = True  # build deferred engines in the background after startup
 SUPPORTED_FILE_FORMATS = ["csv", "xlsx", "xls"]
 USER_PREFERENCES = {
     "theme": "light",
@@ -1,3 +1,4 @@
+import math
 import re
 
 def calculate_percentage(part, whole):
@@ -8,6 +9,22 @@ def calculate_percentage(part, whole):
 def format_currency(value):
     return "${:,.2f}".format(value)
 
+def cell_number(value):
+    """A cell value as a float, NaN when it does not read as a number"""
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return math.nan
+
+def cell_text(value):
+    """The text a cell value shows, '' for an empty cell (None or NaN)"""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        # 10.0 computed by a formula reads as "10", like the cell shows it
+        return str(int(value))
+    return str(value)
+
 def parse_cell_reference(ref):
     """
     Parse a cell reference like 'A1' into column name and row number
@@ -85,6 +102,88 @@ def format_cell_address(row, col):
     col_name = index_to_column_name(col)
     return f"{col_name}{row + 1}"  # Add 1 to convert to 1-based
 
+def parse_range_reference(range_str):
+    """
+    Parse a range reference like 'A1:D20' (or a single cell 'B3') into indices
+    
+    Args:
+        range_str (str): Range reference
+        
+    Returns:
+        tuple: (start_row, start_col, end_row, end_col), 0-based and inclusive,
+               or None if the reference is invalid
+    """
+    parts = range_str.replace('$', '').upper().split(':')
+    if len(parts) == 1:
+        parts = parts * 2
+    if len(parts) != 2:
+        return None
+        
+    start_col_name, start_row = parse_cell_reference(parts[0].strip())
+    end_col_name, end_row = parse_cell_reference(parts[1].strip())
+    if start_col_name is None or end_col_name is None or start_row < 1 or end_row < 1:
+        return None
+        
+    start_col = column_name_to_index(start_col_name)
+    end_col = column_name_to_index(end_col_name)
+    return (min(start_row, end_row) - 1, min(start_col, end_col),
+            max(start_row, end_row) - 1, max(start_col, end_col))
+
+def parse_cell_list(text):
+    """
+    Parse a comma-separated list of cells and ranges like 'B1:B3, D2'
+    
+    Args:
+        text (str): Cells and ranges
+        
+    Returns:
+        list: (row, col) tuples, 0-based, row by row within each range,
+              or None if any part is invalid
+    """
+    cells = []
+    for part in text.split(','):
+        if not part.strip():
+            continue
+        bounds = parse_range_reference(part)
+        if bounds is None:
+            return None
+        start_row, start_col, end_row, end_col = bounds
+        cells.extend((row, col) for row in range(start_row, end_row + 1)
+                     for col in range(start_col, end_col + 1))
+    return cells
+
+_FORMULA_REFERENCE = re.compile(r'(?<![A-Za-z0-9_.])(\$?)([A-Z]+)(\$?)(\d+)(?![\d(])')
+
+def shift_formula_references(formula, row_offset, col_offset=0):
+    """
+    Adjust the relative references in a formula moved or copied by an offset
+    
+    Args:
+        formula (str): Formula text (e.g. '=A2*$B$1')
+        row_offset (int): Rows the formula moved down (negative for up)
+        col_offset (int): Columns the formula moved right (negative for left)
+        
+    Returns:
+        str: The formula with relative parts shifted ('=A5*$B$1' for a move of
+             3 rows); references shifted off the sheet become #REF!
+    """
+    if not row_offset and not col_offset:
+        return formula
+    
+    def shift(match):
+        col_abs, col_name, row_abs, row = match.groups()
+        row = int(row) + (0 if row_abs else row_offset)
+        if col_offset and not col_abs:
+            col = column_name_to_index(col_name) + col_offset
+            if col < 0:
+                return "#REF!"
+            col_name = index_to_column_name(col)
+        if row < 1:
+            return "#REF!"
+        return f"{col_abs}{col_name}{row_abs}{row}"
+    
+    return _FORMULA_REFERENCE.sub(shift, formula)
+
 def validate_formula(formula):
     # Basic validation for a formula string
     allowed_chars = set("0123456789+-*/()ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz ")
@@ -0,0 +1,95 @@
+import threading
+
+class ServiceRegistry:
+    """Builds application components on first access.
+
+    Components are registered as factories; a factory runs the first time
+    its service is requested and the instance is reused afterwards. Services
+    marked for warm-up can be built ahead of time on a background thread once
+    the main window is on screen.
+    """
+
+    def __init__(self):
+        self._factories = {}
+        self._instances = {}
+        self._locks = {}
+        self._warm = []
+        self._warm_thread = None
+
+    def register(self, name, factory, warm=False):
+        """Register a service factory
+
+        Args:
+            name: Service name
+            factory: Callable taking no arguments that builds the service
+            warm: Whether warm_up() should build the service in the background
+        """
+        self._factories[name] = factory
+        self._locks[name] = threading.Lock()
+        if warm and name not in self._warm:
+            self._warm.append(name)
+
+    def has(self, name):
+        """Check whether a service is registered"""
+        return name in self._factories
+
+    def is_built(self, name):
+        """Check whether a service has already been built"""
+        return name in self._instances
+
+    def get(self, name):
+        """Get a service, building it on first access
+
+        Args:
+            name: Service name
+
+        Returns:
+            The service instance
+        """
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        if name not in self._factories:
+            raise KeyError(f"Unknown service: {name}")
+
+        # A per-service lock lets the warm-up thread build one service while
+        # the GUI thread builds (or waits only for) another
+        with self._locks[name]:
+            if name not in self._instances:
+                self._instances[name] = self._factories[name]()
+            return self._instances[name]
+
+    def warm_up(self, names=None, background=True):
+        """Build services ahead of their first use
+
+        Args:
+            names: Services to build (defaults to those registered with warm=True)
+            background: Build on a daemon thread instead of blocking the caller
+        """
+        names = list(self._warm if names is None else names)
+
+        def build():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    # The error surfaces again when the service is actually used
+                    print(f"Error warming up {name}: {e}")
+
+        if not background:
+            build()
+            return
+
+        self._warm_thread = threading.Thread(target=build, name='ServiceWarmUp', daemon=True)
+        self._warm_thread.start()
+
+    def shutdown(self):
+        """Close every built service that has a close() method"""
+        if self._warm_thread is not None:
+            self._warm_thread.join()
+        for instance in self._instances.values():
+            close = getattr(instance, 'close', None)
+            if callable(close):
+                close()
+        self._instances.clear()
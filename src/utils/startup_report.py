@@ -0,0 +1,95 @@
+"""Import-time startup report.
+
+Runs a fresh interpreter with ``-X importtime`` and summarises which modules
+dominate startup, e.g.:
+
+    python -m src.utils.startup_report
+    python -m src.utils.startup_report --module src.engine.data_analysis --top 10
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+def parse_importtime(output):
+    """
+    Parse the stderr of ``python -X importtime``
+    
+    Args:
+        output (str): Captured stderr text
+        
+    Returns:
+        list: {'module', 'self_us', 'cumulative_us', 'depth'} dictionaries in import order
+    """
+    entries = []
+    for line in output.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append({
+                'module': module,
+                'self_us': int(self_us),
+                'cumulative_us': int(cumulative_us),
+                'depth': len(indent) // 2
+            })
+    return entries
+
+def measure_imports(module='src.main'):
+    """
+    Import a module in a clean interpreter and collect its import timings
+    
+    Args:
+        module (str): Dotted module name to import
+        
+    Returns:
+        list: Parsed import entries (see parse_importtime)
+    """
+    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+    env = dict(os.environ, PYTHONPATH=project_root, QT_QPA_PLATFORM=os.environ.get('QT_QPA_PLATFORM', 'offscreen'))
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=project_root, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+def format_report(entries, top=20):
+    """
+    Format import timings as a text report
+    
+    Args:
+        entries (list): Parsed import entries
+        top (int): Number of top-level packages and modules to list
+        
+    Returns:
+        str: Report text
+    """
+    total_us = sum(entry['cumulative_us'] for entry in entries if entry['depth'] == 0)
+    
+    # Group by top-level package so "matplotlib" shows as one line item
+    packages = {}
+    for entry in entries:
+        package = entry['module'].split('.')[0]
+        packages[package] = packages.get(package, 0) + entry['self_us']
+        
+    lines = [f"Total import time: {total_us / 1000:.1f} ms ({len(entries)} modules)", "",
+             f"{'package':<30} {'ms':>10}"]
+    for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        lines.append(f"{package:<30} {self_us / 1000:>10.1f}")
+        
+    lines += ["", f"{'module (cumulative)':<50} {'ms':>10}"]
+    for entry in sorted(entries, key=lambda entry: -entry['cumulative_us'])[:top]:
+        lines.append(f"{entry['module']:<50} {entry['cumulative_us'] / 1000:>10.1f}")
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report which imports dominate startup time")
+    parser.add_argument('--module', default='src.main', help="module to import (default: src.main)")
+    parser.add_argument('--top', type=int, default=20, help="number of entries to list")
+    args = parser.parse_args(argv)
+    print(format_report(measure_imports(args.module), args.top))
+
+if __name__ == '__main__':
+    main()
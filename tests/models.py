@@ -0,0 +1,21 @@
+"""Small sheet models shared by the test modules"""
+from src.core.workbook import Workbook
+
+# Two revenue lines and their total
+REVENUE_ROWS = [
+    ["Units", "Price", "Revenue"],
+    ["10", "2.5", "=A2*B2"],
+    ["4", "5", "=A3*B3"],
+    ["", "Total", "=SUM(C2:C3)"],
+]
+
+def revenue_workbook():
+    """A workbook whose one sheet, "Model", holds REVENUE_ROWS
+
+    Returns:
+        Tuple (workbook, sheet)
+    """
+    workbook = Workbook()
+    sheet = workbook.add_sheet("Model")
+    sheet.load_data(REVENUE_ROWS)
+    return workbook, sheet
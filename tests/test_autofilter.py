@@ -0,0 +1,35 @@
+import unittest
+from src.core.sheet import Sheet
+from src.engine.autofilter import AutoFilter, row_spans
+
+class TestAutoFilter(unittest.TestCase):
+
+    def setUp(self):
+        self.sheet = Sheet("Data")
+
+    def test_autofilter_combines_criteria(self):
+        self.sheet.load_data([
+            ["City", "Sales"],
+            ["Paris", "10"],
+            ["Rome", "200"],
+            ["paris", "30"],
+            ["Oslo", ""],
+            ["Berlin", "50"],
+        ])
+        autofilter = AutoFilter((0, 0, 5, 1), has_header=True)
+        autofilter.add_criterion(0, 'in_list', ["PARIS", "Oslo"])
+        autofilter.add_criterion(1, 'between', (5, 20))
+        self.assertEqual(autofilter.evaluate(self.sheet).tolist(), [True, False, False, False, False])
+        # Changing the criteria reuses the column index
+        autofilter.clear_criteria()
+        autofilter.match = 'any'
+        autofilter.add_criterion(1, 'top', 2)
+        autofilter.add_criterion(1, 'blank')
+        visible = autofilter.evaluate(self.sheet)
+        self.assertEqual(visible.tolist(), [False, True, False, True, True])
+        self.assertEqual(row_spans(~visible, autofilter.first_row), [(1, 1), (3, 3)])
+        with self.assertRaises(ValueError):
+            autofilter.add_criterion(1, 'greater_than', "a lot")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,26 @@
+import unittest
+from src.engine.correlation import correlation_matrix
+
+class TestCorrelationMatrix(unittest.TestCase):
+
+    def test_correlation_matrix_skips_missing_pairs(self):
+        import numpy as np
+        import pandas as pd
+        rng = np.random.default_rng(3)
+        data = rng.normal(size=(60, 7))
+        data[:, 1] += data[:, 0]
+        data[rng.random(data.shape) < 0.15] = np.nan
+        data[:, 6] = 2.0
+        # Small blocks so the matrix is assembled from several products
+        result = correlation_matrix(data, p_values=True, block_size=3)
+        expected = pd.DataFrame(data).corr().to_numpy()
+        np.testing.assert_allclose(result['r'], expected, atol=1e-12)
+        both = ~np.isnan(data[:, 0]) & ~np.isnan(data[:, 1])
+        self.assertEqual(result['observations'][0, 1], both.sum())
+        self.assertLess(result['p_values'][0, 1], 1e-3)
+        complete = rng.normal(size=(30, 4))
+        np.testing.assert_allclose(correlation_matrix(complete, 'spearman')['r'],
+                                   pd.DataFrame(complete).corr('spearman').to_numpy())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,30 @@
+import unittest
+from tests.models import revenue_workbook
+from src.engine.calculator import Calculator
+from src.engine.data_table import DataTable
+
+class TestDataTable(unittest.TestCase):
+
+    def setUp(self):
+        self.workbook, self.sheet = revenue_workbook()
+
+    def test_data_table_fills_and_refreshes(self):
+        self.workbook.recalculate()
+        # Revenue for price x units: units down column E, prices across row 6
+        self.sheet.set_cell_value(5, 4, "=C2")
+        for col, price in enumerate(["1", "2", "3"], start=5):
+            self.sheet.set_cell_value(5, col, price)
+        for row, units in enumerate(["10", "20"], start=6):
+            self.sheet.set_cell_value(row, 4, units)
+        calculator = Calculator(self.sheet)
+        results = calculator.add_data_table(DataTable((5, 4, 7, 7), row_input="B2", column_input="A2"))
+        self.assertEqual(results, [[10.0, 20.0, 30.0], [20.0, 40.0, 60.0]])
+        self.assertEqual(self.sheet.get_cell_value(7, 7), "60.0")
+        # Changing a header refills the table; unrelated cells do not
+        self.sheet.set_cell_value(7, 4, "100")
+        calculator.recalculate_cells([(7, 4)])
+        self.assertEqual(self.sheet.get_cell_value(7, 7), "300.0")
+        self.assertEqual(calculator.recalculate_cells([(20, 20)]), [])
+
+if __name__ == '__main__':
+    unittest.main()
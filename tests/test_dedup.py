@@ -0,0 +1,32 @@
+import unittest
+from src.core.sheet import Sheet
+from src.engine.dedup import remove_duplicates
+
+class TestRemoveDuplicates(unittest.TestCase):
+
+    def setUp(self):
+        self.sheet = Sheet("Data")
+
+    def test_remove_duplicates_compacts_rows(self):
+        self.sheet.load_data([
+            ["City", "Units", "Total"],
+            ["Paris", "10", ""],
+            ["Rome", "5", ""],
+            ["paris", "10", ""],
+            ["Oslo", "10", "=B5*2"],
+            ["Rome", "7", ""],
+        ])
+        result = remove_duplicates(self.sheet, (0, 0, 5, 2), key_columns=[0], has_header=True, match_case=False)
+        self.assertEqual((result['duplicates'], result['unique']), (2, 3))
+        self.assertEqual([row[:2] for row in self.sheet.get_all_data()],
+                         [["City", "Units"], ["Paris", "10"], ["Rome", "5"], ["Oslo", "10"], ["", ""], ["", ""]])
+        # The kept formula moved up with its row
+        self.assertEqual(self.sheet.get_raw_value(3, 2), "=B4*2")
+
+        result = remove_duplicates(self.sheet, (1, 0, 3, 1), key_columns=[1], keep='last')
+        self.assertEqual([self.sheet.get_raw_value(row, 0) for row in range(1, 4)], ["Rome", "Oslo", ""])
+        with self.assertRaises(ValueError):
+            remove_duplicates(self.sheet, (0, 0, 5, 1), key_columns=[2])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,27 @@
+import os
+import tempfile
+import unittest
+from tests.models import revenue_workbook
+from src.eval_service import create_app
+
+class TestEvalService(unittest.TestCase):
+
+    def setUp(self):
+        self.workbook, self.sheet = revenue_workbook()
+
+    def test_evaluate_service_recalculates_incrementally(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "model.csv")
+            self.workbook.save(path, formulas=True)
+            client = create_app().test_client()
+            request = {'workbook': path, 'inputs': {'A2': 20}, 'outputs': ['C4', 'model!C3']}
+            first = client.post('/evaluate', json=request).get_json()
+            self.assertEqual(first['outputs'], {'C4': 70.0, 'model!C3': 20.0})
+            self.assertEqual((first['cache'], first['recalculated']), ('miss', 2))
+            # Inputs from the previous request do not leak into the next one
+            second = client.post('/evaluate', json={'workbook': path, 'outputs': ['C4']}).get_json()
+            self.assertEqual((second['outputs']['C4'], second['cache']), (45.0, 'hit'))
+            self.assertEqual(client.post('/evaluate', json={'workbook': path, 'outputs': ['Nope!A1']}).status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
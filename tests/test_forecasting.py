@@ -0,0 +1,36 @@
+import unittest
+from src.engine.forecasting import fit_forecast
+
+class TestForecast(unittest.TestCase):
+
+    def test_forecast_fits_many_series_at_once(self):
+        import numpy as np
+        periods = np.arange(24)[:, None]
+        season = np.array([[3.0, -2.0], [-1.0, 4.0], [0.0, -1.0], [-2.0, -1.0]])
+        block = np.hstack([10 + 0.5 * periods, 40 - periods]) + season[periods[:, 0] % 4]
+        block[5, 1] = np.nan
+        result = fit_forecast(block, 'holt_winters', periods=4, season_length=4)
+        future = np.arange(24, 28)[:, None]
+        expected = np.hstack([10 + 0.5 * future, 40 - future]) + season[future[:, 0] % 4]
+        np.testing.assert_allclose(result['forecast'], expected, atol=0.5)
+        self.assertEqual(result['fitted'].shape, block.shape)
+        self.assertTrue(((result['alpha'] > 0) & (result['alpha'] < 1)).all())
+        with self.assertRaises(ValueError):
+            fit_forecast(block[:6], 'holt_winters', season_length=4)
+
+    def test_exact_trend_fits_without_error(self):
+        import numpy as np
+        line = np.arange(10.0, 30.0)
+        result = fit_forecast(line, 'holt', periods=3)
+        self.assertAlmostEqual(result['sse'][0], 0.0)
+        np.testing.assert_allclose(result['fitted'][:, 0], line)
+        np.testing.assert_allclose(result['forecast'][:, 0], [30.0, 31.0, 32.0])
+        # A trend plus a repeating season is also fitted from the first value on
+        periods = np.arange(16)
+        seasonal = 5 + 0.5 * periods + np.array([3.0, 1.0, 0.0, 2.0])[periods % 4]
+        result = fit_forecast(seasonal, 'holt_winters', periods=4, season_length=4)
+        self.assertAlmostEqual(result['sse'][0], 0.0)
+        np.testing.assert_allclose(result['fitted'][:, 0], seasonal)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,26 @@
+import unittest
+from src.core.workbook import Workbook
+from src.engine.calculator import Calculator
+from src.engine.goal_seek import GoalSeek
+
+class TestGoalSeek(unittest.TestCase):
+
+    def setUp(self):
+        self.workbook = Workbook()
+
+    def test_goal_seek_finds_input(self):
+        loan = self.workbook.add_sheet("Loan")
+        loan.load_data([["200000"], ["0.004"], ["360"], ["=A1*A2/(1-(1+A2)^(-A3))"]])
+        calculator = Calculator(loan)
+        calculator.recalculate_all()
+        result = GoalSeek(calculator, "A4", 1200, "A2").solve()
+        self.assertTrue(result['converged'])
+        self.assertAlmostEqual(result['result'], 1200, places=6)
+        self.assertLess(result['iterations'], 20)
+        # The sheet is only changed by the caller
+        self.assertEqual(loan.get_raw_value(1, 0), "0.004")
+        with self.assertRaises(ValueError):
+            GoalSeek(calculator, "A3", 1, "A2")
+
+if __name__ == '__main__':
+    unittest.main()
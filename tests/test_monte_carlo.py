@@ -0,0 +1,53 @@
+import unittest
+from tests.models import revenue_workbook
+from src.engine.calculator import Calculator
+from src.engine.monte_carlo import MonteCarloSimulation
+
+class TestMonteCarloSimulation(unittest.TestCase):
+
+    def setUp(self):
+        self.workbook, self.sheet = revenue_workbook()
+
+    def test_monte_carlo_is_reproducible(self):
+        # Units become a die roll and the price a normal draw
+        self.sheet.set_cell_value(1, 0, "=RANDBETWEEN(1, 6)")
+        self.workbook.recalculate()
+        calculator = Calculator(self.sheet)
+        simulation = MonteCarloSimulation(calculator, ["C2"], {"B2": ("normal", (10, 1))},
+                                          trials=20000, seed=7, chunk_size=5000)
+        self.assertEqual(set(simulation.random_inputs), {(1, 0), (1, 1)})
+        summary = simulation.run()['outputs'][(1, 2)]
+        self.assertAlmostEqual(summary['mean'], 35.0, delta=0.5)
+        self.assertEqual(summary['errors'], 0)
+        self.assertEqual(sum(summary['histogram']['counts']), 20000)
+        # Same seed, same draws, however the chunks are scheduled
+        parallel = MonteCarloSimulation(calculator, ["C2"], {"B2": ("normal", (10, 1))},
+                                        trials=20000, seed=7, chunk_size=5000, workers=2)
+        self.assertEqual(parallel.run()['outputs'][(1, 2)]['percentiles'], summary['percentiles'])
+
+    def test_rand_inside_formulas_is_drawn_every_trial(self):
+        # Units scaled from RAND, and a price of 4 plus RAND
+        self.sheet.set_cell_value(1, 0, "=RAND()*10")
+        self.sheet.set_cell_value(2, 1, "=A3+RAND()")
+        self.workbook.recalculate()
+        simulation = MonteCarloSimulation(Calculator(self.sheet), ["A2", "B3", "C4"], trials=4000, seed=3)
+        self.assertEqual(simulation.random_inputs, {})
+        self.assertEqual(set(simulation.random_cells), {(1, 0), (2, 1)})
+        outputs = simulation.run()['outputs']
+        self.assertAlmostEqual(outputs[(1, 0)]['mean'], 5.0, delta=0.2)
+        self.assertAlmostEqual(outputs[(1, 0)]['std'], 10 / 12 ** 0.5, delta=0.2)
+        self.assertGreaterEqual(outputs[(2, 1)]['min'], 4.0)
+        self.assertLess(outputs[(2, 1)]['max'], 5.0)
+        self.assertAlmostEqual(outputs[(2, 1)]['std'], 1 / 12 ** 0.5, delta=0.02)
+        # The total reads both: 2.5 * A2 + 4 * B3
+        self.assertAlmostEqual(outputs[(3, 2)]['mean'], 12.5 + 18.0, delta=0.5)
+
+    def test_sum_of_rand_calls_draws_each_call(self):
+        self.sheet.set_cell_value(1, 0, "=RAND()+RAND()")
+        self.workbook.recalculate()
+        summary = MonteCarloSimulation(Calculator(self.sheet), ["A2"], trials=4000, seed=5).run()['outputs'][(1, 0)]
+        # Two independent uniforms: variance 1/6, not the 1/12 of one draw
+        self.assertAlmostEqual(summary['std'], 6 ** -0.5, delta=0.02)
+
+if __name__ == '__main__':
+    unittest.main()
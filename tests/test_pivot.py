@@ -0,0 +1,63 @@
+import unittest
+from src.core.sheet import Sheet
+from src.engine.calculator import Calculator
+from src.engine.pivot import PivotTable, LivePivot
+
+class TestPivotTable(unittest.TestCase):
+
+    def setUp(self):
+        self.sheet = Sheet("Data")
+
+    def test_pivot_table_groups_on_several_levels(self):
+        self.sheet.load_data([
+            ["Region", "Product", "Year", "Sales"],
+            ["East", "A", "2020", "10"],
+            ["East", "B", "2020", "5"],
+            ["West", "A", "2021", "7"],
+            ["East", "A", "2021", "3"],
+            ["West", "A", "2021", "n/a"],
+        ])
+        table = PivotTable((0, 0, 5, 3), rows=[0, 1], columns=[2], values=[(3, 'sum')]).evaluate(self.sheet)
+        self.assertEqual(table, [
+            ["", "Year", "2020", "2021", "Grand Total"],
+            ["Region", "Product", "Sum of Sales", "Sum of Sales", "Sum of Sales"],
+            ["East", "A", 10, 3, 13],
+            ["East", "B", 5, "", 5],
+            ["West", "A", "", 7, 7],
+            ["Grand Total", "", 15, 10, 25],
+        ])
+        table = PivotTable((0, 0, 5, 3), rows=[0], values=[(3, 'average'), (3, 'count'), (1, 'distinct')],
+                           filters={2: ["2021"]}, totals=False).evaluate(self.sheet)
+        self.assertEqual(table[1:], [["East", 3, 1, 1], ["West", 7, 2, 1]])
+        with self.assertRaises(ValueError):
+            PivotTable((0, 0, 5, 3), rows=[0], values=[(3, 'median')])
+
+    def test_live_pivot_applies_changes(self):
+        self.sheet.load_data([
+            ["Region", "Sales"],
+            ["East", "10"],
+            ["West", "5"],
+            ["East", "=B3*2"],
+        ])
+        calculator = Calculator(self.sheet)
+        calculator.recalculate_all()
+        pivot = LivePivot(PivotTable((0, 0, 3, 1), rows=[0], values=[(1, 'sum'), (1, 'max')]), (0, 3))
+        table = calculator.add_pivot_table(pivot)
+        self.assertEqual(table[1:], [["East", "20", "10"], ["West", "5", "5"], ["Grand Total", "25", "10"]])
+        self.sheet.set_cell_value(0, 6, "=E4+1")
+        calculator.recalculate_cells([(0, 6)])
+
+        # The West change flows through the formula into East; the total's reader follows
+        self.sheet.set_cell_value(2, 1, "1")
+        calculator.recalculate_cells([(2, 1)])
+        self.assertEqual([self.sheet.get_cell_value(row, 4) for row in range(1, 4)], ["12", "1", "13"])
+        self.assertEqual(self.sheet.get_cell_value(1, 5), "10")
+        self.assertEqual(self.sheet.get_cell_value(0, 6), "14.0")
+        # Moving a row to a new group adds it; the emptied group disappears
+        self.sheet.set_cell_value(2, 0, "North")
+        calculator.recalculate_cells([(2, 0)])
+        self.assertEqual([self.sheet.get_cell_value(row, 3) for row in range(1, 4)], ["East", "North", "Grand Total"])
+        self.assertEqual(pivot.table, [[str(value) for value in line] for line in pivot.pivot.evaluate(self.sheet)])
+
+if __name__ == '__main__':
+    unittest.main()
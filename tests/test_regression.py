@@ -0,0 +1,24 @@
+import unittest
+from src.engine.regression import fit_many, multiple_regression
+
+class TestBatchRegression(unittest.TestCase):
+
+    def test_batch_regression_matches_single_fits(self):
+        import numpy as np
+        rng = np.random.default_rng(7)
+        x = rng.normal(size=(40, 2))
+        y = x @ rng.normal(size=(2, 5)) + 3 + rng.normal(size=(40, 5))
+        y[4, 2] = np.nan
+        batch = fit_many(x, y)
+        self.assertEqual(batch['observations'].tolist(), [40, 40, 39, 40, 40])
+        for col in range(5):
+            single = multiple_regression(x, y[:, col])
+            np.testing.assert_allclose(batch['coefficients'][:, col], single['coefficients'])
+            np.testing.assert_allclose(batch['p_values'][:, col], single['p_values'])
+            self.assertAlmostEqual(batch['adjusted_r_squared'][col], single['adjusted_r_squared'])
+        # Same coefficients as a plain least-squares solve
+        design = np.column_stack([np.ones(40), x])
+        np.testing.assert_allclose(batch['coefficients'][:, 0], np.linalg.lstsq(design, y[:, 0], rcond=None)[0])
+
+if __name__ == '__main__':
+    unittest.main()
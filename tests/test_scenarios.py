@@ -0,0 +1,19 @@
+import unittest
+from tests.models import revenue_workbook
+from src.engine.calculator import Calculator
+
+class TestScenarioEvaluation(unittest.TestCase):
+
+    def setUp(self):
+        self.workbook, self.sheet = revenue_workbook()
+
+    def test_evaluate_batch_matches_recalculation(self):
+        self.workbook.recalculate()
+        calculator = Calculator(self.sheet)
+        results = calculator.evaluate_batch(["A2", "B3"], [[1, 1], [2, 0], [0, 4]], ["C2", "C4", "C3"])
+        self.assertEqual(results.tolist(), [[2.5, 6.5, 4.0], [5.0, 5.0, 0.0], [0.0, 16.0, 16.0]])
+        # The sheet keeps its own values
+        self.assertEqual(float(self.sheet.get_cell_value(3, 2)), 45.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,29 @@
+import unittest
+from src.core.workbook import Workbook
+
+class TestSearchIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.workbook = Workbook()
+        self.sheet = self.workbook.add_sheet("Model")
+
+    def test_search_index_follows_edits(self):
+        other = self.workbook.add_sheet("Other")
+        other.set_cell_value(0, 0, "Total apples")
+        self.sheet.set_cell_value(4, 0, "apple pie")
+        index = self.workbook.get_search_index()
+        found = [(match['sheet'], match['row'], match['col']) for match in index.find_all("APPLE")]
+        self.assertEqual(found, [("Model", 4, 0), ("Other", 0, 0)])
+        self.assertEqual(len(index.find_all("apple", match_whole_word=True)), 1)
+
+        result = index.replace_all("apple", "pear")
+        self.assertEqual(result['cells'], 2)
+        self.assertEqual(other.get_raw_value(0, 0), "Total pears")
+        # Later edits are picked up without rebuilding the index
+        self.sheet.set_cell_value(5, 0, "pear tree")
+        self.workbook.rename_sheet("Other", "Notes")
+        found = [(match['sheet'], match['row']) for match in index.find_all("pear")]
+        self.assertEqual(found, [("Model", 4), ("Model", 5), ("Notes", 0)])
+
+if __name__ == '__main__':
+    unittest.main()
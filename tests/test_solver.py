@@ -0,0 +1,24 @@
+import unittest
+from src.core.workbook import Workbook
+from src.engine.calculator import Calculator
+from src.engine.solver import Solver
+
+class TestSolver(unittest.TestCase):
+
+    def setUp(self):
+        self.workbook = Workbook()
+
+    def test_solver_respects_constraints(self):
+        plan = self.workbook.add_sheet("Plan")
+        plan.load_data([["1", "1"], ["=3*A1+5*B1", "=2*B1"], ["=3*A1+2*B1"]])
+        calculator = Calculator(plan)
+        calculator.recalculate_all()
+        constraints = [("A1", ">=", 0), ("B1", ">=", 0), ("A1", "<=", 4), ("B2", "<=", 12), ("A3", "<=", 18)]
+        result = Solver(calculator, "A2", ["A1", "B1"], "max", constraints=constraints).solve()
+        self.assertTrue(result['success'])
+        self.assertAlmostEqual(result['objective'], 36, places=5)
+        self.assertEqual([round(value, 5) for value in result['values']], [2, 6])
+        self.assertTrue(all(satisfied for *_, satisfied in result['constraints']))
+
+if __name__ == '__main__':
+    unittest.main()
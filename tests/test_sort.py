@@ -0,0 +1,34 @@
+import unittest
+from src.core.sheet import Sheet
+from src.engine.calculator import Calculator
+from src.engine.sort import sort_range
+
+class TestSortRange(unittest.TestCase):
+
+    def setUp(self):
+        self.sheet = Sheet("Data")
+
+    def test_sort_range_moves_formulas_with_rows(self):
+        self.sheet.load_data([
+            ["Units", "Price", "Revenue"],
+            ["4", "5", "=A2*B2"],
+            ["10", "2.5", "=A3*B3"],
+            ["4", "7", "=A4*B4"],
+            ["", "1", "=A5*B5"],
+        ])
+        # Units ascending with blanks last, then price descending; the header stays
+        result = sort_range(self.sheet, (0, 0, 4, 2), [(0, True), (1, False)], has_header=True)
+        self.assertEqual(result['moved_rows'], [1, 2, 3])
+        self.assertEqual([self.sheet.get_raw_value(row, 1) for row in range(1, 5)], ["7", "5", "2.5", "1"])
+        self.assertEqual(self.sheet.get_raw_value(1, 2), "=A2*B2")
+        Calculator(self.sheet).recalculate_all()
+        self.assertEqual([float(self.sheet.get_cell_value(row, 2)) for row in range(1, 4)], [28.0, 20.0, 25.0])
+
+    def test_move_rows_accepts_a_list(self):
+        self.sheet.load_data([["a", "=B1"], ["b", "=B2"], ["c", "=B3"]])
+        self.sheet.move_rows(0, 0, 2, 1, [2, 0, 1])
+        self.assertEqual([self.sheet.get_raw_value(row, 0) for row in range(3)], ["c", "a", "b"])
+        self.assertEqual(self.sheet.get_raw_value(0, 1), "=B1")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+from src.core.sheet import Sheet
+from src.engine.data_analysis import DescriptiveStatistics
+from src.engine.statistics import StreamingStatistics, describe_range
+
+class TestStreamingStatistics(unittest.TestCase):
+
+    def setUp(self):
+        self.sheet = Sheet("Data")
+
+    def test_streaming_statistics_merge_chunks(self):
+        import numpy as np
+        values = [float(value) for value in range(1, 100)] + [7.0]
+        self.sheet.load_data([[value] for value in values] + [["text"], [""]])
+        stats = describe_range(self.sheet, (0, 0, 101, 0), chunk_rows=16)
+        self.assertEqual(stats['count'], 100)
+        self.assertEqual(stats['mode'], 7.0)
+        self.assertAlmostEqual(stats['variance'], np.var(values, ddof=1))
+        self.assertAlmostEqual(stats['quartile_3'], np.percentile(values, 75))
+        # Partial results gathered separately combine into the same figures
+        first, second = StreamingStatistics(), StreamingStatistics()
+        first.update(values[:30])
+        second.update(values[30:])
+        first.merge(second)
+        self.assertAlmostEqual(first.result()['skewness'], stats['skewness'])
+        self.assertAlmostEqual(first.result()['median'], np.median(values))
+
+    def test_in_memory_statistics_use_exact_quartiles(self):
+        import numpy as np
+        values = np.random.default_rng(5).lognormal(size=1000)
+        stats = DescriptiveStatistics().calculate_statistics(values.tolist())
+        q1, median, q3 = np.percentile(values, [25, 50, 75])
+        self.assertEqual(stats['count'], 1000)
+        self.assertEqual(stats['median'], median)
+        self.assertEqual(stats['quartile_1'], q1)
+        self.assertEqual(stats['quartile_3'], q3)
+        self.assertEqual(stats['iqr'], q3 - q1)
+
+if __name__ == '__main__':
+    unittest.main()
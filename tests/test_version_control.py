@@ -0,0 +1,162 @@
+import copy
+import datetime
+import json
+import os
+import tempfile
+import unittest
+from src.engine.version_control import VersionControl
+
+class TestVersionControl(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.vc = VersionControl(self.temp_dir.name)
+        self.vc.TILE_ROWS = 4
+        self.vc.TILE_COLS = 2
+        self.filepath = "/tmp/book.xlsx"
+        self.document_id = self.vc.get_document_id_from_path(self.filepath)
+        self.data = {"Sheet1": [[str(r * 10 + c) for c in range(5)] for r in range(10)]}
+
+    def tearDown(self):
+        self.vc.close()
+        self.temp_dir.cleanup()
+
+    def save_edit(self, row, col, value):
+        self.data = copy.deepcopy(self.data)
+        self.data["Sheet1"][row][col] = value
+        return self.vc.save_version(self.filepath, self.data)
+
+    def test_load_round_trip(self):
+        info = self.vc.save_version(self.filepath, self.data, "first")
+        self.assertEqual(self.vc.load_version(self.document_id, info['version_id']), self.data)
+
+    def test_older_versions_load_through_delta_chain(self):
+        snapshots = []
+        infos = []
+        for i in range(5):
+            infos.append(self.save_edit(i, i % 5, f"edit{i}"))
+            snapshots.append(self.data)
+        for info, snapshot in zip(infos, snapshots):
+            self.assertEqual(self.vc.load_version(self.document_id, info['version_id']), snapshot)
+
+    def test_diff_versions(self):
+        first = self.vc.save_version(self.filepath, self.data)
+        self.save_edit(2, 3, "x")
+        last = self.save_edit(9, 0, "y")
+        diff = self.vc.diff_versions(self.document_id, first['version_id'], last['version_id'])
+        changed = {(c['row'], c['col']): (c['old'], c['new']) for c in diff['cells']}
+        self.assertEqual(changed, {(2, 3): ("23", "x"), (9, 0): ("90", "y")})
+        self.assertEqual(self.vc.changes_since(self.document_id, first['version_id']), diff)
+
+    def test_versions_keep_their_tile_shape(self):
+        first = self.vc.save_version(self.filepath, self.data)
+        original = self.data
+        middle = self.save_edit(5, 3, "a")
+        before = self.data
+        # Versions saved from here on use another tile shape
+        self.vc.TILE_ROWS = 3
+        self.vc.TILE_COLS = 3
+        last = self.save_edit(9, 4, "b")
+        manifest = self.vc._read_manifest(self.document_id, middle['version_id'])
+        self.assertEqual((manifest['tile_rows'], manifest['tile_cols']), (4, 2))
+        self.assertIsNone(manifest['base'])
+        self.assertEqual(self.vc.load_version(self.document_id, first['version_id']), original)
+        self.assertEqual(self.vc.load_version(self.document_id, middle['version_id']), before)
+        self.assertEqual(self.vc.load_version_partial(self.document_id, first['version_id'], "Sheet1", (4, 2, 6, 4)),
+                         [row[2:5] for row in original["Sheet1"][4:7]])
+        diff = self.vc.diff_versions(self.document_id, first['version_id'], last['version_id'])
+        changed = {(c['row'], c['col']): (c['old'], c['new']) for c in diff['cells']}
+        self.assertEqual(changed, {(5, 3): ("53", "a"), (9, 4): ("94", "b")})
+
+    def test_delete_rebases_older_version(self):
+        first = self.vc.save_version(self.filepath, self.data)
+        original = self.data
+        middle = self.save_edit(0, 0, "a")
+        self.save_edit(1, 1, "b")
+        self.assertTrue(self.vc.delete_version(self.document_id, middle['version_id']))
+        self.assertEqual(self.vc.load_version(self.document_id, first['version_id']), original)
+
+    def test_paged_listing(self):
+        ids = [self.save_edit(0, 0, str(i))['version_id'] for i in range(5)]
+        self.assertEqual(self.vc.count_versions(self.document_id), 5)
+        page = self.vc.get_versions(self.document_id, offset=1, limit=2, newest_first=True)
+        self.assertEqual([v['version_id'] for v in page], [ids[3], ids[2]])
+
+    def test_partial_load_reads_only_overlapping_tiles(self):
+        info = self.vc.save_version(self.filepath, self.data)
+        read = []
+        original_read_chunk = self.vc._read_chunk
+        self.vc._read_chunk = lambda document_id, chunk_hash: read.append(chunk_hash) or original_read_chunk(document_id, chunk_hash)
+        block = self.vc.load_version_partial(self.document_id, info['version_id'], "Sheet1", (1, 1, 2, 2))
+        self.assertEqual(block, [["11", "12"], ["21", "22"]])
+        self.assertEqual(len(read), 2)
+        self.assertEqual(self.vc.load_version_partial(self.document_id, info['version_id'], "Sheet1"), self.data["Sheet1"])
+        self.assertIsNone(self.vc.load_version_partial(self.document_id, info['version_id'], "Missing"))
+        self.assertEqual(self.vc.get_version_sheets(self.document_id, info['version_id']),
+                         [{'name': "Sheet1", 'rows': 10, 'cols': 5}])
+
+    def test_codecs_round_trip_and_mix(self):
+        for codec in VersionControl.COMPRESSION_CODECS:
+            self.vc.codec = codec
+            info = self.save_edit(0, 0, codec)
+            vc = VersionControl(self.temp_dir.name)
+            vc.TILE_ROWS = 4
+            vc.TILE_COLS = 2
+            self.assertEqual(vc.load_version(self.document_id, info['version_id']), self.data)
+            vc.close()
+        with self.assertRaises(ValueError):
+            VersionControl(self.temp_dir.name, codec="snappy")
+
+    def test_retention_tiers(self):
+        infos = [self.save_edit(0, 0, str(i)) for i in range(4)]
+        timestamps = ["2024-01-01T09:00:00", "2024-05-30T10:05:00", "2024-05-30T10:20:00", "2024-06-01T11:00:00"]
+        with self.vc._catalog:
+            for info, timestamp in zip(infos, timestamps):
+                self.vc._catalog.execute('UPDATE versions SET timestamp = ? WHERE version_id = ?',
+                                         (timestamp, info['version_id']))
+        result = self.vc.collect_garbage(self.document_id, now=datetime.datetime(2024, 6, 1, 12, 0))
+        self.assertEqual(result['versions_deleted'], 2)
+        remaining = [v['version_id'] for v in self.vc.get_versions(self.document_id)]
+        self.assertEqual(remaining, [infos[2]['version_id'], infos[3]['version_id']])
+        self.assertEqual(self.vc.load_version(self.document_id, infos[2]['version_id'])["Sheet1"][0][0], "2")
+
+    def test_byte_cap_prunes_oldest_and_sweeps_chunks(self):
+        self.vc.retention = {'keep_all_hours': 1000, 'max_bytes': 1}
+        for i in range(3):
+            self.data = {"Sheet1": [[f"v{i}-{r}-{c}" for c in range(5)] for r in range(10)]}
+            latest = self.vc.save_version(self.filepath, self.data)
+        chunks_dir = self.vc._get_chunks_dir(self.document_id)
+        for name in os.listdir(chunks_dir):
+            os.utime(os.path.join(chunks_dir, name), (0, 0))
+        result = self.vc.collect_garbage(self.document_id)
+        self.assertEqual(result['versions_deleted'], 2)
+        self.assertEqual(result['chunks_deleted'], 2 * 9)
+        self.assertEqual(len(os.listdir(chunks_dir)), 9)
+        self.assertEqual(self.vc.load_version(self.document_id, latest['version_id']), self.data)
+
+    def test_concurrent_saves_use_their_own_temporary_files(self):
+        import threading
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.vc.save_version(self.filepath, self.data)))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(results))
+        for info in results:
+            self.assertEqual(self.vc.load_version(self.document_id, info['version_id']), self.data)
+        versions_dir = self.vc._get_document_versions_dir(self.document_id)
+        leftovers = [name for _, _, files in os.walk(versions_dir) for name in files if name.endswith('.tmp')]
+        self.assertEqual(leftovers, [])
+
+    def test_legacy_catalog_is_migrated(self):
+        legacy = [{'version_id': 'old', 'timestamp': '2024-01-01T00:00:00',
+                   'comment': 'legacy', 'filepath': self.filepath, 'size': 1}]
+        with open(self.vc._get_version_data_path(self.document_id), 'w') as f:
+            json.dump(legacy, f)
+        self.assertEqual(self.vc.get_versions(self.document_id), legacy)
+
+if __name__ == '__main__':
+    unittest.main()
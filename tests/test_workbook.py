@@ -0,0 +1,81 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from src.core.workbook import Workbook
+from tests.models import revenue_workbook
+from src.engine.calculator import Calculator
+from src.cli.batch_calc import run_batch, sheet_frame
+
+class TestHeadlessWorkbook(unittest.TestCase):
+
+    def setUp(self):
+        self.workbook, self.sheet = revenue_workbook()
+
+    def test_recalculate_without_qt(self):
+        self.workbook.recalculate()
+        self.assertEqual(float(self.sheet.get_cell_value(1, 2)), 25.0)
+        self.assertEqual(float(self.sheet.get_cell_value(3, 2)), 45.0)
+
+    def test_recalculate_orders_formulas_by_dependency(self):
+        # The total sits above the lines it sums, so row order would sum them before they are calculated
+        self.sheet.load_data([
+            ["", "Total", "=SUM(C2:C3)"],
+            ["10", "2.5", "=A2*B2"],
+            ["4", "5", "=A3*B3"],
+        ])
+        self.workbook.recalculate()
+        self.assertEqual(float(self.sheet.get_cell_value(0, 2)), 45.0)
+
+    def test_engine_imports_without_qt(self):
+        code = "import sys, src.core.workbook, src.engine.calculator; sys.exit('PyQt5' in sys.modules)"
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.assertEqual(subprocess.run([sys.executable, "-c", code], cwd=root).returncode, 0)
+
+    def test_calculator_reads_sheet(self):
+        calculator = Calculator()
+        calculator.set_cell_source(self.sheet)
+        self.assertEqual(calculator.evaluate("=A2+A3", 0, 0), "14.0")
+        self.assertEqual(self.sheet.get_raw_value(1, 2), "=A2*B2")
+
+    def test_export_round_trip(self):
+        self.workbook.recalculate()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "model.csv")
+            self.workbook.save(path)
+            loaded = Workbook().load(path)
+        self.assertEqual(loaded.sheet_names(), ["model"])
+        self.assertEqual(loaded.get_sheet("model").get_all_data()[3], ["", "Total", "45.0"])
+
+    def test_batch_reports_each_file(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            good = os.path.join(temp_dir, "good.csv")
+            self.workbook.save(good, formulas=True)
+            missing = os.path.join(temp_dir, "missing.csv")
+            summary = run_batch([good, missing], os.path.join(temp_dir, "out"), workers=1)
+            with open(summary['files'][0]['outputs'][0]) as f:
+                self.assertIn("45.0", f.read())
+        self.assertEqual(summary['failed'], 1)
+        self.assertEqual([result['status'] for result in summary['files']], ['ok', 'error'])
+        self.assertEqual(summary['files'][0]['formulas'], 3)
+
+    def test_parquet_frame_keeps_numbers(self):
+        self.workbook.recalculate()
+        frame = sheet_frame(self.workbook.to_dict()["Model"])
+        # The text first row names the columns; numeric columns stay numeric
+        self.assertEqual(list(frame.columns), ["Units", "Price", "Revenue"])
+        self.assertEqual(frame["Revenue"].tolist(), [25.0, 20.0, 45.0])
+        self.assertEqual(frame["Units"].dtype, float)
+        self.assertTrue(frame["Units"].isna().iloc[2])
+        self.assertEqual(frame["Price"].iloc[2], "Total")
+
+    def test_sheet_management(self):
+        self.workbook.add_sheet("Other")
+        self.workbook.rename_sheet("Model", "Plan")
+        self.assertEqual(self.workbook.sheet_names(), ["Plan", "Other"])
+        self.assertTrue(self.workbook.sheet_exists("Plan"))
+        self.assertEqual(self.workbook.sheet_count(), 2)
+
+if __name__ == '__main__':
+    unittest.main()